@@ -0,0 +1,118 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class AgrupadorNotificacoes:
+    """
+    Junta os alertas de várias buscas em um único resumo por destinatário.
+
+    O primeiro alerta de um destinatário abre uma janela de `janela` segundos; os alertas
+    que chegam durante a janela viram seções do mesmo resumo (uma por busca - a mais recente
+    substitui a anterior). Cada destinatário recebe no máximo `max_por_hora` resumos por hora:
+    acima disso os alertas continuam se acumulando até a vaga seguinte, mas nenhum alerta fica
+    retido mais de `adiamento_maximo` segundos - vencido esse prazo o resumo sai mesmo acima
+    do limite.
+    """
+
+    def __init__(self, fila, formatar, janela=None, max_por_hora=None, adiamento_maximo=None):
+        # fila: FilaNotificacoes; formatar: função(lista de seções) -> texto do resumo
+        self.fila = fila
+        self.formatar = formatar
+        self.janela = janela if janela is not None else float(os.getenv('NOTIFICACOES_JANELA_AGRUPAMENTO', '60'))
+        self.max_por_hora = max_por_hora or int(os.getenv('NOTIFICACOES_MAX_POR_HORA', '6'))
+        self.adiamento_maximo = adiamento_maximo or float(os.getenv('NOTIFICACOES_ADIAMENTO_MAXIMO', '900'))
+        self._lock = threading.RLock()
+        self._grupos = {}
+        self._temporizadores = {}
+        self._envios = {}
+
+    def adicionar(self, destinatario, busca, secao, chave, canais=None, ao_enviar=None):
+        """
+        Acrescentar a seção de uma busca ao próximo resumo do destinatário.
+        ao_enviar: chamada quando o resumo for colocado na fila de envio (ex: registrar cooldown)
+        """
+        with self._lock:
+            grupo = self._grupos.setdefault(destinatario, {
+                'secoes': {}, 'chaves': {}, 'callbacks': {}, 'canais': canais, 'desde': time.monotonic()
+            })
+            grupo['secoes'][busca] = secao
+            grupo['chaves'][busca] = chave
+            # O callback acompanha a seção: se ela for substituída, só o da seção nova roda
+            grupo['callbacks'].pop(busca, None)
+            if ao_enviar:
+                grupo['callbacks'][busca] = ao_enviar
+            if destinatario not in self._temporizadores:
+                self._agendar(destinatario, self.janela)
+
+    def _agendar(self, destinatario, espera):
+        temporizador = threading.Timer(espera, self._liberar, args=(destinatario,))
+        temporizador.daemon = True
+        self._temporizadores[destinatario] = temporizador
+        temporizador.start()
+
+    def _espera_limite(self, destinatario):
+        """Segundos até o destinatário ter uma vaga no limite por hora (0 se já tiver)"""
+        envios = self._envios.setdefault(destinatario, deque())
+        agora = time.monotonic()
+        while envios and agora - envios[0] >= 3600:
+            envios.popleft()
+        if len(envios) < self.max_por_hora:
+            return 0
+        return 3600 - (agora - envios[0])
+
+    def _liberar(self, destinatario, ignorar_limite=False):
+        with self._lock:
+            self._temporizadores.pop(destinatario, None)
+            grupo = self._grupos.get(destinatario)
+            if not grupo:
+                return
+
+            espera = 0 if ignorar_limite else self._espera_limite(destinatario)
+            if espera > 0:
+                retido = time.monotonic() - grupo['desde']
+                restante = self.adiamento_maximo - retido
+                if restante <= 0:
+                    logger.warning(
+                        f"⚠️ Resumo para {destinatario} retido há {retido:.0f}s - enviando acima do limite "
+                        f"de {self.max_por_hora} mensagens/hora"
+                    )
+                else:
+                    if espera > restante:
+                        logger.warning(
+                            f"⏳ Limite de {self.max_por_hora} mensagens/hora para {destinatario} - resumo adiado "
+                            f"{restante:.0f}s até o adiamento máximo de {self.adiamento_maximo:.0f}s"
+                        )
+                    else:
+                        logger.info(f"⏳ Limite de {self.max_por_hora} mensagens/hora para {destinatario} - resumo adiado {espera:.0f}s")
+                    self._agendar(destinatario, min(espera, restante))
+                    return
+
+            del self._grupos[destinatario]
+            self._envios.setdefault(destinatario, deque()).append(time.monotonic())
+
+        buscas = sorted(grupo['secoes'])
+        mensagem = self.formatar([grupo['secoes'][busca] for busca in buscas])
+        chave = hashlib.sha256('|'.join(f"{busca}:{grupo['chaves'][busca]}" for busca in buscas).encode('utf-8')).hexdigest()
+        if self.fila.enfileirar(mensagem, canais=grupo['canais'], chave=f"{destinatario}|{chave[:16]}"):
+            logger.info(f"📦 Resumo com {len(buscas)} busca(s) enfileirado para {destinatario}")
+            for callback in grupo['callbacks'].values():
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Erro após enfileirar resumo de notificações: {e}")
+
+    def liberar_tudo(self):
+        """Enfileirar já todos os resumos em espera (ex: antes de encerrar o processo)"""
+        with self._lock:
+            destinatarios = list(self._grupos)
+            for temporizador in self._temporizadores.values():
+                temporizador.cancel()
+            self._temporizadores = {}
+        for destinatario in destinatarios:
+            self._liberar(destinatario, ignorar_limite=True)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark offline do classificador de disponibilidade
+Roda o classificador de texto sobre o corpus de páginas em fixtures/paginas (sem navegador)
+e mostra precisão/recall, páginas por segundo e alocações. Com um Chrome disponível, também
+avalia o caminho usado pelo bot nos alertas: extrair_ofertas na página carregada e
+classificar_ofertas, com o texto da página como fallback.
+
+Uso:
+    python benchmark_detector.py
+    python benchmark_detector.py --repeticoes 200 --extra pagina_debug.html
+    python benchmark_detector.py --sem-navegador
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+
+# Adicionar o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from detector import ClassificadorDisponibilidade
+from extrator_ofertas import extrair_ofertas
+
+DIRETORIO_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'paginas')
+
+
+def carregar_corpus(diretorio, extras=None):
+    """Carregar as páginas do corpus e seus rótulos (páginas extras entram sem rótulo)"""
+    with open(os.path.join(diretorio, 'rotulos.json'), 'r', encoding='utf-8') as f:
+        rotulos = json.load(f)
+
+    paginas = []
+    for arquivo in sorted(os.listdir(diretorio)):
+        if not arquivo.endswith('.html'):
+            continue
+        with open(os.path.join(diretorio, arquivo), 'r', encoding='utf-8') as f:
+            rotulo = rotulos.get(arquivo)
+            paginas.append({
+                'arquivo': arquivo,
+                'caminho': os.path.join(diretorio, arquivo),
+                'conteudo': f.read(),
+                'esperado': rotulo['disponivel'] if rotulo else None
+            })
+
+    for caminho in extras or []:
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8', errors='replace') as f:
+                paginas.append({'arquivo': caminho, 'caminho': caminho, 'conteudo': f.read(), 'esperado': None})
+        else:
+            print(f"Aviso: página extra '{caminho}' não encontrada")
+
+    return paginas
+
+
+def avaliar(paginas, classificar, campo='previsto'):
+    """Calcular precisão e recall do campo 'disponivel' (classificar(pagina) -> resultado) sobre as páginas rotuladas"""
+    vp = fp = fn = vn = 0
+    erros = []
+    for pagina in paginas:
+        resultado = classificar(pagina) or {'disponivel': False}
+        previsto = resultado['disponivel']
+        pagina[campo] = previsto
+        if pagina['esperado'] is None:
+            continue
+        if previsto and pagina['esperado']:
+            vp += 1
+        elif previsto:
+            fp += 1
+            erros.append((pagina['arquivo'], 'falso positivo'))
+        elif pagina['esperado']:
+            fn += 1
+            erros.append((pagina['arquivo'], 'falso negativo'))
+        else:
+            vn += 1
+
+    precisao = vp / (vp + fp) if vp + fp else 1.0
+    recall = vp / (vp + fn) if vp + fn else 1.0
+    return {'vp': vp, 'fp': fp, 'fn': fn, 'vn': vn, 'precisao': precisao, 'recall': recall, 'erros': erros}
+
+
+def extrair_ofertas_paginas(paginas):
+    """
+    Carregar cada página em um Chrome headless e extrair as ofertas como o bot faz.
+    Retorna False (caminho das ofertas ignorado) quando não há navegador.
+    """
+    try:
+        from unidas_scraper import criar_driver_chrome
+        # O import configura o log do scraper em INFO; o relatório do benchmark fica no stdout
+        logging.getLogger().setLevel(logging.WARNING)
+        driver = criar_driver_chrome()
+    except Exception as e:
+        print(f"Aviso: caminho das ofertas ignorado - navegador indisponível ({e})")
+        return False
+    try:
+        for pagina in paginas:
+            driver.get('file://' + os.path.abspath(pagina['caminho']))
+            pagina['ofertas'] = extrair_ofertas(driver)
+    finally:
+        driver.quit()
+    return True
+
+
+def classificar_como_bot(classificador, pagina):
+    """Mesmo caminho de _classificar_pagina: ofertas estruturadas, com o texto da página como fallback"""
+    resultado = classificador.classificar_ofertas(pagina['ofertas'])
+    pagina['por_ofertas'] = resultado is not None
+    if resultado is None:
+        resultado = classificador.classificar(pagina['conteudo'])
+    return resultado
+
+
+def imprimir_qualidade(qualidade):
+    print(f"Precisão: {qualidade['precisao']:.3f}")
+    print(f"Recall:   {qualidade['recall']:.3f}")
+    print(f"VP={qualidade['vp']} FP={qualidade['fp']} FN={qualidade['fn']} VN={qualidade['vn']}")
+    for arquivo, tipo in qualidade['erros']:
+        print(f"   ❌ {arquivo}: {tipo}")
+
+
+def abaixo_do_minimo(qualidade, args):
+    return (
+        (args.min_precisao is not None and qualidade['precisao'] < args.min_precisao) or
+        (args.min_recall is not None and qualidade['recall'] < args.min_recall)
+    )
+
+
+def medir_desempenho(classificador, paginas, repeticoes):
+    """Medir páginas por segundo e memória alocada pelo classificador"""
+    total_bytes = sum(len(pagina['conteudo'].encode('utf-8')) for pagina in paginas)
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for pagina in paginas:
+            classificador.classificar(pagina['conteudo'])
+    duracao = time.perf_counter() - inicio
+    total_paginas = repeticoes * len(paginas)
+
+    # Alocações medidas em uma passada separada, pois o tracemalloc distorce o tempo
+    tracemalloc.start()
+    for pagina in paginas:
+        classificador.classificar(pagina['conteudo'])
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'paginas': total_paginas,
+        'duracao': duracao,
+        'paginas_por_segundo': total_paginas / duracao if duracao else float('inf'),
+        'mb_por_segundo': (total_bytes * repeticoes / 1024 / 1024) / duracao if duracao else float('inf'),
+        'pico_alocado_kb': pico / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do classificador de disponibilidade")
+    parser.add_argument('--corpus', default=DIRETORIO_CORPUS, help="Diretório com as páginas HTML e rotulos.json")
+    parser.add_argument('--extra', action='append', default=[], help="Página HTML extra sem rótulo (ex: pagina_debug.html)")
+    parser.add_argument('--repeticoes', type=int, default=100, help="Repetições do corpus na medição de velocidade")
+    parser.add_argument('--min-precisao', type=float, default=None, help="Falhar (código 1) abaixo desta precisão")
+    parser.add_argument('--min-recall', type=float, default=None, help="Falhar (código 1) abaixo deste recall")
+    parser.add_argument('--sem-navegador', action='store_true', help="Avaliar só o classificador de texto (sem extrair ofertas no Chrome)")
+    args = parser.parse_args()
+
+    extras = list(args.extra)
+    if not extras and os.path.exists('pagina_debug.html'):
+        extras.append('pagina_debug.html')
+
+    paginas = carregar_corpus(args.corpus, extras)
+    classificador = ClassificadorDisponibilidade()
+
+    print("BENCHMARK DO CLASSIFICADOR DE DISPONIBILIDADE")
+    print("=" * 50)
+    print(f"Páginas no corpus: {len(paginas)} ({sum(1 for p in paginas if p['esperado'] is not None)} rotuladas)")
+
+    qualidade = avaliar(paginas, lambda pagina: classificador.classificar(pagina['conteudo']))
+    print()
+    for pagina in paginas:
+        esperado = '-' if pagina['esperado'] is None else pagina['esperado']
+        print(f"   {pagina['arquivo']}: previsto={pagina['previsto']} esperado={esperado}")
+    print()
+    imprimir_qualidade(qualidade)
+    falhou = abaixo_do_minimo(qualidade, args)
+
+    # Caminho dos alertas: extrair_ofertas + classificar_ofertas (texto como fallback)
+    if not args.sem_navegador and extrair_ofertas_paginas(paginas):
+        qualidade_ofertas = avaliar(paginas, lambda pagina: classificar_como_bot(classificador, pagina), campo='previsto_bot')
+        print()
+        print("CAMINHO DO BOT (extrair_ofertas + classificar_ofertas)")
+        print("=" * 50)
+        for pagina in paginas:
+            esperado = '-' if pagina['esperado'] is None else pagina['esperado']
+            origem = 'ofertas' if pagina['por_ofertas'] else 'texto'
+            print(f"   {pagina['arquivo']}: {len(pagina['ofertas'])} ofertas, previsto={pagina['previsto_bot']} ({origem}) esperado={esperado}")
+        print()
+        imprimir_qualidade(qualidade_ofertas)
+        falhou = falhou or abaixo_do_minimo(qualidade_ofertas, args)
+
+    desempenho = medir_desempenho(classificador, paginas, args.repeticoes)
+    print()
+    print(f"Páginas classificadas: {desempenho['paginas']} em {desempenho['duracao']:.3f}s")
+    print(f"Páginas por segundo:   {desempenho['paginas_por_segundo']:.0f}")
+    print(f"Throughput:            {desempenho['mb_por_segundo']:.1f} MB/s")
+    print(f"Pico de alocação:      {desempenho['pico_alocado_kb']:.1f} KB")
+
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
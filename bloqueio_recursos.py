@@ -0,0 +1,113 @@
+import os
+import json
+import fnmatch
+import logging
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Recursos que não influenciam o texto da página de resultados (sintaxe curinga do Network.setBlockedURLs)
+PADROES_BLOQUEIO_PADRAO = [
+    # Imagens
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    # Fontes
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Mídia
+    '*.mp4', '*.webm', '*.mp3',
+    # Analytics, anúncios e widgets de terceiros
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googleadservices.com*',
+    '*googlesyndication.com*', '*facebook.net*', '*connect.facebook.com*', '*hotjar.com*', '*clarity.ms*',
+    '*tiktok.com*', '*bing.com/bat*', '*criteo.*', '*taboola.com*', '*zendesk.com*', '*zdassets.com*',
+    '*onetrust.com*', '*cookielaw.org*',
+]
+
+# Tamanho médio estimado (bytes) por tipo de recurso, usado para estimar a economia:
+# requisições bloqueadas nunca chegam a ser baixadas, então o tamanho real é desconhecido
+TAMANHO_ESTIMADO = {
+    'Image': 30_000,
+    'Font': 35_000,
+    'Media': 300_000,
+    'Script': 40_000,
+    'Stylesheet': 15_000,
+    'Other': 5_000,
+}
+
+
+def _lista_ambiente(nome):
+    return [padrao.strip() for padrao in os.getenv(nome, '').split(',') if padrao.strip()]
+
+
+def padroes_bloqueio(bloquear=None, permitir=None):
+    """
+    Padrões efetivamente bloqueados: RECURSOS_BLOQUEADOS (ou a lista padrão) mais
+    RECURSOS_BLOQUEADOS_EXTRA, sem os padrões cobertos por RECURSOS_PERMITIDOS
+    """
+    bloquear = bloquear if bloquear is not None else (_lista_ambiente('RECURSOS_BLOQUEADOS') or PADROES_BLOQUEIO_PADRAO)
+    bloquear = list(bloquear) + _lista_ambiente('RECURSOS_BLOQUEADOS_EXTRA')
+    permitir = permitir if permitir is not None else _lista_ambiente('RECURSOS_PERMITIDOS')
+    return [padrao for padrao in bloquear if not any(fnmatch.fnmatchcase(padrao, liberado) for liberado in permitir)]
+
+
+def bloqueio_ativo():
+    return os.getenv('BLOQUEIO_RECURSOS', '1') == '1'
+
+
+def ativar_bloqueio(driver, bloquear=None, permitir=None):
+    """Bloquear recursos pesados na sessão via CDP. Retorna a lista de padrões aplicada (vazia se desativado)."""
+    if not bloqueio_ativo():
+        return []
+    padroes = padroes_bloqueio(bloquear, permitir)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': padroes})
+    except Exception as e:
+        logger.warning(f"Não foi possível bloquear recursos via CDP: {e}")
+        return []
+    logger.info(f"🚫 Bloqueio de recursos ativo ({len(padroes)} padrões)")
+    return padroes
+
+
+def medir_recursos(driver, registrar=True):
+    """
+    Consumir o log de performance do Chrome desde a última leitura e resumir o tráfego:
+    bytes baixados, requisições bloqueadas por tipo e bytes economizados (estimados).
+    registrar=False apenas descarta o log, sem contar nas métricas.
+    """
+    try:
+        entradas = driver.get_log('performance')
+    except Exception as e:
+        logger.debug(f"Log de performance indisponível: {e}")
+        return None
+    if not registrar:
+        return None
+
+    tipos = {}
+    baixados = 0
+    bloqueadas = {}
+    for entrada in entradas:
+        try:
+            mensagem = json.loads(entrada['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        metodo = mensagem.get('method')
+        parametros = mensagem.get('params', {})
+        if metodo == 'Network.requestWillBeSent':
+            tipos[parametros.get('requestId')] = parametros.get('type', 'Other')
+        elif metodo == 'Network.loadingFinished':
+            baixados += parametros.get('encodedDataLength', 0)
+        elif metodo == 'Network.loadingFailed' and parametros.get('blockedReason'):
+            tipo = parametros.get('type') or tipos.get(parametros.get('requestId'), 'Other')
+            bloqueadas[tipo] = bloqueadas.get(tipo, 0) + 1
+
+    economizados = sum(TAMANHO_ESTIMADO.get(tipo, TAMANHO_ESTIMADO['Other']) * total for tipo, total in bloqueadas.items())
+    for tipo, total in bloqueadas.items():
+        METRICAS.incrementar('unidas_recursos_bloqueados_total', total, tipo=tipo)
+    METRICAS.incrementar('unidas_bytes_baixados_total', baixados)
+    METRICAS.incrementar('unidas_bytes_economizados_estimados_total', economizados)
+
+    return {
+        'bytes_baixados': baixados,
+        'requisicoes_bloqueadas': sum(bloqueadas.values()),
+        'bloqueadas_por_tipo': bloqueadas,
+        'bytes_economizados_estimados': economizados
+    }
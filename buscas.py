@@ -0,0 +1,129 @@
+import os
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Palavras-chave de veículos espaçosos (SUV / Minivan) usadas quando a busca não define as suas
+PALAVRAS_VEICULOS_PADRAO = [
+    'suv', 'utilitário', 'minivan', 'van', 'sw5', 'sw7',
+    'jeep', 'compass', 'renegade', 'ecosport', 'duster',
+    'carro minivan', 'minivan 7 lugares', '7 lugares',
+    'chevrolet spin', 'spin', 'fiat doblo', 'doblo',
+    'grupo i', 'categoria i'
+]
+
+
+class Busca:
+    """Critérios de uma busca monitorada (local, período e categorias de interesse)"""
+
+    def __init__(self, nome, local, data_retirada, data_devolucao,
+                 hora_retirada='08:00', hora_devolucao='12:00',
+                 opcao_local=None, categorias=None, palavras_veiculos=None):
+        self.nome = nome
+        self.local = local
+        self.opcao_local = opcao_local
+        self.data_retirada = data_retirada
+        self.data_devolucao = data_devolucao
+        self.hora_retirada = hora_retirada
+        self.hora_devolucao = hora_devolucao
+        self.categorias = categorias or ['SUV', 'Minivan']
+        self.palavras_veiculos = palavras_veiculos or list(PALAVRAS_VEICULOS_PADRAO)
+        self._validar()
+
+    def _validar(self):
+        if not self.nome or not self.local:
+            raise ValueError("Busca precisa de 'nome' e 'local'")
+        try:
+            retirada = datetime.strptime(self.data_retirada, '%Y-%m-%d')
+            devolucao = datetime.strptime(self.data_devolucao, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            raise ValueError(f"Busca '{self.nome}': datas devem estar no formato AAAA-MM-DD")
+        if devolucao < retirada:
+            raise ValueError(f"Busca '{self.nome}': devolução anterior à retirada")
+
+    @property
+    def local_descricao(self):
+        return self.opcao_local or self.local
+
+    def periodo_descricao(self):
+        """Período no formato usado nas mensagens (ex: 26/12 às 08:00 até 03/01 às 12:00)"""
+        retirada = datetime.strptime(self.data_retirada, '%Y-%m-%d').strftime('%d/%m')
+        devolucao = datetime.strptime(self.data_devolucao, '%Y-%m-%d').strftime('%d/%m')
+        return f"{retirada} às {self.hora_retirada} até {devolucao} às {self.hora_devolucao}"
+
+    @classmethod
+    def de_dict(cls, dados):
+        campos = ('nome', 'local', 'data_retirada', 'data_devolucao', 'hora_retirada',
+                  'hora_devolucao', 'opcao_local', 'categorias', 'palavras_veiculos')
+        desconhecidos = set(dados) - set(campos)
+        if desconhecidos:
+            raise ValueError(f"Campos desconhecidos na busca: {', '.join(sorted(desconhecidos))}")
+        return cls(**dados)
+
+    def para_dict(self):
+        return {
+            'nome': self.nome,
+            'local': self.local,
+            'opcao_local': self.opcao_local,
+            'data_retirada': self.data_retirada,
+            'data_devolucao': self.data_devolucao,
+            'hora_retirada': self.hora_retirada,
+            'hora_devolucao': self.hora_devolucao,
+            'categorias': self.categorias,
+            'palavras_veiculos': self.palavras_veiculos
+        }
+
+    def __repr__(self):
+        return f"Busca({self.nome!r}, {self.local!r}, {self.data_retirada} -> {self.data_devolucao})"
+
+
+# Busca original do bot, usada quando nenhum arquivo de buscas é configurado
+BUSCA_PADRAO = Busca(
+    nome='ribeirao-preto-reveillon',
+    local='Ribeirão Preto',
+    opcao_local='Aeroporto de Ribeirão Preto',
+    data_retirada='2025-12-26',
+    data_devolucao='2026-01-03',
+    hora_retirada='08:00',
+    hora_devolucao='12:00',
+    categorias=['SUV 4 portas', 'Minivan 7 lugares', 'Chevrolet Spin', 'Fiat Doblo']
+)
+
+
+def carregar_buscas(caminho=None):
+    """
+    Carregar as buscas de um arquivo JSON ou YAML.
+    Formato: lista de buscas, ou objeto com a chave 'buscas' contendo a lista.
+    """
+    caminho = caminho or os.getenv('ARQUIVO_BUSCAS', 'buscas.json')
+
+    if not os.path.exists(caminho):
+        logger.info(f"Arquivo de buscas '{caminho}' não encontrado - usando busca padrão")
+        return [BUSCA_PADRAO]
+
+    with open(caminho, 'r', encoding='utf-8') as f:
+        if caminho.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML não instalado - use um arquivo .json ou instale com 'pip install pyyaml'")
+            dados = yaml.safe_load(f)
+        else:
+            dados = json.load(f)
+
+    if isinstance(dados, dict):
+        dados = dados.get('buscas', [])
+
+    buscas = [Busca.de_dict(item) for item in dados or []]
+    if not buscas:
+        raise ValueError(f"Nenhuma busca definida em '{caminho}'")
+
+    nomes = [busca.nome for busca in buscas]
+    repetidos = {nome for nome in nomes if nomes.count(nome) > 1}
+    if repetidos:
+        raise ValueError(f"Nomes de busca repetidos: {', '.join(sorted(repetidos))}")
+
+    logger.info(f"{len(buscas)} buscas carregadas de '{caminho}'")
+    return buscas
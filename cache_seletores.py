@@ -0,0 +1,79 @@
+import os
+import logging
+import threading
+from datetime import datetime
+from persistencia import salvar_json_atomico, carregar_json
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+
+class CacheSeletores:
+    """
+    Memória dos seletores do formulário que funcionaram, persistida entre execuções.
+
+    Para cada campo (ex: 'local', 'botao') guarda quantas vezes cada seletor encontrou
+    ou não o elemento e qual funcionou por último. `ordenar` devolve a lista de fallback
+    com o último seletor bem-sucedido primeiro, os demais pela taxa de sucesso, e sem os
+    seletores que o navegador rejeitou como inválidos.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.getenv('ARQUIVO_CACHE_SELETORES', 'cache_seletores.json')
+        self._lock = threading.Lock()
+        self._alterado = False
+        self._campos = carregar_json(self.arquivo, {}) or {}
+
+    def _estatisticas(self, campo, seletor):
+        seletores = self._campos.setdefault(campo, {'ultimo': None, 'seletores': {}})['seletores']
+        return seletores.setdefault(seletor, {'sucessos': 0, 'falhas': 0, 'invalido': False})
+
+    def ordenar(self, campo, seletores):
+        """Seletores na ordem em que devem ser tentados"""
+        with self._lock:
+            dados = self._campos.get(campo, {'ultimo': None, 'seletores': {}})
+            conhecidos = dados['seletores']
+
+            def taxa(seletor):
+                estatisticas = conhecidos.get(seletor, {'sucessos': 0, 'falhas': 0})
+                # Suavização de Laplace: seletores novos começam em 0.5
+                return (estatisticas['sucessos'] + 1) / (estatisticas['sucessos'] + estatisticas['falhas'] + 2)
+
+            validos = [seletor for seletor in seletores if not conhecidos.get(seletor, {}).get('invalido')]
+            ordenados = sorted(validos, key=lambda seletor: (seletor != dados['ultimo'], -taxa(seletor)))
+        return ordenados
+
+    def registrar(self, campo, seletor, sucesso):
+        """Registrar o resultado de uma tentativa; o primeiro seletor tentado conta como acerto/falha do cache"""
+        with self._lock:
+            dados = self._campos.setdefault(campo, {'ultimo': None, 'seletores': {}})
+            estatisticas = self._estatisticas(campo, seletor)
+            if seletor == dados['ultimo']:
+                METRICAS.incrementar('unidas_seletor_cache_total', campo=campo, resultado='acerto' if sucesso else 'falha')
+                if not sucesso:
+                    logger.warning(f"Seletor em cache para '{campo}' não funcionou mais ({seletor}) - layout pode ter mudado")
+            if sucesso:
+                estatisticas['sucessos'] += 1
+                estatisticas['ultimo_sucesso'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                dados['ultimo'] = seletor
+            else:
+                estatisticas['falhas'] += 1
+            self._alterado = True
+
+    def marcar_invalido(self, campo, seletor):
+        """Seletor rejeitado pelo navegador: nunca mais tentar"""
+        with self._lock:
+            self._estatisticas(campo, seletor)['invalido'] = True
+            self._alterado = True
+        logger.warning(f"Seletor inválido descartado para '{campo}': {seletor}")
+
+    def salvar(self):
+        """Gravar o cache se algo mudou desde a última gravação"""
+        with self._lock:
+            if not self._alterado:
+                return
+            try:
+                salvar_json_atomico(self.arquivo, self._campos)
+                self._alterado = False
+            except Exception as e:
+                logger.error(f"Erro ao salvar cache de seletores: {e}")
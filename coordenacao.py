@@ -0,0 +1,253 @@
+import os
+import time
+import socket
+import hashlib
+import logging
+import sqlite3
+import importlib
+import threading
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS nos (
+    no TEXT PRIMARY KEY,
+    visto_em REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS concessoes (
+    recurso TEXT PRIMARY KEY,
+    no TEXT NOT NULL,
+    desde REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS eventos (
+    chave TEXT PRIMARY KEY,
+    no TEXT NOT NULL,
+    expira_em REAL NOT NULL
+);
+"""
+
+# Eventos e nós mortos ficam guardados um dia antes da limpeza (só para diagnóstico)
+RETENCAO = 86400
+
+
+class BackendMemoria:
+    """Coordenação dentro de um único processo (padrão: um nó só, nada a dividir)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nos = {}
+        self._concessoes = {}
+        self._eventos = {}
+
+    def pulsar(self, no, agora):
+        with self._lock:
+            self._nos[no] = agora
+
+    def nos_ativos(self, vivos_desde):
+        with self._lock:
+            return sorted(no for no, visto_em in self._nos.items() if visto_em >= vivos_desde)
+
+    def adquirir(self, recurso, no, agora, vivos_desde):
+        with self._lock:
+            dono = self._concessoes.get(recurso)
+            if dono is None or dono == no or self._nos.get(dono, 0) < vivos_desde:
+                self._concessoes[recurso] = no
+                return True
+            return False
+
+    def liberar(self, recurso, no):
+        with self._lock:
+            if self._concessoes.get(recurso) == no:
+                del self._concessoes[recurso]
+
+    def reivindicar(self, chave, no, agora, expira_em):
+        with self._lock:
+            evento = self._eventos.get(chave)
+            if evento and evento[1] >= agora:
+                return False
+            self._eventos[chave] = (no, expira_em)
+            return True
+
+    def remover_no(self, no):
+        with self._lock:
+            self._nos.pop(no, None)
+            self._concessoes = {recurso: dono for recurso, dono in self._concessoes.items() if dono != no}
+
+    def fechar(self):
+        pass
+
+
+class BackendSQLite:
+    """
+    Coordenação entre processos/réplicas no mesmo host (arquivo SQLite em volume compartilhado).
+    Cada operação é um único upsert atômico; o busy timeout absorve a disputa entre nós.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.getenv('COORDENACAO_ARQUIVO', 'coordenacao.db')
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.arquivo, timeout=30, check_same_thread=False)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute('PRAGMA synchronous=NORMAL')
+        self._conexao.executescript(ESQUEMA)
+
+    def pulsar(self, no, agora):
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT INTO nos (no, visto_em) VALUES (?, ?) ON CONFLICT(no) DO UPDATE SET visto_em = excluded.visto_em",
+                (no, agora)
+            )
+            self._conexao.execute("DELETE FROM nos WHERE visto_em < ?", (agora - RETENCAO,))
+            self._conexao.execute("DELETE FROM eventos WHERE expira_em < ?", (agora - RETENCAO,))
+
+    def nos_ativos(self, vivos_desde):
+        with self._lock:
+            linhas = self._conexao.execute("SELECT no FROM nos WHERE visto_em >= ? ORDER BY no", (vivos_desde,)).fetchall()
+        return [linha[0] for linha in linhas]
+
+    def adquirir(self, recurso, no, agora, vivos_desde):
+        # A concessão só troca de dono se o dono atual parou de pulsar
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                """INSERT INTO concessoes (recurso, no, desde) VALUES (?, ?, ?)
+                   ON CONFLICT(recurso) DO UPDATE SET no = excluded.no, desde = excluded.desde
+                   WHERE concessoes.no != excluded.no
+                     AND concessoes.no NOT IN (SELECT no FROM nos WHERE visto_em >= ?)""",
+                (recurso, no, agora, vivos_desde)
+            )
+            dono = self._conexao.execute("SELECT no FROM concessoes WHERE recurso = ?", (recurso,)).fetchone()
+        return dono is not None and dono[0] == no
+
+    def liberar(self, recurso, no):
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM concessoes WHERE recurso = ? AND no = ?", (recurso, no))
+
+    def reivindicar(self, chave, no, agora, expira_em):
+        with self._lock, self._conexao:
+            cursor = self._conexao.execute(
+                """INSERT INTO eventos (chave, no, expira_em) VALUES (?, ?, ?)
+                   ON CONFLICT(chave) DO UPDATE SET no = excluded.no, expira_em = excluded.expira_em
+                   WHERE eventos.expira_em < ?""",
+                (chave, no, expira_em, agora)
+            )
+        return cursor.rowcount > 0
+
+    def remover_no(self, no):
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM concessoes WHERE no = ?", (no,))
+            self._conexao.execute("DELETE FROM nos WHERE no = ?", (no,))
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+
+class Coordenador:
+    """
+    Divide as buscas entre as réplicas do bot e garante um único envio por evento.
+
+    Cada nó pulsa periodicamente; nós sem pulso há mais de `ttl_no` segundos são dados como
+    mortos. O dono preferido de cada busca é escolhido por rendezvous hashing entre os nós
+    vivos (entrar ou sair um nó só move as buscas dele) e a concessão no armazenamento
+    compartilhado impede que dois nós verifiquem a mesma busca durante a troca de dono.
+    Notificações e relatórios são reivindicados por chave antes do envio: só o primeiro nó
+    a reivindicar envia. Falhas do armazenamento liberam a verificação/envio (melhor duplicar
+    do que perder um alerta).
+    """
+
+    def __init__(self, backend, no=None, ttl_no=None, intervalo_pulso=None):
+        self.backend = backend
+        self.no = no or os.getenv('COORDENACAO_NO') or f"{socket.gethostname()}-{os.getpid()}"
+        self.ttl_no = ttl_no or float(os.getenv('COORDENACAO_TTL_NO', '60'))
+        self.intervalo_pulso = intervalo_pulso or float(os.getenv('COORDENACAO_PULSO', '15'))
+        self._parar = threading.Event()
+        self._thread = None
+        self.pulsar()
+
+    def iniciar(self):
+        # Thread própria: o pulso não pode esperar vaga no agendador ocupado com verificações
+        self._thread = threading.Thread(target=self._pulsar_continuamente, name='pulso-coordenacao', daemon=True)
+        self._thread.start()
+
+    def _pulsar_continuamente(self):
+        while not self._parar.wait(self.intervalo_pulso):
+            self.pulsar()
+
+    def pulsar(self):
+        try:
+            self.backend.pulsar(self.no, time.time())
+            METRICAS.definir('unidas_nos_ativos', len(self.nos_ativos()))
+        except Exception as e:
+            logger.error(f"Erro ao registrar pulso do nó {self.no}: {e}")
+
+    def nos_ativos(self):
+        return self.backend.nos_ativos(time.time() - self.ttl_no)
+
+    def dono_preferido(self, recurso, nos):
+        return max(nos, key=lambda no: hashlib.sha256(f"{no}|{recurso}".encode('utf-8')).hexdigest())
+
+    def assumir(self, recurso):
+        """Este nó deve processar o recurso agora? (dono preferido e com a concessão em mãos)"""
+        try:
+            nos = self.nos_ativos()
+            if self.no not in nos:
+                self.pulsar()
+                nos = self.nos_ativos()
+            if self.dono_preferido(recurso, nos or [self.no]) != self.no:
+                # Devolver a concessão (se era nossa) para o novo dono assumir sem esperar
+                self.backend.liberar(recurso, self.no)
+                METRICAS.incrementar('unidas_coordenacao_total', operacao='cedida')
+                return False
+            agora = time.time()
+            if self.backend.adquirir(recurso, self.no, agora, agora - self.ttl_no):
+                METRICAS.incrementar('unidas_coordenacao_total', operacao='assumida')
+                return True
+            METRICAS.incrementar('unidas_coordenacao_total', operacao='ocupada')
+            return False
+        except Exception as e:
+            logger.error(f"Erro na coordenação de '{recurso}' - processando localmente: {e}")
+            return True
+
+    def reivindicar(self, chave, ttl):
+        """True se este nó é o primeiro a reivindicar o evento nos últimos `ttl` segundos"""
+        try:
+            agora = time.time()
+            if self.backend.reivindicar(chave, self.no, agora, agora + ttl):
+                return True
+            METRICAS.incrementar('unidas_coordenacao_total', operacao='evento_duplicado')
+            return False
+        except Exception as e:
+            logger.error(f"Erro ao reivindicar '{chave}' - enviando mesmo assim: {e}")
+            return True
+
+    def encerrar(self):
+        """Sair do grupo: as buscas deste nó passam para os outros imediatamente"""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        try:
+            self.backend.remover_no(self.no)
+            self.backend.fechar()
+        except Exception as e:
+            logger.warning(f"Erro ao encerrar a coordenação: {e}")
+
+
+def criar_coordenador():
+    """
+    Coordenador a partir de COORDENACAO_BACKEND: 'memoria' (padrão, nó único), 'sqlite'
+    (réplicas no mesmo host) ou 'pacote.modulo:Classe' para um backend próprio com os
+    mesmos métodos de BackendSQLite (ex: Redis ou Postgres entre hosts)
+    """
+    tipo = os.getenv('COORDENACAO_BACKEND', 'memoria').strip()
+    if tipo == 'memoria':
+        backend = BackendMemoria()
+    elif tipo == 'sqlite':
+        backend = BackendSQLite()
+    else:
+        modulo, _, classe = tipo.partition(':')
+        backend = getattr(importlib.import_module(modulo), classe)()
+    coordenador = Coordenador(backend)
+    if tipo != 'memoria':
+        logger.info(f"🤝 Coordenação entre réplicas ({tipo}) como nó '{coordenador.no}'")
+    return coordenador
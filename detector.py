@@ -0,0 +1,158 @@
+import re
+import bisect
+import logging
+from buscas import PALAVRAS_VEICULOS_PADRAO
+
+logger = logging.getLogger(__name__)
+
+PALAVRAS_INDISPONIVEL = ['esgotado', 'indisponível', 'indisponíveis', 'não disponível', 'sem estoque', 'sold out']
+PALAVRAS_DISPONIVEL = ['disponível', 'disponíveis', 'reservar', 'selecionar', 'escolher']
+PALAVRAS_SEM_RESULTADO = ['não encontrado', 'indisponível', 'sem resultado', 'nenhum veículo', 'no results']
+
+VEICULO = 'veiculo'
+INDISPONIVEL = 'indisponivel'
+DISPONIVEL = 'disponivel'
+SEM_RESULTADO = 'sem_resultado'
+
+
+class ClassificadorDisponibilidade:
+    """
+    Classificador de disponibilidade em uma única passada sobre o texto da página.
+    Todos os termos (veículos e status) são compilados em uma só expressão regular;
+    cada veículo é classificado pelo termo de status que o acompanha.
+    """
+
+    def __init__(self, palavras_veiculos=None, janela=500):
+        self.janela = janela
+        self.tipos = {}
+        for tipo, palavras in (
+            (VEICULO, palavras_veiculos or PALAVRAS_VEICULOS_PADRAO),
+            (INDISPONIVEL, PALAVRAS_INDISPONIVEL),
+            (DISPONIVEL, PALAVRAS_DISPONIVEL),
+            (SEM_RESULTADO, PALAVRAS_SEM_RESULTADO),
+        ):
+            for palavra in palavras:
+                self.tipos.setdefault(palavra.lower(), set()).add(tipo)
+
+        # Termos mais longos primeiro: 'minivan 7 lugares' vence 'minivan' na mesma posição.
+        # As bordas de palavra evitam que 'disponível' case dentro de 'indisponível' ou 'van' dentro de 'vantagem';
+        # o 's' opcional aceita plurais ('SUVs', 'Minivans'), que contam como o termo no singular.
+        alternativas = '|'.join(re.escape(termo) for termo in sorted(self.tipos, key=len, reverse=True))
+        self.padrao = re.compile(rf'(?<!\w)({alternativas})s?(?!\w)', re.IGNORECASE)
+
+    def tokens(self, texto):
+        """Lista de (posição, termo) de todos os termos encontrados, em ordem de posição"""
+        return [(m.start(), m.group(1).lower()) for m in self.padrao.finditer(texto)]
+
+    def classificar(self, texto):
+        """Classificar a página e devolver um resultado no formato de verificar_disponibilidade_carros"""
+        veiculos = []
+        status = []
+        encontrados = set()
+        for posicao, termo in self.tokens(texto):
+            tipos = self.tipos[termo]
+            if VEICULO in tipos:
+                veiculos.append((posicao, termo))
+            if INDISPONIVEL in tipos:
+                status.append((posicao, INDISPONIVEL, termo))
+            elif DISPONIVEL in tipos:
+                status.append((posicao, DISPONIVEL, termo))
+            encontrados.update(tipos)
+
+        if veiculos:
+            return self._classificar_veiculos(veiculos, status)
+
+        # Sem veículos de interesse: indicação geral de disponibilidade ou de ausência de resultados
+        if DISPONIVEL in encontrados:
+            termo = next(t for _, tipo, t in status if tipo == DISPONIVEL)
+            logger.info(f"Possível disponibilidade detectada: {termo}")
+            return {
+                'disponivel': True,
+                'veiculos': ['Veículo disponível'],
+                'detalhes': f"Disponibilidade detectada: {termo}"
+            }
+
+        if SEM_RESULTADO in encontrados:
+            logger.info("Nenhuma disponibilidade detectada")
+            return {'disponivel': False, 'veiculos': [], 'detalhes': 'Nenhum veículo disponível'}
+
+        return None
+
+    def classificar_ofertas(self, ofertas):
+        """
+        Classificar a partir de ofertas estruturadas ({grupo, modelo, preco, disponivel}).
+        Retorna None quando nenhuma oferta é de um veículo de interesse.
+        """
+        interesse = []
+        for oferta in ofertas:
+            texto = oferta.get('texto') or f"{oferta.get('grupo', '')} {oferta.get('modelo', '')}"
+            tipos = set()
+            for _, termo in self.tokens(texto):
+                tipos.update(self.tipos[termo])
+            if VEICULO not in tipos:
+                continue
+            registro = {chave: valor for chave, valor in oferta.items() if chave != 'texto'}
+            registro['disponivel'] = bool(oferta.get('disponivel')) and INDISPONIVEL not in tipos
+            interesse.append(registro)
+
+        if not interesse:
+            return None
+
+        disponiveis = [oferta for oferta in interesse if oferta['disponivel']]
+        veiculos = [oferta['modelo'] or oferta['grupo'] for oferta in disponiveis]
+        if disponiveis:
+            detalhes = "Veículos DISPONÍVEIS encontrados: " + ', '.join(
+                f"{nome} (R$ {oferta['preco']:.2f})" if isinstance(oferta.get('preco'), (int, float)) else nome
+                for nome, oferta in zip(veiculos, disponiveis)
+            )
+        else:
+            logger.info("Ofertas de interesse encontradas mas todas esgotadas/indisponíveis")
+            detalhes = 'Veículos encontrados mas esgotados'
+
+        return {
+            'disponivel': bool(disponiveis),
+            'veiculos': veiculos,
+            'ofertas': interesse,
+            'detalhes': detalhes
+        }
+
+    def _classificar_veiculos(self, veiculos, status):
+        """Cada ocorrência de veículo herda o status que a acompanha dentro da janela"""
+        posicoes = [posicao for posicao, _, _ in status]
+        situacao = {}
+        for posicao, termo in veiculos:
+            proximo = self._status_mais_proximo(posicao, posicoes, status)
+            disponivel = proximo is None or proximo[1] == DISPONIVEL
+            if not disponivel:
+                logger.info(f"Veículo {termo} encontrado mas indisponível: {proximo[2]}")
+            # Basta uma ocorrência disponível para o veículo contar como disponível
+            situacao[termo] = situacao.get(termo, False) or disponivel
+
+        logger.info(f"Possíveis veículos encontrados: {list(situacao)}")
+        disponiveis = [termo for termo, disponivel in situacao.items() if disponivel]
+        if disponiveis:
+            return {
+                'disponivel': True,
+                'veiculos': disponiveis,
+                'situacao_veiculos': situacao,
+                'detalhes': f"Veículos DISPONÍVEIS encontrados: {', '.join(disponiveis)}"
+            }
+
+        logger.info("Veículos encontrados mas todos estão esgotados/indisponíveis")
+        return {
+            'disponivel': False,
+            'veiculos': [],
+            'situacao_veiculos': situacao,
+            'detalhes': 'Veículos encontrados mas esgotados'
+        }
+
+    def _status_mais_proximo(self, posicao, posicoes, status):
+        """
+        Status que se aplica ao veículo: o próximo depois dele dentro da janela (nos cards o
+        nome vem antes do status/botão) ou, se não houver, o anterior mais próximo
+        """
+        indice = bisect.bisect_left(posicoes, posicao)
+        for vizinho in (indice, indice - 1):
+            if 0 <= vizinho < len(status) and abs(posicoes[vizinho] - posicao) <= self.janela:
+                return status[vizinho]
+        return None
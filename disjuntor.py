@@ -0,0 +1,176 @@
+import os
+import time
+import random
+import logging
+import threading
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Trechos do título, texto ou HTML de páginas de desafio/bloqueio anti-robô (WAFs e CDNs comuns).
+# Só são procurados quando a página não tem o formulário ou não pôde ser classificada.
+MARCADORES_BLOQUEIO = [
+    'cf-challenge',
+    'cf-chl-',
+    '/cdn-cgi/challenge-platform',
+    'attention required',
+    'just a moment...',
+    'verify you are human',
+    'checking your browser',
+    'access denied',
+    'request blocked',
+    'incapsula incident',
+    'px-captcha',
+    'acesso negado',
+    'acesso bloqueado',
+    'verificação de segurança',
+    'não sou um robô',
+]
+
+# Mensagens do WebDriver (e dos processos trabalhadores) quando o navegador cai
+MARCADORES_NAVEGADOR = [
+    'chrome not reachable',
+    'invalid session id',
+    'session deleted',
+    'disconnected',
+    'tab crashed',
+    'target crashed',
+    'no such window',
+    'connection refused',
+    'max retries exceeded',
+    'encerrado inesperadamente',
+]
+
+EXCECOES_LAYOUT = (
+    'NoSuchElementException',
+    'ElementNotInteractableException',
+    'StaleElementReferenceException',
+    'InvalidSelectorException',
+    'ElementClickInterceptedException',
+)
+
+ESTADOS = {'fechado': 0, 'meio_aberto': 1, 'aberto': 2}
+
+
+def pagina_bloqueada(texto):
+    """O texto (título + conteúdo) é de uma página de desafio anti-robô?"""
+    texto = (texto or '').lower()
+    return any(marcador in texto for marcador in MARCADORES_BLOQUEIO)
+
+
+def classificar_excecao(erro):
+    """Tipo de falha de uma exceção: timeout, navegador, layout ou erro"""
+    nome = type(erro).__name__
+    mensagem = str(erro).lower()
+    if any(marcador in mensagem for marcador in MARCADORES_NAVEGADOR):
+        return 'navegador'
+    if nome == 'TimeoutException' or any(marcador in mensagem for marcador in ('timeout', 'timed out', 'timed_out')):
+        return 'timeout'
+    if nome in EXCECOES_LAYOUT:
+        return 'layout'
+    return 'erro'
+
+
+def tipo_falha(resultado):
+    """Tipo de falha do resultado, ou None se a verificação funcionou"""
+    if resultado.get('falha'):
+        return resultado['falha']
+    detalhes = str(resultado.get('detalhes', ''))
+    if resultado.get('erro') or detalhes.startswith('Erro'):
+        return classificar_excecao(Exception(detalhes))
+    return None
+
+
+class Disjuntor:
+    """
+    Circuit breaker de uma busca.
+
+    Fechado: as verificações rodam normalmente. Após `limite_falhas` falhas seguidas (ou na
+    primeira página de bloqueio anti-robô) o disjuntor abre e as verificações são puladas por
+    uma espera que dobra a cada nova abertura, até `espera_maxima`. Vencida a espera, ele fica
+    meio aberto: uma única verificação de sondagem decide se fecha (site recuperado) ou se
+    abre de novo com espera maior.
+    """
+
+    def __init__(self, nome, limite_falhas=None, espera_base=None, espera_maxima=None):
+        self.nome = nome
+        self.limite_falhas = limite_falhas or int(os.getenv('DISJUNTOR_LIMITE_FALHAS', '3'))
+        self.espera_base = espera_base or float(os.getenv('DISJUNTOR_ESPERA', '300'))
+        self.espera_maxima = espera_maxima or float(os.getenv('DISJUNTOR_ESPERA_MAXIMA', '7200'))
+        self._lock = threading.Lock()
+        self.estado = 'fechado'
+        self.falhas_seguidas = 0
+        self.aberturas = 0
+        self.ultima_falha = None
+        self.reabre_em = 0.0
+        self._sondando = False
+        METRICAS.definir('unidas_disjuntor_estado', ESTADOS['fechado'], busca=nome)
+
+    def _mudar(self, estado):
+        self.estado = estado
+        METRICAS.definir('unidas_disjuntor_estado', ESTADOS[estado], busca=self.nome)
+        METRICAS.incrementar('unidas_disjuntor_transicoes_total', busca=self.nome, estado=estado)
+
+    def permitir(self):
+        """A verificação pode rodar agora? No estado meio aberto, só uma sondagem por vez"""
+        with self._lock:
+            if self.estado == 'fechado':
+                return True
+            if self.estado == 'aberto':
+                if time.monotonic() < self.reabre_em:
+                    return False
+                self._mudar('meio_aberto')
+                logger.info(f"🔌 [{self.nome}] Disjuntor meio aberto - verificação de sondagem")
+            if self._sondando:
+                return False
+            self._sondando = True
+            return True
+
+    def tempo_restante(self):
+        """Segundos até a próxima sondagem (0 se o disjuntor não está aberto)"""
+        with self._lock:
+            if self.estado != 'aberto':
+                return 0.0
+            return max(0.0, self.reabre_em - time.monotonic())
+
+    def registrar(self, resultado):
+        """Atualizar o disjuntor com o resultado de uma verificação"""
+        tipo = tipo_falha(resultado)
+        with self._lock:
+            self._sondando = False
+            if tipo is None:
+                if self.estado != 'fechado':
+                    logger.info(f"✅ [{self.nome}] Site respondeu normalmente - disjuntor fechado")
+                    self._mudar('fechado')
+                self.falhas_seguidas = 0
+                self.aberturas = 0
+                self.ultima_falha = None
+                return
+
+            METRICAS.incrementar('unidas_falhas_total', busca=self.nome, tipo=tipo)
+            self.falhas_seguidas += 1
+            self.ultima_falha = tipo
+            if self.estado == 'meio_aberto' or tipo == 'bloqueio' or self.falhas_seguidas >= self.limite_falhas:
+                self._abrir(tipo)
+
+    def _abrir(self, tipo):
+        self.aberturas += 1
+        espera = min(self.espera_maxima, self.espera_base * 2 ** (self.aberturas - 1))
+        # Jitter de ±10% para as buscas não sondarem o site todas juntas
+        espera *= random.uniform(0.9, 1.1)
+        self.reabre_em = time.monotonic() + espera
+        self._mudar('aberto')
+        logger.warning(
+            f"🔌 [{self.nome}] Disjuntor aberto após {self.falhas_seguidas} falha(s) ({tipo}) - "
+            f"verificações suspensas por {espera:.0f}s"
+        )
+
+    def situacao(self):
+        """Resumo para o /status"""
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'falhas_seguidas': self.falhas_seguidas,
+                'ultima_falha': self.ultima_falha,
+                'sondagem_em': round(max(0.0, self.reabre_em - time.monotonic())) if self.estado == 'aberto' else None
+            }
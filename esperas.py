@@ -0,0 +1,186 @@
+import time
+import logging
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Instrumentação injetada na página: contador de requisições fetch/XHR pendentes
+# e horário da última atividade de rede ou mutação do DOM
+SCRIPT_INSTRUMENTACAO = """
+(function() {
+    if (window.__unidasEspera) { return; }
+    var estado = window.__unidasEspera = {
+        pendentes: 0,
+        ultimaRede: Date.now(),
+        ultimaMutacao: Date.now()
+    };
+    function inicio() { estado.pendentes++; estado.ultimaRede = Date.now(); }
+    function fim() { estado.pendentes = Math.max(0, estado.pendentes - 1); estado.ultimaRede = Date.now(); }
+
+    if (window.fetch) {
+        var fetchOriginal = window.fetch;
+        window.fetch = function() {
+            inicio();
+            return fetchOriginal.apply(this, arguments).then(
+                function(r) { fim(); return r; },
+                function(e) { fim(); throw e; }
+            );
+        };
+    }
+
+    var enviarOriginal = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        inicio();
+        this.addEventListener('loadend', fim);
+        return enviarOriginal.apply(this, arguments);
+    };
+
+    function observar() {
+        new MutationObserver(function() { estado.ultimaMutacao = Date.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    if (document.documentElement) { observar(); }
+    else { document.addEventListener('DOMContentLoaded', observar); }
+})();
+"""
+
+SCRIPT_ESTADO = """
+var estado = window.__unidasEspera;
+if (!estado) { return null; }
+return {
+    pendentes: estado.pendentes,
+    semRede: Date.now() - estado.ultimaRede,
+    semMutacao: Date.now() - estado.ultimaMutacao,
+    recursos: performance.getEntriesByType('resource').length
+};
+"""
+
+
+class EsperaAdaptativa:
+    """Esperas orientadas a condições, com registro do tempo real de cada etapa"""
+
+    def __init__(self, driver, intervalo=0.25, busca=None):
+        self.driver = driver
+        self.intervalo = intervalo
+        self.busca = busca
+        self.registros = []
+        self._instalar_em_novos_documentos()
+
+    def _instalar_em_novos_documentos(self):
+        """Registrar a instrumentação via CDP para que ela rode antes dos scripts da página"""
+        # Sessões reaproveitadas pelo pool já têm o script registrado
+        if getattr(self.driver, '_unidas_instrumentado', False):
+            return
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': SCRIPT_INSTRUMENTACAO})
+            self.driver._unidas_instrumentado = True
+        except Exception as e:
+            logger.debug(f"CDP indisponível, instrumentação será injetada após o carregamento: {e}")
+
+    def _estado_pagina(self):
+        """Ler o estado de rede/mutações da página, injetando a instrumentação se preciso"""
+        estado = self.driver.execute_script(SCRIPT_ESTADO)
+        if estado is None:
+            self.driver.execute_script(SCRIPT_INSTRUMENTACAO)
+            estado = self.driver.execute_script(SCRIPT_ESTADO)
+        return estado
+
+    def limpar_registros(self):
+        self.registros = []
+
+    def tempos(self):
+        """Duração total (em segundos) de cada etapa registrada; etapas repetidas somam as durações"""
+        tempos = {}
+        for registro in self.registros:
+            tempos[registro['etapa']] = round(tempos.get(registro['etapa'], 0.0) + registro['duracao'], 3)
+        return tempos
+
+    def aguardar(self, etapa, condicao, timeout):
+        """
+        Aguardar até a condição retornar um valor verdadeiro ou o timeout expirar.
+        Retorna o valor da condição, ou None em caso de timeout.
+        """
+        inicio = time.monotonic()
+        resultado = None
+        try:
+            resultado = WebDriverWait(self.driver, timeout, poll_frequency=self.intervalo).until(condicao)
+        except TimeoutException:
+            logger.info(f"⏱️ Etapa '{etapa}' atingiu o timeout de {timeout}s")
+
+        duracao = time.monotonic() - inicio
+        self.registros.append({
+            'etapa': etapa,
+            'duracao': round(duracao, 3),
+            'timeout': timeout,
+            'sucesso': resultado is not None
+        })
+        rotulos = {'busca': self.busca} if self.busca else {}
+        METRICAS.observar('unidas_fase_duracao_segundos', duracao, fase=etapa, **rotulos)
+        logger.info(f"⏱️ Etapa '{etapa}' concluída em {duracao:.2f}s")
+        return resultado
+
+    def documento_pronto(self, etapa, timeout):
+        """Aguardar document.readyState == 'complete'"""
+        return self.aguardar(
+            etapa,
+            lambda d: d.execute_script("return document.readyState") == 'complete' or None,
+            timeout
+        )
+
+    def rede_ociosa(self, etapa, timeout, ociosidade=0.5):
+        """Aguardar nenhuma requisição pendente e nenhum recurso novo por `ociosidade` segundos"""
+        ultimo = {'recursos': None, 'desde': time.monotonic()}
+
+        def condicao(driver):
+            estado = self._estado_pagina()
+            agora = time.monotonic()
+            if estado['recursos'] != ultimo['recursos']:
+                ultimo['recursos'] = estado['recursos']
+                ultimo['desde'] = agora
+                return None
+            if estado['pendentes'] == 0 and estado['semRede'] >= ociosidade * 1000 and agora - ultimo['desde'] >= ociosidade:
+                return True
+            return None
+
+        return self.aguardar(etapa, condicao, timeout)
+
+    def sem_mutacoes(self, etapa, timeout, quietude=0.5):
+        """Aguardar o DOM ficar sem mutações por `quietude` segundos"""
+        def condicao(driver):
+            estado = self._estado_pagina()
+            return True if estado['semMutacao'] >= quietude * 1000 else None
+
+        return self.aguardar(etapa, condicao, timeout)
+
+    def elemento_visivel(self, etapa, localizadores, timeout, ao_encontrar=None):
+        """
+        Aguardar o primeiro elemento visível entre uma lista de (By, seletor).
+        ao_encontrar: chamada com o seletor que encontrou o elemento
+        """
+        def condicao(driver):
+            for by, seletor in localizadores:
+                try:
+                    for elemento in driver.find_elements(by, seletor):
+                        if elemento.is_displayed():
+                            if ao_encontrar:
+                                ao_encontrar(seletor)
+                            return elemento
+                except Exception:
+                    continue
+            return None
+
+        return self.aguardar(etapa, condicao, timeout)
+
+    def pagina_estavel(self, etapa, timeout, quietude=0.5):
+        """Documento carregado, rede ociosa e DOM sem mutações, dentro de um único orçamento de tempo"""
+        limite = time.monotonic() + timeout
+
+        def restante():
+            return max(0.1, limite - time.monotonic())
+
+        pronto = self.documento_pronto(f"{etapa}:documento", restante())
+        rede = self.rede_ociosa(f"{etapa}:rede", restante(), quietude)
+        dom = self.sem_mutacoes(f"{etapa}:dom", restante(), quietude)
+        return bool(pronto and rede and dom)
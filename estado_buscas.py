@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from persistencia import salvar_json_atomico, carregar_json
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+
+def assinatura_busca(busca):
+    """Muda quando qualquer critério da busca muda (local, datas, horários...)"""
+    return hashlib.sha256(json.dumps(busca.para_dict(), sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+class EstadoBuscas:
+    """
+    Estado do site após um preenchimento bem-sucedido do formulário de cada busca: URL da
+    página de resultados, cookies e localStorage, persistidos entre execuções.
+
+    As próximas verificações abrem os resultados direto com esse estado. Ele é descartado
+    quando a busca muda, quando passa de `validade` segundos ou quando o site não aceita
+    mais o atalho (o scraper chama `invalidar` e preenche o formulário de novo).
+    """
+
+    def __init__(self, arquivo=None, validade=None):
+        self.arquivo = arquivo or os.getenv('ARQUIVO_ESTADO_BUSCAS', 'estado_buscas.json')
+        self.validade = validade or float(os.getenv('ESTADO_BUSCA_VALIDADE', '21600'))
+        self._lock = threading.Lock()
+        self._estados = carregar_json(self.arquivo, {}) or {}
+
+    def obter(self, busca):
+        """Estado salvo da busca, ou None se não houver, se a busca mudou ou se expirou"""
+        with self._lock:
+            self._recarregar()
+            estado = self._estados.get(busca.nome)
+        if not estado:
+            return None
+        if estado.get('assinatura') != assinatura_busca(busca):
+            self.invalidar(busca, 'critérios da busca mudaram')
+            return None
+        if time.time() - estado.get('salvo_em', 0) > self.validade:
+            self.invalidar(busca, 'estado expirado')
+            return None
+        agora = time.time()
+        # Cookies vencidos não são restaurados
+        estado = dict(estado, cookies=[cookie for cookie in estado.get('cookies', []) if cookie.get('expiry', agora + 1) > agora])
+        return estado
+
+    def _recarregar(self):
+        """Reler o arquivo antes de alterar: outros processos trabalhadores podem ter gravado"""
+        self._estados = carregar_json(self.arquivo, {}) or {}
+
+    def salvar(self, busca, url, cookies, origem, armazenamento):
+        with self._lock:
+            self._recarregar()
+            self._estados[busca.nome] = {
+                'assinatura': assinatura_busca(busca),
+                'url': url,
+                'cookies': cookies,
+                'origem': origem,
+                'local_storage': armazenamento,
+                'salvo_em': time.time(),
+                'salvo_em_texto': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            self._gravar()
+        logger.info(f"💾 [{busca.nome}] Estado da busca salvo ({len(cookies)} cookies): {url}")
+
+    def invalidar(self, busca, motivo):
+        with self._lock:
+            self._recarregar()
+            if self._estados.pop(busca.nome, None) is None:
+                return
+            self._gravar()
+        METRICAS.incrementar('unidas_estado_busca_total', busca=busca.nome, resultado='invalidado')
+        logger.info(f"[{busca.nome}] Estado salvo da busca descartado: {motivo}")
+
+    def _gravar(self):
+        try:
+            salvar_json_atomico(self.arquivo, self._estados)
+        except Exception as e:
+            logger.error(f"Erro ao salvar o estado das buscas: {e}")
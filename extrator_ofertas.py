@@ -0,0 +1,105 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Função JS que localiza os cards de oferta dentro de `raiz` e devolve [{elemento, dados}],
+# compartilhada pela extração em uma chamada e pelo observador de resultados
+FUNCAO_CARDS_OFERTA = """
+function __cardsOferta(raiz, seletores, maxPrecos) {
+var padraoPreco = /R\\$\\s*[\\d.]+(,\\d{2})?/g;
+
+var candidatos = [];
+seletores.forEach(function(seletor) {
+    try {
+        raiz.querySelectorAll(seletor).forEach(function(el) {
+            if (candidatos.indexOf(el) === -1) { candidatos.push(el); }
+        });
+    } catch (e) { /* seletor inválido */ }
+});
+
+// Um card de oferta tem texto visível e poucos preços; listas inteiras têm muitos
+function ehCard(el) {
+    var texto = el.innerText || '';
+    if (!texto.trim() || texto.length > 3000) { return false; }
+    var precos = texto.match(padraoPreco) || [];
+    return precos.length >= 1 && precos.length <= maxPrecos;
+}
+var cards = candidatos.filter(ehCard);
+// Manter apenas os cards mais externos (descarta o div do preço dentro do card)
+cards = cards.filter(function(el) {
+    return !cards.some(function(outro) { return outro !== el && outro.contains(el); });
+});
+
+return cards.map(function(el) {
+    var titulo = el.querySelector('h1, h2, h3, h4, h5, [class*="title"], [class*="nome"], [class*="model"]');
+    var botao = el.querySelector('button, a[class*="btn"], input[type="submit"]');
+    var precos = (el.innerText || '').match(padraoPreco) || [];
+    return {elemento: el, dados: {
+        texto: (el.innerText || '').replace(/\\s+/g, ' ').trim(),
+        titulo: titulo ? titulo.innerText.replace(/\\s+/g, ' ').trim() : '',
+        preco: precos.length ? precos[precos.length - 1] : null,
+        grupo: el.getAttribute('data-category') || el.getAttribute('data-group') || '',
+        botao_desabilitado: botao ? (botao.disabled || botao.getAttribute('aria-disabled') === 'true') : false
+    }};
+});
+}
+"""
+
+# Executado no navegador em uma única chamada: localiza os cards de oferta e devolve
+# apenas os dados necessários, evitando dezenas de find_elements/.text pelo WebDriver
+SCRIPT_EXTRAIR_OFERTAS = FUNCAO_CARDS_OFERTA + """
+return __cardsOferta(document, arguments[0], arguments[1]).map(function(card) { return card.dados; });
+"""
+
+SELETORES_CARDS = [
+    "div[class*='car']",
+    "div[class*='vehicle']",
+    "div[class*='categoria']",
+    "div[class*='grupo']",
+    ".car-item",
+    ".vehicle-item",
+    ".categoria-item",
+    "[data-category]",
+    "[data-car-type]",
+    "article",
+    "li"
+]
+
+PADRAO_GRUPO = re.compile(r'\bgrupo\s+([a-z0-9]{1,3})\b', re.IGNORECASE)
+
+
+def converter_preco(texto):
+    """Converter 'R$ 1.234,56' em 1234.56"""
+    if not texto:
+        return None
+    numero = re.sub(r'[^\d,]', '', texto).replace(',', '.')
+    try:
+        return float(numero)
+    except ValueError:
+        return None
+
+
+def converter_oferta(bruta):
+    """Converter os dados crus de um card (vindos do navegador) em oferta"""
+    texto = bruta.get('texto', '')
+    grupo = bruta.get('grupo') or ''
+    if not grupo:
+        encontrado = PADRAO_GRUPO.search(texto)
+        grupo = f"Grupo {encontrado.group(1).upper()}" if encontrado else ''
+    return {
+        'grupo': grupo,
+        'modelo': bruta.get('titulo') or texto[:80],
+        'preco': converter_preco(bruta.get('preco')),
+        'disponivel': not bruta.get('botao_desabilitado', False),
+        'texto': texto
+    }
+
+
+def extrair_ofertas(driver, seletores=None, max_precos=3):
+    """Extrair as ofertas da página atual em uma única chamada execute_script"""
+    brutas = driver.execute_script(SCRIPT_EXTRAIR_OFERTAS, seletores or SELETORES_CARDS, max_precos) or []
+    ofertas = [converter_oferta(bruta) for bruta in brutas]
+
+    logger.info(f"{len(ofertas)} ofertas extraídas da página")
+    return ofertas
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import uuid
+import queue
+import logging
+import threading
+from datetime import datetime
+from persistencia import salvar_json_atomico, carregar_json
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+
+class FilaNotificacoes:
+    """
+    Fila de envio de notificações em segundo plano.
+
+    Cada canal (ex: whatsapp, desktop, arquivo) tem sua própria thread e fila, então as
+    mensagens de um canal saem na ordem em que foram enfileiradas e um canal lento ou fora
+    do ar não atrasa as verificações. Cada envio tem novas tentativas com espera exponencial.
+    Esgotadas as tentativas, a mensagem passa para o próximo canal da sua lista. Mensagens
+    ainda não entregues ficam na caixa de saída em disco e são reenviadas após um reinício.
+    """
+
+    def __init__(self, canais, arquivo_caixa=None, arquivo_entregas=None, max_tentativas=None,
+                 espera_base=None, janela_dedup=None):
+        # canais: nome -> função(mensagem) ou CanalNotificacao; True quando a mensagem foi entregue
+        self.canais = dict(canais)
+        self.arquivo_caixa = arquivo_caixa or os.getenv('ARQUIVO_CAIXA_SAIDA', 'caixa_saida_notificacoes.json')
+        self.arquivo_entregas = arquivo_entregas or os.getenv('ARQUIVO_ENTREGAS', 'entregas_notificacoes.log')
+        self.max_tentativas = max_tentativas or int(os.getenv('NOTIFICACOES_MAX_TENTATIVAS', '3'))
+        self.espera_base = espera_base or float(os.getenv('NOTIFICACOES_ESPERA_BASE', '2'))
+        self.janela_dedup = janela_dedup or float(os.getenv('NOTIFICACOES_JANELA_DEDUP', '600'))
+
+        self._lock = threading.RLock()
+        self._parar = threading.Event()
+        self._filas = {nome: queue.Queue() for nome in self.canais}
+        self._threads = []
+
+        # Caixa de saída: mensagens enfileiradas e ainda não entregues (ou descartadas)
+        caixa = carregar_json(self.arquivo_caixa, {}) or {}
+        self._pendentes = {item['id']: item for item in caixa.get('pendentes', [])}
+        self._recuperados = list(self._pendentes)
+        # Chaves entregues recentemente (chave -> horário), para descartar mensagens repetidas
+        self._enviadas = dict(caixa.get('enviadas', {}))
+
+    # ---------------------------------------------------------------- entrada
+
+    def _duplicada(self, chave):
+        if not chave:
+            return False
+        agora = time.time()
+        self._enviadas = {c: t for c, t in self._enviadas.items() if agora - t < self.janela_dedup}
+        return chave in self._enviadas or any(item.get('chave') == chave for item in self._pendentes.values())
+
+    def enfileirar(self, mensagem, canais=None, chave=None):
+        """
+        Colocar uma mensagem na fila. canais: ordem de fallback (padrão: todos, na ordem registrada).
+        chave: identifica mensagens equivalentes; repetidas dentro da janela são descartadas.
+        Retorna False se a mensagem foi descartada como duplicada.
+        """
+        canais = [canal for canal in (canais or self.canais) if canal in self.canais]
+        if not canais:
+            logger.error("Nenhum canal de notificação disponível para a mensagem")
+            return False
+
+        with self._lock:
+            if self._duplicada(chave):
+                logger.info(f"📭 Notificação duplicada descartada ({chave})")
+                return False
+            item = {
+                'id': uuid.uuid4().hex,
+                'mensagem': mensagem,
+                'canais': canais,
+                'indice_canal': 0,
+                'chave': chave,
+                'criado': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            self._pendentes[item['id']] = item
+            self._salvar_caixa()
+        self._filas[canais[0]].put(item['id'])
+        return True
+
+    # ----------------------------------------------------------------- envio
+
+    def _salvar_caixa(self):
+        METRICAS.definir('unidas_notificacoes_pendentes', len(self._pendentes))
+        try:
+            salvar_json_atomico(self.arquivo_caixa, {
+                'pendentes': list(self._pendentes.values()),
+                'enviadas': self._enviadas
+            })
+        except Exception as e:
+            logger.error(f"Erro ao salvar caixa de saída de notificações: {e}")
+
+    def _registrar_entrega(self, item, canal, situacao, tentativa, duracao, erro=None):
+        """Anexar uma linha JSON ao log de entregas"""
+        registro = {
+            'momento': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'id': item['id'],
+            'chave': item.get('chave'),
+            'canal': canal,
+            'situacao': situacao,
+            'tentativa': tentativa,
+            'duracao': round(duracao, 3),
+            'criado': item['criado']
+        }
+        if erro:
+            registro['erro'] = erro
+        try:
+            with open(self.arquivo_entregas, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.error(f"Erro ao registrar entrega de notificação: {e}")
+
+    def _enviar(self, canal, mensagens):
+        """
+        Enviar pelo canal: função simples ou objeto com enviar/enviar_lote (whatsapp_notifier.CanalNotificacao).
+        Retorna uma lista com o resultado de cada mensagem.
+        """
+        destino = self.canais[canal]
+        if len(mensagens) > 1 and hasattr(destino, 'enviar_lote'):
+            resultados = destino.enviar_lote(mensagens)
+            if isinstance(resultados, (list, tuple)):
+                return [bool(resultado) for resultado in resultados]
+            return [bool(resultados)] * len(mensagens)
+        enviar = getattr(destino, 'enviar', destino)
+        return [bool(enviar(mensagem)) for mensagem in mensagens]
+
+    def _entregar(self, canal, itens):
+        """
+        Tentar entregar no canal com espera exponencial; esgotado, passar ao próximo canal.
+        Só as mensagens ainda não entregues são repetidas (um lote pode ser entregue em parte).
+        """
+        for tentativa in range(1, self.max_tentativas + 1):
+            inicio = time.monotonic()
+            erro = None
+            try:
+                resultados = self._enviar(canal, [item['mensagem'] for item in itens])
+            except Exception as e:
+                resultados = [False] * len(itens)
+                erro = str(e)
+            duracao = time.monotonic() - inicio
+            METRICAS.observar('unidas_fase_duracao_segundos', duracao, fase='envio_notificacao', canal=canal)
+            entregues = [item for item, sucesso in zip(itens, resultados) if sucesso]
+            itens = [item for item, sucesso in zip(itens, resultados) if not sucesso]
+
+            if entregues:
+                METRICAS.incrementar('unidas_notificacoes_total', len(entregues), canal=canal, situacao='entregue')
+                for item in entregues:
+                    self._registrar_entrega(item, canal, 'entregue', tentativa, duracao)
+                logger.info(f"📨 {len(entregues)} notificação(ões) entregue(s) via {canal} ({tentativa}ª tentativa)")
+                with self._lock:
+                    for item in entregues:
+                        self._pendentes.pop(item['id'], None)
+                        if item.get('chave'):
+                            self._enviadas[item['chave']] = time.time()
+                    self._salvar_caixa()
+            if not itens:
+                return
+
+            METRICAS.incrementar('unidas_notificacoes_total', len(itens), canal=canal, situacao='falha')
+            for item in itens:
+                self._registrar_entrega(item, canal, 'falha', tentativa, duracao, erro)
+            if tentativa < self.max_tentativas:
+                espera = self.espera_base * 2 ** (tentativa - 1)
+                logger.warning(f"Falha ao enviar notificação via {canal}, nova tentativa em {espera:.0f}s")
+                if self._parar.wait(espera):
+                    # Encerrando: as mensagens continuam na caixa de saída para o próximo início
+                    return
+
+        with self._lock:
+            for item in itens:
+                item['indice_canal'] += 1
+                if item['indice_canal'] < len(item['canais']):
+                    proximo = item['canais'][item['indice_canal']]
+                    logger.warning(f"Canal {canal} esgotou as tentativas, usando {proximo}")
+                    self._filas[proximo].put(item['id'])
+                else:
+                    logger.error(f"❌ Notificação não entregue em nenhum canal: {item['canais']}")
+                    self._registrar_entrega(item, canal, 'descartada', self.max_tentativas, 0.0)
+                    self._pendentes.pop(item['id'], None)
+            self._salvar_caixa()
+
+    def _trabalhador(self, canal):
+        fila = self._filas[canal]
+        max_lote = getattr(self.canais[canal], 'max_lote', 1)
+        encerrar = False
+        while not encerrar and not self._parar.is_set():
+            try:
+                identificadores = [fila.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            # Juntar no mesmo envio o que já estiver esperando na fila, até o limite do canal
+            while len(identificadores) < max_lote:
+                try:
+                    identificadores.append(fila.get_nowait())
+                except queue.Empty:
+                    break
+            if None in identificadores:
+                encerrar = True
+                identificadores = [i for i in identificadores if i is not None]
+            with self._lock:
+                itens = [self._pendentes[i] for i in identificadores if i in self._pendentes]
+            if itens:
+                self._entregar(canal, itens)
+
+    # ------------------------------------------------------------ ciclo de vida
+
+    def iniciar(self):
+        """Iniciar as threads dos canais e reenviar o que ficou na caixa de saída"""
+        with self._lock:
+            reenviar = []
+            for identificador in self._recuperados:
+                item = self._pendentes[identificador]
+                # Pular canais que deixaram de existir na configuração
+                while item['indice_canal'] < len(item['canais']) and item['canais'][item['indice_canal']] not in self.canais:
+                    item['indice_canal'] += 1
+                if item['indice_canal'] < len(item['canais']):
+                    reenviar.append(item)
+                else:
+                    del self._pendentes[identificador]
+            self._recuperados = []
+            self._salvar_caixa()
+
+        if reenviar:
+            logger.info(f"📬 Reenviando {len(reenviar)} notificações pendentes da caixa de saída")
+        for item in sorted(reenviar, key=lambda item: item['criado']):
+            self._filas[item['canais'][item['indice_canal']]].put(item['id'])
+
+        for canal in self.canais:
+            thread = threading.Thread(target=self._trabalhador, args=(canal,), name=f"notificacoes-{canal}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def pendentes(self):
+        with self._lock:
+            return len(self._pendentes)
+
+    def encerrar(self, timeout=None):
+        """Aguardar até `timeout` segundos a entrega do que está na fila e parar as threads"""
+        timeout = float(os.getenv('NOTIFICACOES_TIMEOUT_ENCERRAR', '15')) if timeout is None else timeout
+        limite = time.monotonic() + timeout
+        while self.pendentes() and time.monotonic() < limite:
+            time.sleep(0.1)
+        if self.pendentes():
+            logger.warning(f"{self.pendentes()} notificações ficaram na caixa de saída para o próximo início")
+
+        self._parar.set()
+        for fila in self._filas.values():
+            fila.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
@@ -0,0 +1,240 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS verificacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    momento TEXT NOT NULL,
+    busca TEXT NOT NULL,
+    backend TEXT,
+    situacao TEXT NOT NULL,
+    disponivel INTEGER NOT NULL,
+    alterado INTEGER,
+    duracao REAL,
+    tempos TEXT,
+    num_ofertas INTEGER NOT NULL DEFAULT 0,
+    menor_preco REAL,
+    detalhes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_verificacoes_busca_momento ON verificacoes (busca, momento);
+CREATE INDEX IF NOT EXISTS idx_verificacoes_momento ON verificacoes (momento);
+
+CREATE TABLE IF NOT EXISTS ofertas (
+    verificacao_id INTEGER NOT NULL REFERENCES verificacoes (id),
+    grupo TEXT,
+    modelo TEXT,
+    preco REAL,
+    disponivel INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ofertas_verificacao ON ofertas (verificacao_id);
+CREATE INDEX IF NOT EXISTS idx_ofertas_modelo ON ofertas (modelo);
+
+CREATE TABLE IF NOT EXISTS agregados_hora (
+    busca TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    disponiveis INTEGER NOT NULL DEFAULT 0,
+    erros INTEGER NOT NULL DEFAULT 0,
+    notificacoes INTEGER NOT NULL DEFAULT 0,
+    duracao_total REAL NOT NULL DEFAULT 0,
+    duracao_max REAL NOT NULL DEFAULT 0,
+    menor_preco REAL,
+    PRIMARY KEY (busca, periodo)
+);
+
+CREATE TABLE IF NOT EXISTS agregados_dia (
+    busca TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    disponiveis INTEGER NOT NULL DEFAULT 0,
+    erros INTEGER NOT NULL DEFAULT 0,
+    notificacoes INTEGER NOT NULL DEFAULT 0,
+    duracao_total REAL NOT NULL DEFAULT 0,
+    duracao_max REAL NOT NULL DEFAULT 0,
+    menor_preco REAL,
+    PRIMARY KEY (busca, periodo)
+);
+"""
+
+# Incremento O(1) dos agregados: uma linha por (busca, hora) e por (busca, dia)
+UPSERT_AGREGADO = """
+INSERT INTO {tabela} (busca, periodo, tentativas, disponiveis, erros, notificacoes, duracao_total, duracao_max, menor_preco)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (busca, periodo) DO UPDATE SET
+    tentativas = tentativas + excluded.tentativas,
+    disponiveis = disponiveis + excluded.disponiveis,
+    erros = erros + excluded.erros,
+    notificacoes = notificacoes + excluded.notificacoes,
+    duracao_total = duracao_total + excluded.duracao_total,
+    duracao_max = MAX(duracao_max, excluded.duracao_max),
+    menor_preco = CASE
+        WHEN excluded.menor_preco IS NULL THEN menor_preco
+        WHEN menor_preco IS NULL THEN excluded.menor_preco
+        ELSE MIN(menor_preco, excluded.menor_preco)
+    END
+"""
+
+
+def situacao_resultado(resultado):
+    """Classificar o resultado em disponivel / indisponivel / erro / indeterminado"""
+    detalhes = str(resultado.get('detalhes', ''))
+    if resultado.get('erro') or detalhes.startswith('Erro'):
+        return 'erro'
+    if resultado.get('disponivel'):
+        return 'disponivel'
+    if detalhes.startswith('Não foi possível'):
+        return 'indeterminado'
+    return 'indisponivel'
+
+
+class HistoricoVerificacoes:
+    """Histórico de todas as verificações em SQLite (somente inserção), com agregados por hora e por dia"""
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.getenv('ARQUIVO_HISTORICO', 'historico_verificacoes.db')
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.arquivo, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        # WAL: inserções baratas e leituras dos relatórios sem bloquear as escritas
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute('PRAGMA synchronous=NORMAL')
+        self._conexao.executescript(ESQUEMA)
+
+    def _atualizar_agregados(self, busca, momento, tentativas=0, disponiveis=0, erros=0,
+                             notificacoes=0, duracao=0.0, menor_preco=None):
+        for tabela, periodo in (
+            ('agregados_hora', momento.strftime('%Y-%m-%d %H')),
+            ('agregados_dia', momento.strftime('%Y-%m-%d')),
+        ):
+            self._conexao.execute(
+                UPSERT_AGREGADO.format(tabela=tabela),
+                (busca, periodo, tentativas, disponiveis, erros, notificacoes, duracao, duracao, menor_preco)
+            )
+
+    def registrar(self, busca, resultado, momento=None):
+        """Registrar uma verificação, suas ofertas e os agregados em uma única transação"""
+        momento = momento or datetime.now()
+        situacao = situacao_resultado(resultado)
+        ofertas = resultado.get('ofertas') or []
+        precos = [oferta['preco'] for oferta in ofertas
+                  if oferta.get('disponivel') and isinstance(oferta.get('preco'), (int, float))]
+        menor_preco = min(precos) if precos else None
+        duracao = resultado.get('duracao') or 0.0
+
+        try:
+            with self._lock, self._conexao:
+                cursor = self._conexao.execute(
+                    """INSERT INTO verificacoes
+                       (momento, busca, backend, situacao, disponivel, alterado, duracao, tempos, num_ofertas, menor_preco, detalhes)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        momento.strftime('%Y-%m-%d %H:%M:%S'), busca, resultado.get('backend', 'selenium'),
+                        situacao, int(bool(resultado.get('disponivel'))),
+                        None if 'alterado' not in resultado else int(bool(resultado['alterado'])),
+                        duracao, json.dumps(resultado.get('tempos_etapas') or {}),
+                        len(ofertas), menor_preco, resultado.get('detalhes')
+                    )
+                )
+                if ofertas:
+                    self._conexao.executemany(
+                        "INSERT INTO ofertas (verificacao_id, grupo, modelo, preco, disponivel) VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (cursor.lastrowid, oferta.get('grupo'), oferta.get('modelo'),
+                             oferta['preco'] if isinstance(oferta.get('preco'), (int, float)) else None,
+                             int(bool(oferta.get('disponivel'))))
+                            for oferta in ofertas
+                        ]
+                    )
+                self._atualizar_agregados(
+                    busca, momento,
+                    tentativas=1,
+                    disponiveis=int(situacao == 'disponivel'),
+                    erros=int(situacao == 'erro'),
+                    duracao=duracao,
+                    menor_preco=menor_preco
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao registrar verificação no histórico: {e}")
+
+    def registrar_notificacao(self, busca, momento=None):
+        try:
+            with self._lock, self._conexao:
+                self._atualizar_agregados(busca, momento or datetime.now(), notificacoes=1)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao registrar notificação no histórico: {e}")
+
+    def _consultar(self, sql, parametros=()):
+        with self._lock:
+            return [dict(linha) for linha in self._conexao.execute(sql, parametros).fetchall()]
+
+    def resumo_dia(self, dia=None, busca=None):
+        """Totais de um dia (padrão: hoje), de todas as buscas ou de uma só"""
+        dia = dia or datetime.now().strftime('%Y-%m-%d')
+        sql = """SELECT COALESCE(SUM(tentativas), 0) AS tentativas,
+                        COALESCE(SUM(disponiveis), 0) AS disponiveis,
+                        COALESCE(SUM(erros), 0) AS erros,
+                        COALESCE(SUM(notificacoes), 0) AS notificacoes,
+                        COALESCE(SUM(duracao_total), 0) AS duracao_total,
+                        MIN(menor_preco) AS menor_preco
+                 FROM agregados_dia WHERE periodo = ?"""
+        parametros = [dia]
+        if busca:
+            sql += " AND busca = ?"
+            parametros.append(busca)
+        return self._consultar(sql, parametros)[0]
+
+    def resumo_por_busca(self, dia=None):
+        """Totais do dia agrupados por busca"""
+        dia = dia or datetime.now().strftime('%Y-%m-%d')
+        return self._consultar(
+            """SELECT busca, tentativas, disponiveis, erros, notificacoes, duracao_total, menor_preco
+               FROM agregados_dia WHERE periodo = ? ORDER BY busca""",
+            (dia,)
+        )
+
+    def resumo_horas(self, horas=24, busca=None):
+        """Agregados das últimas `horas` horas, em ordem cronológica"""
+        inicio = (datetime.now() - timedelta(hours=horas)).strftime('%Y-%m-%d %H')
+        sql = """SELECT periodo, SUM(tentativas) AS tentativas, SUM(disponiveis) AS disponiveis,
+                        SUM(erros) AS erros, SUM(notificacoes) AS notificacoes,
+                        SUM(duracao_total) / MAX(SUM(tentativas), 1) AS duracao_media
+                 FROM agregados_hora WHERE periodo >= ?"""
+        parametros = [inicio]
+        if busca:
+            sql += " AND busca = ?"
+            parametros.append(busca)
+        sql += " GROUP BY periodo ORDER BY periodo"
+        return self._consultar(sql, parametros)
+
+    def tendencia_precos(self, busca, dias=7):
+        """Menor preço disponível por dia nos últimos `dias` dias"""
+        inicio = (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d')
+        return self._consultar(
+            """SELECT periodo, menor_preco FROM agregados_dia
+               WHERE busca = ? AND periodo >= ? AND menor_preco IS NOT NULL ORDER BY periodo""",
+            (busca, inicio)
+        )
+
+    def ultimo_disponivel(self, busca=None, dia=None):
+        """Momento da última verificação com carro disponível (dia: só até o fim desse dia, 'AAAA-MM-DD')"""
+        sql = "SELECT MAX(momento) AS momento FROM verificacoes WHERE situacao = 'disponivel'"
+        parametros = []
+        if dia:
+            # Intervalo por texto: usa o índice de momento e ignora o que veio depois do dia
+            sql += " AND momento >= ? AND momento < ?"
+            seguinte = (datetime.strptime(dia, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            parametros.extend([dia, seguinte])
+        if busca:
+            sql += " AND busca = ?"
+            parametros.append(busca)
+        return self._consultar(sql, parametros)[0]['momento']
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,97 @@
+import os
+import re
+import copy
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from persistencia import salvar_json_atomico, carregar_json
+
+logger = logging.getLogger(__name__)
+
+# Texto visível da área de resultados (ou do <main>/<body> se não houver container conhecido)
+SCRIPT_TEXTO_RESULTADOS = """
+var seletores = ["[class*='result']", "[data-testid*='offer']", "[class*='offers']", "main", "body"];
+for (var i = 0; i < seletores.length; i++) {
+    var el = document.querySelector(seletores[i]);
+    if (el && el.innerText && el.innerText.trim()) { return el.innerText; }
+}
+return '';
+"""
+
+
+def normalizar_conteudo(texto):
+    """Normalizar o texto para que diferenças irrelevantes (espaços, caixa) não mudem a impressão"""
+    return re.sub(r'\s+', ' ', texto or '').strip().lower()
+
+
+def calcular_impressao(texto):
+    """Impressão digital (SHA-256) do conteúdo normalizado"""
+    return hashlib.sha256(normalizar_conteudo(texto).encode('utf-8')).hexdigest()
+
+
+def impressao_ofertas(ofertas):
+    """Impressão digital de uma lista de ofertas, independente da ordem"""
+    normalizadas = sorted(
+        json.dumps({chave: oferta.get(chave) for chave in ('grupo', 'modelo', 'preco', 'disponivel')}, sort_keys=True, ensure_ascii=False)
+        for oferta in ofertas
+    )
+    return calcular_impressao('\n'.join(normalizadas))
+
+
+class RegistroImpressoes:
+    """
+    Impressões digitais e últimas notificações por busca, persistidas entre execuções.
+    Permite reaproveitar a classificação quando a página não mudou e aplicar cooldown por oferta.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.getenv('ARQUIVO_IMPRESSOES', 'impressoes_digitais.json')
+        self._lock = threading.Lock()
+        self.dados = carregar_json(self.arquivo, {}) or {}
+
+    def _busca(self, nome):
+        return self.dados.setdefault(nome, {'impressao': None, 'resultado': None, 'notificacoes': {}})
+
+    def resultado_se_inalterado(self, nome, impressao):
+        """Cópia do último resultado se a impressão for a mesma; senão None"""
+        with self._lock:
+            registro = self.dados.get(nome)
+            if registro and registro.get('impressao') == impressao and registro.get('resultado') is not None:
+                return copy.deepcopy(registro['resultado'])
+        return None
+
+    def atualizar(self, nome, impressao, resultado):
+        with self._lock:
+            registro = self._busca(nome)
+            registro['impressao'] = impressao
+            registro['resultado'] = copy.deepcopy(resultado)
+            registro['atualizado_em'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._salvar()
+
+    def ofertas_para_notificar(self, nome, chaves, cooldown):
+        """Filtrar as chaves de oferta cuja última notificação foi há mais de `cooldown` segundos"""
+        agora = datetime.now()
+        with self._lock:
+            notificacoes = self._busca(nome)['notificacoes']
+            novas = []
+            for chave in chaves:
+                ultima = notificacoes.get(chave)
+                if ultima is None or (agora - datetime.fromisoformat(ultima)).total_seconds() > cooldown:
+                    novas.append(chave)
+            return novas
+
+    def registrar_notificacao(self, nome, chaves):
+        agora = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            notificacoes = self._busca(nome)['notificacoes']
+            for chave in chaves:
+                notificacoes[chave] = agora
+            self._salvar()
+
+    def _salvar(self):
+        try:
+            salvar_json_atomico(self.arquivo, self.dados)
+        except Exception as e:
+            logger.error(f"Erro ao salvar impressões digitais: {e}")
@@ -0,0 +1,131 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from disjuntor import tipo_falha
+
+logger = logging.getLogger(__name__)
+
+
+class OrcamentoVerificacoes:
+    """Limite global de verificações por hora, compartilhado por todas as buscas"""
+
+    def __init__(self, max_por_hora=None):
+        self.max_por_hora = max_por_hora or int(os.getenv('ORCAMENTO_VERIFICACOES_HORA', '60'))
+        self._verificacoes = deque()
+        self._lock = threading.Lock()
+
+    def _descartar_antigas(self, agora):
+        while self._verificacoes and agora - self._verificacoes[0] >= 3600:
+            self._verificacoes.popleft()
+
+    def registrar(self):
+        with self._lock:
+            agora = time.monotonic()
+            self._descartar_antigas(agora)
+            self._verificacoes.append(agora)
+
+    def usadas(self):
+        with self._lock:
+            self._descartar_antigas(time.monotonic())
+            return len(self._verificacoes)
+
+    def intervalo_minimo(self, total_buscas):
+        """Menor intervalo por busca que mantém o total de verificações dentro do orçamento"""
+        with self._lock:
+            agora = time.monotonic()
+            self._descartar_antigas(agora)
+            minimo = 3600 * total_buscas / self.max_por_hora
+            # Orçamento esgotado: esperar a verificação mais antiga sair da janela de 1 hora
+            if len(self._verificacoes) >= self.max_por_hora:
+                minimo = max(minimo, 3600 - (agora - self._verificacoes[0]))
+            return minimo
+
+
+class IntervaloAdaptativo:
+    """
+    Intervalo de verificação de uma busca ajustado pelo que foi observado:
+    acelera quando as ofertas mudam, perto da data de retirada e nos horários com
+    mais mudanças; desacelera após resultados repetidos. Falhas não mexem no intervalo:
+    o recuo delas é do disjuntor (disjuntor.py), que volta ao ritmo normal ao fechar.
+    """
+
+    def __init__(self, busca, orcamento, total_buscas=1, base=None, minimo=None, maximo=None):
+        self.busca = busca
+        self.orcamento = orcamento
+        self.total_buscas = total_buscas
+        self.base = base or int(os.getenv('INTERVALO_VERIFICACAO', '1800'))
+        self.minimo = minimo or int(os.getenv('INTERVALO_MINIMO', '300'))
+        self.maximo = maximo or int(os.getenv('INTERVALO_MAXIMO', '3600'))
+        self.atual = min(max(self.base, self.minimo), self.maximo)
+        self.ultima_assinatura = None
+        self.repeticoes = 0
+        # Quantidade de mudanças observadas em cada hora do dia
+        self.mudancas_por_hora = [0] * 24
+
+    @staticmethod
+    def assinatura(resultado):
+        """Resumo comparável do conteúdo do resultado"""
+        if resultado.get('impressao'):
+            return resultado['impressao']
+        ofertas = resultado.get('ofertas') or []
+        if ofertas:
+            return tuple(sorted(
+                (str(o.get('grupo')), str(o.get('modelo')), str(o.get('preco')), bool(o.get('disponivel')))
+                for o in ofertas
+            ))
+        return (bool(resultado.get('disponivel')), tuple(sorted(resultado.get('veiculos', []))))
+
+    def registrar(self, resultado):
+        """Atualizar o intervalo a partir do resultado da última verificação"""
+        self.orcamento.registrar()
+
+        if tipo_falha(resultado):
+            # Sem conteúdo para comparar; o recuo após falhas fica com o disjuntor
+            return
+
+        assinatura = self.assinatura(resultado)
+        if self.ultima_assinatura is not None and assinatura != self.ultima_assinatura:
+            self.repeticoes = 0
+            self.mudancas_por_hora[datetime.now().hour] += 1
+            self.atual = max(self.minimo, self.atual / 4)
+            logger.info(f"[{self.busca.nome}] Ofertas mudaram - intervalo reduzido para {self.atual:.0f}s")
+        else:
+            self.repeticoes += 1
+            # Recuar devagar: só depois de dois resultados iguais seguidos
+            if self.repeticoes >= 2:
+                self.atual = min(self.maximo, self.atual * 1.5)
+        self.ultima_assinatura = assinatura
+
+    def _fator_data_retirada(self):
+        """Verificar com mais frequência quando a retirada está próxima"""
+        try:
+            retirada = datetime.strptime(self.busca.data_retirada, '%Y-%m-%d')
+        except ValueError:
+            return 1.0
+        dias = (retirada - datetime.now()).days
+        if dias < 0:
+            return 1.0
+        if dias <= 3:
+            return 0.5
+        if dias <= 7:
+            return 0.75
+        return 1.0
+
+    def _fator_horario(self):
+        """Verificar com mais frequência nos horários em que historicamente houve mudanças"""
+        total = sum(self.mudancas_por_hora)
+        if total < 3:
+            return 1.0
+        media = total / 24
+        return 0.75 if self.mudancas_por_hora[datetime.now().hour] > media else 1.0
+
+    def proximo(self):
+        """Próximo intervalo em segundos, dentro dos limites e do orçamento"""
+        intervalo = self.atual * self._fator_data_retirada() * self._fator_horario()
+        intervalo = min(max(intervalo, self.minimo), self.maximo)
+        intervalo = max(intervalo, self.orcamento.intervalo_minimo(self.total_buscas))
+        logger.info(f"[{self.busca.nome}] Próxima verificação em {intervalo:.0f}s")
+        return intervalo
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos histogramas de duração
+BUCKETS_PADRAO = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+DESCRICOES = {
+    'unidas_fase_duracao_segundos': ('histogram', 'Duração de cada fase da verificação'),
+    'unidas_fase_erros_total': ('counter', 'Fases interrompidas por exceção'),
+    'unidas_seletor_sondagens_total': ('counter', 'Sondagens de seletores do formulário por resultado'),
+    'unidas_seletor_cache_total': ('counter', 'Acertos e falhas do seletor em cache de cada campo do formulário'),
+    'unidas_verificacoes_total': ('counter', 'Verificações concluídas por busca e situação'),
+    'unidas_notificacoes_total': ('counter', 'Tentativas de envio de notificação por canal e situação'),
+    'unidas_notificacoes_pendentes': ('gauge', 'Notificações na caixa de saída aguardando entrega'),
+    'unidas_recursos_bloqueados_total': ('counter', 'Requisições bloqueadas no navegador por tipo de recurso'),
+    'unidas_bytes_baixados_total': ('counter', 'Bytes baixados pelo navegador nas verificações'),
+    'unidas_bytes_economizados_estimados_total': ('counter', 'Estimativa de bytes não baixados por causa do bloqueio'),
+    'unidas_vigia_alteracoes_total': ('counter', 'Cards de oferta novos, alterados ou removidos recebidos no modo vigia'),
+    'unidas_vigia_bytes_total': ('counter', 'Bytes recebidos do navegador pelo observador de resultados'),
+    'unidas_estado_busca_total': ('counter', 'Verificações que abriram os resultados pelo estado salvo e estados descartados'),
+    'unidas_trabalhadores_reiniciados_total': ('counter', 'Processos trabalhadores substituídos por timeout ou falha'),
+    'unidas_cache_driver_total': ('counter', 'Resoluções do navegador/driver servidas pelo cache em disco ou detectadas de novo'),
+    'unidas_navegadores_memoria_mb': ('gauge', 'RSS somado das árvores de processos dos navegadores em uso'),
+    'unidas_navegadores_ativos': ('gauge', 'Sessões de navegador acompanhadas pelo supervisor'),
+    'unidas_navegadores_reiniciados_total': ('counter', 'Navegadores encerrados pelo supervisor'),
+    'unidas_processos_orfaos_encerrados_total': ('counter', 'Processos chrome/chromedriver órfãos encerrados'),
+    'unidas_memoria_verificacao_mb': ('gauge', 'RSS do navegador ao fim da última verificação de cada busca'),
+    'unidas_coordenacao_total': ('counter', 'Buscas assumidas, cedidas ou ocupadas por outro nó e eventos já reivindicados'),
+    'unidas_nos_ativos': ('gauge', 'Réplicas do bot com pulso recente no armazenamento de coordenação'),
+    'unidas_falhas_total': ('counter', 'Verificações com falha por busca e tipo (timeout, bloqueio, layout, navegador, erro)'),
+    'unidas_disjuntor_estado': ('gauge', 'Estado do disjuntor de cada busca (0 fechado, 1 meio aberto, 2 aberto)'),
+    'unidas_disjuntor_transicoes_total': ('counter', 'Mudanças de estado do disjuntor por busca e estado de destino'),
+}
+
+
+def _serie(rotulos):
+    return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+
+def _escapar(valor):
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(serie, extra=None):
+    pares = list(serie) + (list(extra) if extra else [])
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + '}'
+
+
+class Metricas:
+    """Contadores, medidores e histogramas em memória, exportados no formato texto do Prometheus"""
+
+    def __init__(self, buckets=BUCKETS_PADRAO):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._medidores = {}
+        self._histogramas = {}
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        with self._lock:
+            series = self._contadores.setdefault(nome, {})
+            serie = _serie(rotulos)
+            series[serie] = series.get(serie, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        with self._lock:
+            self._medidores.setdefault(nome, {})[_serie(rotulos)] = valor
+
+    def observar(self, nome, valor, **rotulos):
+        with self._lock:
+            series = self._histogramas.setdefault(nome, {})
+            dados = series.setdefault(_serie(rotulos), {'contagens': [0] * len(self.buckets), 'soma': 0.0, 'total': 0})
+            for indice, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    dados['contagens'][indice] += 1
+            dados['soma'] += valor
+            dados['total'] += 1
+
+    @contextmanager
+    def medir(self, fase, **rotulos):
+        """Registrar a duração do bloco no histograma de fases (e contar se terminar em exceção)"""
+        inicio = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.incrementar('unidas_fase_erros_total', fase=fase, **rotulos)
+            raise
+        finally:
+            self.observar('unidas_fase_duracao_segundos', time.monotonic() - inicio, fase=fase, **rotulos)
+
+    def exportar_prometheus(self):
+        """Texto no formato de exposição do Prometheus"""
+        linhas = []
+        with self._lock:
+            for tipo, grupo in (('counter', self._contadores), ('gauge', self._medidores)):
+                for nome, series in sorted(grupo.items()):
+                    ajuda = DESCRICOES.get(nome, (tipo, nome))[1]
+                    linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+                    for serie, valor in sorted(series.items()):
+                        linhas.append(f'{nome}{_formatar_rotulos(serie)} {valor}')
+            for nome, series in sorted(self._histogramas.items()):
+                ajuda = DESCRICOES.get(nome, ('histogram', nome))[1]
+                linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} histogram']
+                for serie, dados in sorted(series.items()):
+                    for limite, contagem in zip(self.buckets, dados['contagens']):
+                        linhas.append(f'{nome}_bucket{_formatar_rotulos(serie, [("le", str(limite))])} {contagem}')
+                    linhas.append(f'{nome}_bucket{_formatar_rotulos(serie, [("le", "+Inf")])} {dados["total"]}')
+                    linhas.append(f'{nome}_sum{_formatar_rotulos(serie)} {dados["soma"]:.6f}')
+                    linhas.append(f'{nome}_count{_formatar_rotulos(serie)} {dados["total"]}')
+        return '\n'.join(linhas) + '\n'
+
+    def resumo_fases(self):
+        """Duração média e total de observações por fase (somando todas as buscas)"""
+        fases = {}
+        with self._lock:
+            for serie, dados in self._histogramas.get('unidas_fase_duracao_segundos', {}).items():
+                fase = dict(serie).get('fase')
+                acumulado = fases.setdefault(fase, {'total': 0, 'soma': 0.0})
+                acumulado['total'] += dados['total']
+                acumulado['soma'] += dados['soma']
+        return {
+            fase: {'observacoes': dados['total'], 'media_segundos': round(dados['soma'] / dados['total'], 3) if dados['total'] else None}
+            for fase, dados in sorted(fases.items())
+        }
+
+
+# Registro compartilhado pelo processo
+METRICAS = Metricas()
+
+
+class ServidorMetricas:
+    """Servidor HTTP local com /metrics (Prometheus) e /status (JSON)"""
+
+    def __init__(self, metricas=None, status=None, host=None, porta=None):
+        self.metricas = metricas or METRICAS
+        self.status = status or (lambda: {})
+        self.host = host or os.getenv('METRICAS_HOST', '127.0.0.1')
+        self.porta = int(os.getenv('METRICAS_PORTA', '9108')) if porta is None else porta
+        self._servidor = None
+
+    def _criar_manipulador(self):
+        servidor = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    if self.path.split('?')[0] == '/metrics':
+                        corpo = servidor.metricas.exportar_prometheus().encode('utf-8')
+                        tipo = 'text/plain; version=0.0.4; charset=utf-8'
+                    elif self.path.split('?')[0] == '/status':
+                        corpo = json.dumps(servidor.status(), ensure_ascii=False, indent=2, default=str).encode('utf-8')
+                        tipo = 'application/json; charset=utf-8'
+                    else:
+                        self.send_error(404)
+                        return
+                except Exception as e:
+                    logger.error(f"Erro ao gerar resposta de métricas: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                logger.debug(f"Métricas: {formato % args}")
+
+        return Manipulador
+
+    def iniciar(self):
+        """Iniciar o servidor em uma thread; porta 0 desativa"""
+        if not self.porta:
+            return False
+        try:
+            self._servidor = ThreadingHTTPServer((self.host, self.porta), self._criar_manipulador())
+        except OSError as e:
+            logger.error(f"Não foi possível iniciar o servidor de métricas em {self.host}:{self.porta}: {e}")
+            return False
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, name='servidor-metricas', daemon=True).start()
+        logger.info(f"📈 Métricas em http://{self.host}:{self.porta}/metrics e /status")
+        return True
+
+    def encerrar(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
@@ -1,12 +1,25 @@
 import os
 import time
+import random
+import asyncio
 import logging
-import schedule
-import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from unidas_scraper import UnidasScraper
-from whatsapp_notifier import NotificadorWhatsApp, NotificadorAlternativo
+from buscas import carregar_buscas
+from intervalo_adaptativo import IntervaloAdaptativo, OrcamentoVerificacoes
+from impressao_digital import RegistroImpressoes
+from cache_seletores import CacheSeletores
+from estado_buscas import EstadoBuscas
+from historico import HistoricoVerificacoes, situacao_resultado
+from metricas import METRICAS, ServidorMetricas
+from whatsapp_notifier import NotificadorWhatsApp, NotificadorAlternativo, criar_canais_notificacao
+from fila_notificacoes import FilaNotificacoes
+from agrupador_notificacoes import AgrupadorNotificacoes
+from trabalhadores import PoolTrabalhadores, tamanho_automatico
+from coordenacao import criar_coordenador
+from disjuntor import Disjuntor, classificar_excecao
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -22,20 +35,310 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class MotorBuscas:
+    """Executa várias buscas em paralelo sobre um conjunto limitado de navegadores"""
+    
+    def __init__(self, buscas, max_navegadores=None, backend=None):
+        self.buscas = {busca.nome: busca for busca in buscas}
+        # 'http' consulta os endpoints JSON direto; 'selenium' (padrão) usa o navegador
+        self.backend = (backend or os.getenv('BACKEND_VERIFICACAO', 'selenium')).lower()
+        # 'threads' (padrão) divide um pool de navegadores entre threads; 'processos' roda cada
+        # verificação em um processo trabalhador com navegador próprio e timeout rígido
+        self.modo_execucao = os.getenv('MODO_EXECUCAO', 'threads').lower()
+        if self.modo_execucao == 'processos':
+            self.max_navegadores = max_navegadores or int(os.getenv('TRABALHADORES', '0')) or tamanho_automatico(len(self.buscas))
+        else:
+            self.max_navegadores = max_navegadores or int(os.getenv('MAX_NAVEGADORES', '2'))
+        self.max_navegadores = max(1, min(self.max_navegadores, len(self.buscas)))
+        self._trabalhadores = None
+        # Modo vigia: cada busca vigiada mantém um navegador próprio com a página de resultados aberta
+        self.vigiadas = self._buscas_vigiadas()
+        self._parar_vigias = threading.Event()
+        self._vigias = []
+        
+        # Selenium, pool e scrapers só são carregados na primeira verificação que usar o navegador:
+        # relatórios e comandos avulsos não pagam a importação nem abrem o supervisor do Chrome
+        self._pool = None
+        self._scrapers = {}
+        self._lock_selenium = threading.RLock()
+        # Impressões digitais dos resultados, compartilhadas entre backends e persistidas entre execuções
+        self.impressoes = RegistroImpressoes()
+        # Seletores do formulário que funcionaram, compartilhados pelas buscas
+        self.cache_seletores = CacheSeletores()
+        # URL dos resultados, cookies e localStorage de cada busca (pula o formulário nas próximas verificações)
+        self.estado_buscas = EstadoBuscas()
+        self.clientes_http = {}
+        if self.backend == 'http':
+            from unidas_http import ClienteHttpUnidas
+            self.clientes_http = {
+                nome: ClienteHttpUnidas(busca, impressoes=self.impressoes)
+                for nome, busca in self.buscas.items()
+            }
+        # Circuit breaker por busca: suspende as verificações de um alvo que está falhando
+        self.disjuntores = {nome: Disjuntor(nome) for nome in self.buscas}
+        self.estados = {
+            nome: {
+                'ultimo_resultado': None,
+                'ultima_verificacao': None
+            }
+            for nome in self.buscas
+        }
+        self._executor = ThreadPoolExecutor(max_workers=self.max_navegadores, thread_name_prefix='busca')
+    
+    @property
+    def pool(self):
+        """Pool compartilhado que limita quantos Chrome ficam abertos ao mesmo tempo (criado sob demanda)"""
+        with self._lock_selenium:
+            if self._pool is None:
+                from unidas_scraper import PoolNavegadores
+                self._pool = PoolNavegadores(tamanho=self.max_navegadores + len(self.vigiadas))
+            return self._pool
+    
+    @property
+    def trabalhadores(self):
+        """Processos trabalhadores (modo 'processos'), iniciados na primeira verificação"""
+        with self._lock_selenium:
+            if self._trabalhadores is None:
+                self._trabalhadores = PoolTrabalhadores(self.max_navegadores)
+                self._trabalhadores.iniciar()
+            return self._trabalhadores
+    
+    def scraper(self, nome):
+        """Scraper Selenium da busca (criado sob demanda)"""
+        with self._lock_selenium:
+            if nome not in self._scrapers:
+                from unidas_scraper import UnidasScraper
+                self._scrapers[nome] = UnidasScraper(
+                    self.buscas[nome], pool=self.pool, impressoes=self.impressoes,
+                    cache_seletores=self.cache_seletores, estado_buscas=self.estado_buscas
+                )
+            return self._scrapers[nome]
+    
+    def _buscas_vigiadas(self):
+        """Buscas em modo vigia (VIGIA_BUSCAS: nomes separados por vírgula, ou * para todas)"""
+        nomes = [nome.strip() for nome in os.getenv('VIGIA_BUSCAS', '').split(',') if nome.strip()]
+        if not nomes:
+            return []
+        if self.backend == 'http':
+            logger.warning("Modo vigia ignorado: o backend HTTP não usa navegador")
+            return []
+        if '*' in nomes:
+            return list(self.buscas)
+        for nome in nomes:
+            if nome not in self.buscas:
+                logger.warning(f"Busca '{nome}' em VIGIA_BUSCAS não existe - ignorada")
+        return [nome for nome in nomes if nome in self.buscas]
+    
+    def iniciar_vigias(self, ao_resultado):
+        """Uma thread por busca vigiada; ao_resultado(nome, resultado) recebe cada resultado entregue"""
+        for nome in self.vigiadas:
+            thread = threading.Thread(target=self._vigiar, args=(nome, ao_resultado), name=f'vigia-{nome}', daemon=True)
+            thread.start()
+            self._vigias.append(thread)
+    
+    def _vigiar(self, nome, ao_resultado):
+        def entregar(resultado):
+            METRICAS.observar('unidas_fase_duracao_segundos', resultado.get('duracao', 0), fase='verificacao',
+                              busca=nome, backend='vigia')
+            estado = self.estados[nome]
+            estado['ultimo_resultado'] = resultado
+            estado['ultima_verificacao'] = datetime.now()
+            self.disjuntores[nome].registrar(resultado)
+            ao_resultado(nome, resultado)
+        
+        self.scraper(nome).vigiar(entregar, self._parar_vigias, disjuntor=self.disjuntores[nome])
+    
+    def verificar_busca(self, nome):
+        """Executar a verificação de uma única busca (HTTP quando configurado, Selenium como fallback)"""
+        inicio = time.monotonic()
+        resultado = None
+        cliente = self.clientes_http.get(nome)
+        if cliente:
+            try:
+                resultado = cliente.executar_verificacao()
+            except Exception as e:
+                logger.warning(f"[{nome}] Backend HTTP falhou ({e}) - usando Selenium como fallback")
+        
+        if resultado is None:
+            if self.modo_execucao == 'processos':
+                resultado = self._verificar_em_trabalhador(nome)
+            else:
+                resultado = self.scraper(nome).executar_verificacao()
+        resultado['duracao'] = round(time.monotonic() - inicio, 3)
+        METRICAS.observar('unidas_fase_duracao_segundos', resultado['duracao'], fase='verificacao',
+                          busca=nome, backend=resultado.get('backend', 'selenium'))
+        estado = self.estados[nome]
+        estado['ultimo_resultado'] = resultado
+        estado['ultima_verificacao'] = datetime.now()
+        return resultado
+    
+    def _verificar_em_trabalhador(self, nome):
+        try:
+            resultado = self.trabalhadores.executar(self.buscas[nome])
+        except Exception as e:
+            logger.error(f"[{nome}] Verificação no trabalhador falhou: {e}")
+            return {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}', 'busca': nome, 'erro': True,
+                    'falha': classificar_excecao(e)}
+        
+        # Os trabalhadores não usam o registro de impressões (único dono do arquivo é este processo):
+        # a comparação com a verificação anterior é feita aqui
+        impressao = resultado.get('impressao')
+        if impressao:
+            resultado['alterado'] = self.impressoes.resultado_se_inalterado(nome, impressao) is None
+            if resultado['alterado']:
+                self.impressoes.atualizar(nome, impressao, resultado)
+        return resultado
+    
+    def verificar_todas(self):
+        """Executar todas as buscas em paralelo e devolver {nome: resultado}"""
+        futuros = {nome: self._executor.submit(self.verificar_busca, nome) for nome in self.buscas}
+        resultados = {}
+        for nome, futuro in futuros.items():
+            try:
+                resultados[nome] = futuro.result()
+            except Exception as e:
+                logger.error(f"Erro na busca '{nome}': {e}")
+                resultados[nome] = {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}', 'busca': nome, 'erro': True}
+        return resultados
+    
+    def encerrar(self):
+        """Parar as vigias e os workers e fechar os navegadores do pool"""
+        self._parar_vigias.set()
+        for thread in self._vigias:
+            thread.join(timeout=60)
+        self._executor.shutdown(wait=True)
+        if self._trabalhadores is not None:
+            self._trabalhadores.encerrar()
+        if self._pool is not None:
+            self._pool.encerrar()
+
+class AgendadorAssincrono:
+    """
+    Agendador baseado em asyncio: cada tarefa dispara no horário (com jitter opcional),
+    roda em um executor e nunca se sobrepõe a uma execução anterior dela mesma.
+    Verificações e tarefas de serviço (relatórios, gravação de estatísticas) usam executores
+    separados: buscas esperando navegador livre não atrasam as tarefas de serviço.
+    """
+    
+    def __init__(self, max_workers=4, max_workers_servicos=2):
+        self.tarefas = {}
+        self._executores = {
+            'verificacoes': ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='agendador'),
+            'servicos': ThreadPoolExecutor(max_workers=max_workers_servicos, thread_name_prefix='servicos')
+        }
+        self._parar = None
+    
+    def agendar(self, nome, funcao, intervalo, jitter=0, imediato=False, grupo='servicos'):
+        """
+        Agendar `funcao` a cada `intervalo` segundos
+        intervalo: número fixo ou função sem argumentos que devolve o próximo intervalo
+                   (com função, o próximo disparo é calculado ao fim de cada execução)
+        jitter: desvio aleatório máximo (em segundos) aplicado a cada disparo
+        grupo: 'verificacoes' (buscas) ou 'servicos' (executor próprio, nunca fica atrás das buscas)
+        """
+        self.tarefas[nome] = {
+            'funcao': funcao,
+            'intervalo': intervalo,
+            'jitter': jitter,
+            'imediato': imediato,
+            'grupo': grupo,
+            'em_execucao': False,
+            'disparo': None,
+            'execucoes': 0,
+            'ignoradas': 0
+        }
+    
+    def proxima_execucao(self, prefixo=''):
+        """(nome, segundos) do próximo disparo entre as tarefas cujo nome começa com `prefixo`, ou None"""
+        agora = time.monotonic()
+        previstas = [
+            (tarefa['disparo'], nome) for nome, tarefa in self.tarefas.items()
+            if nome.startswith(prefixo) and tarefa['disparo'] is not None and not tarefa['em_execucao']
+        ]
+        if not previstas:
+            return None
+        disparo, nome = min(previstas)
+        return nome, max(0.0, disparo - agora)
+    
+    def _proximo_intervalo(self, tarefa):
+        intervalo = tarefa['intervalo']
+        return intervalo() if callable(intervalo) else intervalo
+    
+    async def _executar_uma_vez(self, nome, tarefa):
+        loop = asyncio.get_running_loop()
+        tarefa['em_execucao'] = True
+        inicio = time.monotonic()
+        try:
+            await loop.run_in_executor(self._executores[tarefa['grupo']], tarefa['funcao'])
+            tarefa['execucoes'] += 1
+        except Exception as e:
+            logger.error(f"Erro na tarefa agendada '{nome}': {e}")
+        finally:
+            tarefa['em_execucao'] = False
+            logger.info(f"⏰ Tarefa '{nome}' concluída em {time.monotonic() - inicio:.1f}s")
+    
+    async def _ciclo_tarefa(self, nome, tarefa):
+        # O próximo disparo é calculado a partir do horário previsto, não do fim da execução,
+        # para que execuções longas não acumulem atraso
+        previsto = time.monotonic()
+        if not tarefa['imediato']:
+            previsto += self._proximo_intervalo(tarefa)
+        
+        while not self._parar.is_set():
+            disparo = previsto + random.uniform(-tarefa['jitter'], tarefa['jitter'])
+            tarefa['disparo'] = disparo
+            espera = max(0, disparo - time.monotonic())
+            try:
+                await asyncio.wait_for(self._parar.wait(), timeout=espera)
+                break
+            except asyncio.TimeoutError:
+                pass
+            
+            if callable(tarefa['intervalo']):
+                # Intervalo adaptativo: depende do resultado desta execução
+                await self._executar_uma_vez(nome, tarefa)
+                previsto = time.monotonic() + self._proximo_intervalo(tarefa)
+                continue
+            
+            if tarefa['em_execucao']:
+                tarefa['ignoradas'] += 1
+                logger.warning(f"Tarefa '{nome}' ainda em execução - disparo ignorado")
+            else:
+                asyncio.create_task(self._executar_uma_vez(nome, tarefa))
+            
+            previsto += self._proximo_intervalo(tarefa)
+            # Se ficamos muito atrás (ex: máquina suspensa), realinhar em vez de disparar em rajada
+            if previsto < time.monotonic():
+                previsto = time.monotonic() + self._proximo_intervalo(tarefa)
+    
+    async def executar(self):
+        """Rodar todas as tarefas agendadas até parar() ser chamado"""
+        self._parar = asyncio.Event()
+        try:
+            await asyncio.gather(*(self._ciclo_tarefa(nome, tarefa) for nome, tarefa in self.tarefas.items()))
+        finally:
+            for executor in self._executores.values():
+                executor.shutdown(wait=False)
+    
+    def parar(self):
+        if self._parar is not None:
+            self._parar.set()
+
 class BotMonitorUnidas:
     def __init__(self):
         print("🔧 Inicializando componentes do bot...")
         logger.info("🔧 Inicializando componentes do bot...")
         
         try:
-            print("🌐 Criando scraper...")
-            logger.info("🌐 Criando scraper...")
-            self.scraper = UnidasScraper()
-            print("✅ Scraper criado com sucesso!")
-            logger.info("✅ Scraper criado com sucesso!")
+            print("🌐 Criando motor de buscas...")
+            logger.info("🌐 Criando motor de buscas...")
+            self.buscas = carregar_buscas()
+            self.motor = MotorBuscas(self.buscas)
+            print(f"✅ Motor criado com {len(self.buscas)} buscas e {self.motor.max_navegadores} navegadores!")
+            logger.info(f"✅ Motor criado com {len(self.buscas)} buscas e {self.motor.max_navegadores} navegadores!")
         except Exception as e:
-            print(f"❌ Erro ao criar scraper: {e}")
-            logger.error(f"❌ Erro ao criar scraper: {e}")
+            print(f"❌ Erro ao criar motor de buscas: {e}")
+            logger.error(f"❌ Erro ao criar motor de buscas: {e}")
             raise
         
         try:
@@ -50,231 +353,364 @@ class BotMonitorUnidas:
             )
             print("✅ Notificador WhatsApp configurado!")
             logger.info("✅ Notificador WhatsApp configurado!")
+            
+            # Envio em segundo plano, canais na ordem de fallback: APIs HTTP configuradas,
+            # registro para envio manual do WhatsApp, notificação desktop e arquivo
+            canais = criar_canais_notificacao()
+            canais['whatsapp'] = self.notificador_whatsapp.enviar_mensagem_personalizada
+            self.canais_principais = list(canais)
+            canais['desktop'] = NotificadorAlternativo.criar_notificacao_desktop
+            canais['arquivo'] = NotificadorAlternativo.salvar_em_arquivo
+            self.fila_notificacoes = FilaNotificacoes(canais)
+            self.agrupador_notificacoes = AgrupadorNotificacoes(
+                self.fila_notificacoes, self.notificador_whatsapp.formatar_resumo_disponibilidade
+            )
+            print(f"✅ Canais de notificação: {', '.join(canais)}")
+            logger.info(f"✅ Canais de notificação: {', '.join(canais)}")
+            self.fila_notificacoes.iniciar()
         except Exception as e:
             print(f"❌ Erro ao configurar WhatsApp: {e}")
             logger.error(f"❌ Erro ao configurar WhatsApp: {e}")
             raise
         
-        self.ultimo_horario_notificacao = None
-        self.intervalo_notificacao = 3600  # 1 hora de intervalo entre notificações
-        self.arquivo_estatisticas = 'estatisticas_bot.json'
+        self.intervalo_notificacao = int(os.getenv('NOTIFICATION_COOLDOWN', '3600'))
+        self.intervalo_verificacao = int(os.getenv('INTERVALO_VERIFICACAO', '1800'))
+        self.intervalo_adaptativo = os.getenv('INTERVALO_ADAPTATIVO', '1') == '1'
+        self.orcamento = OrcamentoVerificacoes()
+        self.intervalos = {
+            busca.nome: IntervaloAdaptativo(busca, self.orcamento, total_buscas=len(self.buscas), base=self.intervalo_verificacao)
+            for busca in self.buscas
+        }
+        self.historico = HistoricoVerificacoes()
+        # Réplicas dividem as buscas e reivindicam cada notificação/relatório antes de enviar
+        self.coordenacao = criar_coordenador()
+        self.inicio = datetime.now()
+        self.servidor_metricas = ServidorMetricas(status=self.status)
         
+    def verificar_e_notificar(self):
+        """Função principal de monitoramento: verifica todas as buscas configuradas"""
         try:
-            print("📊 Carregando estatísticas...")
-            logger.info("📊 Carregando estatísticas...")
-            self.carregar_estatisticas()
-            print("✅ Estatísticas carregadas!")
-            logger.info("✅ Estatísticas carregadas!")
+            logger.info(f"Iniciando verificação de {len(self.buscas)} buscas...")
+            resultados = self.motor.verificar_todas()
         except Exception as e:
-            print(f"❌ Erro ao carregar estatísticas: {e}")
-            logger.error(f"❌ Erro ao carregar estatísticas: {e}")
-            raise
+            logger.error(f"Erro em verificar_e_notificar: {str(e)}")
+            # Registrar a falha no histórico de cada busca, como nas verificações agendadas
+            resultados = {
+                nome: {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}', 'busca': nome,
+                       'erro': True, 'falha': classificar_excecao(e)}
+                for nome in self.motor.buscas
+            }
         
-    def verificar_e_notificar(self):
-        """Função principal de monitoramento"""
+        for nome, resultado in resultados.items():
+            self.processar_resultado(nome, resultado)
+    
+    def verificar_busca_e_notificar(self, nome):
+        """Verificar uma única busca e processar o resultado (tarefa do agendador)"""
+        if not self.coordenacao.assumir(f"busca:{nome}"):
+            logger.debug(f"[{nome}] Busca a cargo de outro nó")
+            return
+        # Disjuntor aberto: não abrir navegador contra um alvo que está falhando (nem contar erro)
+        disjuntor = self.motor.disjuntores[nome]
+        if not disjuntor.permitir():
+            logger.info(f"🔌 [{nome}] Verificação suspensa pelo disjuntor (sondagem em {disjuntor.tempo_restante():.0f}s)")
+            return
         try:
-            logger.info("Iniciando verificação de disponibilidade de carros...")
-            
-            # Executar o scraper
-            resultado = self.scraper.executar_verificacao()
-            
-            if resultado.get('disponivel', False):
-                logger.info("Carros disponíveis! Preparando notificação...")
-                self.atualizar_estatisticas('carro_encontrado')
+            resultado = self.motor.verificar_busca(nome)
+        except Exception as e:
+            logger.error(f"Erro na busca '{nome}': {e}")
+            resultado = {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}', 'busca': nome, 'erro': True,
+                         'falha': classificar_excecao(e)}
+        disjuntor.registrar(resultado)
+        self.processar_resultado(nome, resultado)
+        self.intervalos[nome].registrar(resultado)
+    
+    def _proximo_intervalo(self, nome):
+        """Próximo disparo da busca: a sondagem do disjuntor, se aberto; senão o intervalo normal"""
+        restante = self.motor.disjuntores[nome].tempo_restante()
+        if restante > 0:
+            return restante
+        return self.intervalos[nome].proximo() if self.intervalo_adaptativo else self.intervalo_verificacao
+    
+    def processar_resultado(self, nome, resultado):
+        """Registrar no histórico e notificar a partir do resultado de uma busca"""
+        busca = self.motor.buscas[nome]
+        try:
+            if resultado.get('erro'):
+                logger.info(f"[{nome}] Verificação com erro: {resultado.get('detalhes')}")
+            elif resultado.get('disponivel', False):
+                logger.info(f"[{nome}] Carros disponíveis! Preparando notificação...")
                 
-                # Verificar intervalo para evitar spam
-                horario_atual = datetime.now()
-                if (self.ultimo_horario_notificacao is None or 
-                    (horario_atual - self.ultimo_horario_notificacao).seconds > self.intervalo_notificacao):
-                    
-                    # Enviar notificação WhatsApp
-                    sucesso = self.notificador_whatsapp.enviar_notificacao_disponibilidade_carro(resultado)
-                    
-                    if sucesso:
-                        logger.info("Notificação WhatsApp enviada com sucesso")
-                        self.atualizar_estatisticas('notificacao_enviada')
-                        self.ultimo_horario_notificacao = horario_atual
-                    else:
-                        logger.warning("Notificação WhatsApp falhou, tentando alternativas...")
-                        
-                        # Tentar métodos alternativos de notificação
-                        mensagem = f"🚗 Carro disponível na Unidas! Categoria: {', '.join(resultado.get('veiculos', []))}. Datas: 26/12 às 08:00 até 03/01 às 12:00. Retirada no Aeroporto de Ribeirão Preto."
-                        
-                        # Notificação desktop
-                        NotificadorAlternativo.criar_notificacao_desktop(mensagem)
-                        
-                        # Salvar em arquivo
-                        NotificadorAlternativo.salvar_em_arquivo(mensagem)
-                        
-                        self.atualizar_estatisticas('notificacao_enviada')
-                        self.ultimo_horario_notificacao = horario_atual
+                # Página idêntica à última verificação: só notificar ofertas que nunca foram
+                # notificadas (ex: o processo caiu antes de enviar); o cooldown não se renova
+                if resultado.get('alterado', True):
+                    self._notificar_ofertas_novas(nome, busca, resultado, self.intervalo_notificacao)
                 else:
-                    logger.info(f"Intervalo de notificação ativo. Última notificação: {self.ultimo_horario_notificacao}")
+                    logger.info(f"[{nome}] Ofertas inalteradas desde a última verificação")
+                    self._notificar_ofertas_novas(nome, busca, resultado, float('inf'))
             else:
-                logger.info("Nenhum carro disponível no momento")
+                logger.info(f"[{nome}] Nenhum carro disponível no momento")
                 
         except Exception as e:
-            logger.error(f"Erro em verificar_e_notificar: {str(e)}")
-            self.atualizar_estatisticas('erro')
+            logger.error(f"Erro ao processar resultado da busca '{nome}': {str(e)}")
         
-        # Sempre atualizar estatísticas
-        self.atualizar_estatisticas('tentativa')
+        # Tentativas, encontrados e erros dos relatórios vêm dos agregados do histórico
+        METRICAS.incrementar('unidas_verificacoes_total', busca=nome, situacao=situacao_resultado(resultado))
+        self.historico.registrar(nome, resultado)
+    
+    @staticmethod
+    def _chaves_ofertas(resultado):
+        """Identificador de cada oferta disponível, usado no cooldown por oferta"""
+        ofertas = [oferta for oferta in resultado.get('ofertas', []) if oferta.get('disponivel')]
+        if ofertas:
+            return {f"{oferta.get('grupo', '')}|{oferta.get('modelo', '')}": oferta.get('modelo') or oferta.get('grupo') for oferta in ofertas}
+        return {veiculo: veiculo for veiculo in resultado.get('veiculos', [])}
+    
+    def _notificar_ofertas_novas(self, nome, busca, resultado, cooldown):
+        """Notificar apenas as ofertas que não foram notificadas nos últimos `cooldown` segundos"""
+        chaves = self._chaves_ofertas(resultado)
+        novas = self.motor.impressoes.ofertas_para_notificar(nome, list(chaves), cooldown)
+        # Com várias réplicas, só a primeira a reivindicar a oferta no período envia
+        novas = [
+            chave for chave in novas
+            if self.coordenacao.reivindicar(f"oferta:{nome}:{chave}", self.intervalo_notificacao)
+        ]
+        if not novas:
+            logger.info(f"[{nome}] Nenhuma oferta nova para notificar")
+            return
+        
+        resultado_novas = dict(resultado, veiculos=[chaves[chave] for chave in novas])
+        
+        # Agrupar com os alertas de outras buscas em um único resumo (canais configurados,
+        # com desktop e arquivo como alternativas). O cooldown é registrado quando o resumo
+        # entra na fila de envio, que é persistente.
+        secao = self.notificador_whatsapp.formatar_secao_disponibilidade(resultado_novas, busca)
+        
+        def registrar_envio():
+            self.historico.registrar_notificacao(nome)
+            self.motor.impressoes.registrar_notificacao(nome, novas)
+        
+        self.agrupador_notificacoes.adicionar(
+            'padrao', nome, secao, '|'.join(sorted(novas)), ao_enviar=registrar_envio
+        )
+        logger.info(f"[{nome}] Notificação aguardando agrupamento para envio")
     
     def iniciar_monitoramento(self):
         """Iniciar o agendamento de monitoramento"""
         logger.info("Iniciando bot de monitoramento de carros Unidas...")
-        logger.info("Critérios de monitoramento:")
-        logger.info("- Data de retirada: 26/12/2025 às 08:00")
-        logger.info("- Data de devolução: 03/01/2026 às 12:00")
-        logger.info("- Local: Aeroporto de Ribeirão Preto, Ribeirão Preto - SP")
-        logger.info("- Categoria: SUV 4 portas, Minivan 7 lugares, Chevrolet Spin, Fiat Doblo")
-        logger.info("- Verificação: a cada 30 minutos")
+        logger.info("Buscas monitoradas:")
+        for busca in self.buscas:
+            logger.info(f"- [{busca.nome}] {busca.local_descricao} | {busca.periodo_descricao()} | {', '.join(busca.categorias)}")
+        logger.info(f"- Navegadores simultâneos: {self.motor.max_navegadores}"
+                    + (" (processos trabalhadores)" if self.motor.modo_execucao == 'processos' else ""))
+        if self.motor.vigiadas:
+            logger.info(f"- Modo vigia (página de resultados aberta): {', '.join(self.motor.vigiadas)}")
+        if self.intervalo_adaptativo:
+            intervalo = self.intervalos[self.buscas[0].nome]
+            logger.info(f"- Verificação: adaptativa entre {intervalo.minimo // 60} e {intervalo.maximo // 60} minutos (máx. {self.orcamento.max_por_hora} verificações/hora)")
+        else:
+            logger.info(f"- Verificação: a cada {self.intervalo_verificacao // 60} minutos")
         logger.info("- Relatório: a cada 1 hora")
         
-        # Agendar o trabalho a cada 30 minutos
-        schedule.every(30).minutes.do(self.verificar_e_notificar)
+        # Uma thread por navegador para as verificações; relatórios e estatísticas têm executor próprio
+        self.agendador = AgendadorAssincrono(max_workers=self.motor.max_navegadores)
         
-        # Agendar relatório a cada 1 hora
-        schedule.every().hour.do(self.enviar_relatorio_horario)
+        # /metrics (Prometheus) e /status (JSON) em um servidor HTTP local
+        self.servidor_metricas.iniciar()
         
-        # Executar verificação inicial
-        self.verificar_e_notificar()
+        # Uma tarefa por busca: buscas diferentes rodam em paralelo, a mesma nunca se sobrepõe.
+        # O jitter espalha as buscas para não abrirem todos os navegadores no mesmo instante.
+        jitter = min(60, self.intervalo_verificacao / 10)
+        for nome in self.motor.buscas:
+            if nome in self.motor.vigiadas:
+                continue
+            self.agendador.agendar(
+                f"busca:{nome}",
+                lambda nome=nome: self.verificar_busca_e_notificar(nome),
+                lambda nome=nome: self._proximo_intervalo(nome),
+                jitter=jitter,
+                imediato=True,
+                grupo='verificacoes'
+            )
+        
+        self.coordenacao.iniciar()
+        
+        # Buscas vigiadas entregam resultados a cada recarga suave e a cada mudança nos cards
+        self.motor.iniciar_vigias(self.processar_resultado)
+        
+        # Agendar relatório a cada 1 hora
+        self.agendador.agendar('relatorio_horario', self.enviar_relatorio_horario, 3600)
         
         # Manter o bot em execução
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Verificar a cada minuto por trabalhos agendados
+        asyncio.run(self.agendador.executar())
     
     def executar_verificacao_unica(self):
         """Executar uma única verificação (para teste)"""
         logger.info("Executando verificação única de disponibilidade...")
         self.verificar_e_notificar()
     
-    def carregar_estatisticas(self):
-        """Carregar estatísticas do arquivo JSON"""
-        try:
-            if os.path.exists(self.arquivo_estatisticas):
-                with open(self.arquivo_estatisticas, 'r', encoding='utf-8') as f:
-                    self.estatisticas = json.load(f)
-            else:
-                self.resetar_estatisticas_diarias()
-        except Exception as e:
-            logger.error(f"Erro ao carregar estatísticas: {e}")
-            self.resetar_estatisticas_diarias()
-    
-    def resetar_estatisticas_diarias(self):
-        """Resetar estatísticas para um novo dia"""
-        self.estatisticas = {
-            'data': datetime.now().strftime('%Y-%m-%d'),
-            'tentativas': 0,
-            'carros_encontrados': 0,
-            'notificacoes_enviadas': 0,
-            'erros': 0,
-            'ultimo_carro_encontrado': None
-        }
-        self.salvar_estatisticas()
-    
-    def atualizar_estatisticas(self, tipo, dados=None):
-        """Atualizar estatísticas baseado no tipo de evento"""
-        data_hoje = datetime.now().strftime('%Y-%m-%d')
-        
-        # Se mudou o dia, resetar estatísticas
-        if self.estatisticas.get('data') != data_hoje:
-            self.resetar_estatisticas_diarias()
-        
-        if tipo == 'tentativa':
-            self.estatisticas['tentativas'] += 1
-        elif tipo == 'carro_encontrado':
-            self.estatisticas['carros_encontrados'] += 1
-            self.estatisticas['ultimo_carro_encontrado'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        elif tipo == 'notificacao_enviada':
-            self.estatisticas['notificacoes_enviadas'] += 1
-        elif tipo == 'erro':
-            self.estatisticas['erros'] += 1
-        
-        self.salvar_estatisticas()
+    def encerrar(self):
+        """Liberar navegadores, enviar o que estiver na fila e fechar o histórico antes de sair"""
+        self.servidor_metricas.encerrar()
+        self.motor.encerrar()
+        self.agrupador_notificacoes.liberar_tudo()
+        self.fila_notificacoes.encerrar()
+        self.historico.fechar()
+        self.coordenacao.encerrar()
     
-    def salvar_estatisticas(self):
-        """Salvar estatísticas no arquivo JSON"""
-        try:
-            with open(self.arquivo_estatisticas, 'w', encoding='utf-8') as f:
-                json.dump(self.estatisticas, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Erro ao salvar estatísticas: {e}")
+    def status(self):
+        """Estado atual do bot para o endpoint /status"""
+        buscas = {}
+        for nome, estado in self.motor.estados.items():
+            resultado = estado['ultimo_resultado'] or {}
+            buscas[nome] = {
+                'ultima_verificacao': estado['ultima_verificacao'],
+                'situacao': situacao_resultado(resultado) if resultado else None,
+                'disponivel': resultado.get('disponivel'),
+                'veiculos': resultado.get('veiculos', []),
+                'backend': resultado.get('backend'),
+                'modo': 'vigia' if nome in self.motor.vigiadas else 'agendada',
+                'duracao': resultado.get('duracao'),
+                'tempos_etapas': resultado.get('tempos_etapas', {}),
+                'recursos': resultado.get('recursos'),
+                'memoria_mb': resultado.get('memoria_mb'),
+                'disjuntor': self.motor.disjuntores[nome].situacao(),
+                'intervalo_atual': round(self.intervalos[nome].atual) if nome in self.intervalos else None
+            }
+        return {
+            'inicio': self.inicio,
+            'tempo_ativo_segundos': round((datetime.now() - self.inicio).total_seconds()),
+            'backend': self.motor.backend,
+            'modo_execucao': self.motor.modo_execucao,
+            'no': self.coordenacao.no,
+            'nos_ativos': self.coordenacao.nos_ativos(),
+            'navegadores': self.motor.max_navegadores,
+            'verificacoes_ultima_hora': self.orcamento.usadas(),
+            'notificacoes_pendentes': self.fila_notificacoes.pendentes(),
+            'estatisticas_hoje': self.historico.resumo_dia(),
+            'fases': METRICAS.resumo_fases(),
+            'buscas': buscas
+        }
     
     def enviar_relatorio_horario(self):
         """Enviar relatório a cada 1 hora"""
         try:
+            agora = datetime.now()
+            if not self.coordenacao.reivindicar(f"relatorio_horario:{agora.strftime('%Y-%m-%d %H')}", 3600):
+                logger.info("Relatório horário já enviado por outro nó")
+                return
             logger.info("Gerando relatório horário...")
             
-            hora_atual = datetime.now().strftime('%H:%M')
-            data_atual = datetime.now().strftime('%d/%m/%Y')
+            hora_atual = agora.strftime('%H:%M')
+            data_atual = agora.strftime('%d/%m/%Y')
+            
+            # Totais do dia vêm dos agregados do histórico
+            resumo = self.historico.resumo_dia()
+            ultimo_carro = self.historico.ultimo_disponivel(dia=agora.strftime('%Y-%m-%d'))
             
             # Preparar mensagem do relatório
             mensagem = f"📊 *RELATÓRIO HORÁRIO - UNIDAS BOT*\n"
             mensagem += f"📅 Data: {data_atual} - {hora_atual}\n\n"
-            mensagem += f"🔍 Tentativas hoje: {self.estatisticas.get('tentativas', 0)}\n"
-            mensagem += f"🚗 Carros encontrados hoje: {self.estatisticas.get('carros_encontrados', 0)}\n"
-            mensagem += f"📱 Notificações enviadas: {self.estatisticas.get('notificacoes_enviadas', 0)}\n"
-            mensagem += f"❌ Erros ocorridos: {self.estatisticas.get('erros', 0)}\n\n"
+            mensagem += f"🔍 Tentativas hoje: {resumo['tentativas']}\n"
+            mensagem += f"🚗 Carros encontrados hoje: {resumo['disponiveis']}\n"
+            mensagem += f"📱 Notificações enviadas: {resumo['notificacoes']}\n"
+            mensagem += f"❌ Erros ocorridos: {resumo['erros']}\n"
+            mensagem += self._linha_desempenho(resumo) + "\n"
             
-            if self.estatisticas.get('ultimo_carro_encontrado'):
-                mensagem += f"🕐 Último carro encontrado: {self.estatisticas.get('ultimo_carro_encontrado')}\n\n"
+            if ultimo_carro and ultimo_carro.startswith(agora.strftime('%Y-%m-%d')):
+                mensagem += f"🕐 Último carro encontrado: {ultimo_carro}\n\n"
             else:
                 mensagem += f"ℹ️ Nenhum carro encontrado hoje\n\n"
             
+            mensagem += self._resumo_por_busca()
+            
             mensagem += f"🔄 Bot funcionando normalmente\n"
-            mensagem += f"⏰ Próxima verificação: a cada 30 minutos\n"
+            mensagem += self._linha_proxima_verificacao()
             mensagem += f"📈 Próximo relatório: em 1 hora"
             
-            # Enviar relatório via WhatsApp
-            sucesso = self.notificador_whatsapp.enviar_mensagem_personalizada(mensagem)
-            
-            if sucesso:
-                logger.info("Relatório horário enviado com sucesso")
-            else:
-                logger.warning("Falha ao enviar relatório horário via WhatsApp")
-                # Salvar em arquivo como backup
-                NotificadorAlternativo.salvar_em_arquivo(f"RELATÓRIO HORÁRIO: {mensagem}")
+            # Enviar relatório (em segundo plano, com arquivo como backup)
+            self.fila_notificacoes.enfileirar(
+                mensagem, canais=self.canais_principais + ['arquivo'], chave=f"relatorio_horario|{datetime.now().strftime('%Y-%m-%d %H')}"
+            )
+            logger.info("Relatório horário enfileirado para envio")
             
         except Exception as e:
             logger.error(f"Erro ao enviar relatório horário: {str(e)}")
     
+    def _linha_proxima_verificacao(self):
+        """Próxima verificação prevista no agendador (o intervalo varia por busca)"""
+        agendador = getattr(self, 'agendador', None)
+        proxima = agendador.proxima_execucao('busca:') if agendador else None
+        if proxima is None:
+            if agendador and any(tarefa['em_execucao'] for nome, tarefa in agendador.tarefas.items() if nome.startswith('busca:')):
+                return "⏰ Verificações em andamento\n"
+            if self.motor.vigiadas and len(self.motor.vigiadas) == len(self.buscas):
+                return "⏰ Verificação contínua (modo vigia)\n"
+            return f"⏰ Próxima verificação: a cada {self.intervalo_verificacao // 60} minutos\n"
+        nome, segundos = proxima
+        horario = (datetime.now() + timedelta(seconds=segundos)).strftime('%H:%M')
+        return f"⏰ Próxima verificação: {horario} (em {segundos / 60:.0f} min, {nome.split(':', 1)[1]})\n"
+    
+    @staticmethod
+    def _linha_desempenho(resumo):
+        """Duração média por verificação e menor preço do período"""
+        linha = ""
+        if resumo['tentativas']:
+            linha += f"⏱️ Duração média: {resumo['duracao_total'] / resumo['tentativas']:.1f}s\n"
+        if resumo.get('menor_preco') is not None:
+            linha += f"💰 Menor preço disponível: R$ {resumo['menor_preco']:.2f}\n"
+        return linha
+    
+    def _resumo_por_busca(self, dia=None):
+        """Linhas do relatório com os contadores de cada busca"""
+        por_busca = self.historico.resumo_por_busca(dia)
+        if len(por_busca) < 2:
+            return ""
+        
+        resumo = "🔎 Por busca:\n"
+        for dados in por_busca:
+            resumo += f"• {dados['busca']}: {dados['tentativas']} tentativas, {dados['disponiveis']} encontrados, {dados['erros']} erros\n"
+        return resumo + "\n"
+    
     def enviar_relatorio_diario(self):
         """Enviar relatório diário às 1h da manhã (mantido para compatibilidade)"""
         try:
+            ontem = datetime.now() - timedelta(days=1)
+            data_ontem = ontem.strftime('%d/%m/%Y')
+            dia = ontem.strftime('%Y-%m-%d')
+            if not self.coordenacao.reivindicar(f"relatorio_diario:{dia}", 86400):
+                logger.info("Relatório diário já enviado por outro nó")
+                return
             logger.info("Gerando relatório diário...")
             
-            data_ontem = (datetime.now() - timedelta(days=1)).strftime('%d/%m/%Y')
+            
+            # Totais de ontem vêm dos agregados do histórico
+            resumo = self.historico.resumo_dia(dia)
+            ultimo_carro = self.historico.ultimo_disponivel(dia=dia)
             
             # Preparar mensagem do relatório
             mensagem = f"📊 *RELATÓRIO DIÁRIO - UNIDAS BOT*\n"
             mensagem += f"📅 Data: {data_ontem}\n\n"
-            mensagem += f"🔍 Tentativas de verificação: {self.estatisticas.get('tentativas', 0)}\n"
-            mensagem += f"🚗 Carros disponíveis encontrados: {self.estatisticas.get('carros_encontrados', 0)}\n"
-            mensagem += f"📱 Notificações enviadas: {self.estatisticas.get('notificacoes_enviadas', 0)}\n"
-            mensagem += f"❌ Erros ocorridos: {self.estatisticas.get('erros', 0)}\n\n"
+            mensagem += f"🔍 Tentativas de verificação: {resumo['tentativas']}\n"
+            mensagem += f"🚗 Carros disponíveis encontrados: {resumo['disponiveis']}\n"
+            mensagem += f"📱 Notificações enviadas: {resumo['notificacoes']}\n"
+            mensagem += f"❌ Erros ocorridos: {resumo['erros']}\n"
+            mensagem += self._linha_desempenho(resumo) + "\n"
             
-            if self.estatisticas.get('ultimo_carro_encontrado'):
-                mensagem += f"🕐 Último carro encontrado: {self.estatisticas.get('ultimo_carro_encontrado')}\n\n"
+            if ultimo_carro and ultimo_carro.startswith(dia):
+                mensagem += f"🕐 Último carro encontrado: {ultimo_carro}\n\n"
             else:
                 mensagem += f"ℹ️ Nenhum carro foi encontrado ontem\n\n"
             
-            mensagem += f"🔄 Bot funcionando normalmente\n"
-            mensagem += f"⏰ Próxima verificação: a cada 30 minutos"
-            
-            # Enviar relatório via WhatsApp
-            sucesso = self.notificador_whatsapp.enviar_mensagem_personalizada(mensagem)
+            mensagem += self._resumo_por_busca(dia)
             
-            if sucesso:
-                logger.info("Relatório diário enviado com sucesso")
-            else:
-                logger.warning("Falha ao enviar relatório diário via WhatsApp")
-                # Salvar em arquivo como backup
-                NotificadorAlternativo.salvar_em_arquivo(f"RELATÓRIO DIÁRIO: {mensagem}")
+            mensagem += f"🔄 Bot funcionando normalmente\n"
+            mensagem += self._linha_proxima_verificacao().rstrip('\n')
             
-            # Resetar estatísticas para o novo dia
-            self.resetar_estatisticas_diarias()
+            # Enviar relatório (em segundo plano, com arquivo como backup)
+            self.fila_notificacoes.enfileirar(
+                mensagem, canais=self.canais_principais + ['arquivo'], chave=f"relatorio_diario|{dia}"
+            )
+            logger.info("Relatório diário enfileirado para envio")
             
         except Exception as e:
             logger.error(f"Erro ao enviar relatório diário: {str(e)}")
@@ -298,6 +734,7 @@ def main():
             print("🧪 Modo teste ativado")
             logger.info("🧪 Modo teste ativado")
             bot.executar_verificacao_unica()
+            bot.encerrar()
         else:
             # Iniciar monitoramento contínuo
             print("🔄 Iniciando monitoramento contínuo...")
@@ -311,6 +748,9 @@ def main():
                 print(f"❌ Monitoramento interrompido devido a erro: {str(e)}")
                 logger.error(f"❌ Monitoramento interrompido devido a erro: {str(e)}")
                 raise
+            finally:
+                # Fechar os navegadores mantidos aquecidos pelo pool e gravar as estatísticas pendentes
+                bot.encerrar()
                 
     except Exception as e:
         print(f"💥 ERRO CRÍTICO NA INICIALIZAÇÃO: {str(e)}")
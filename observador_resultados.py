@@ -0,0 +1,136 @@
+import json
+import logging
+from selenium.common.exceptions import JavascriptException
+from extrator_ofertas import FUNCAO_CARDS_OFERTA, SELETORES_CARDS, converter_oferta
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Instalado na página de resultados: um MutationObserver recalcula os cards de oferta
+# (com debounce) a cada mudança do DOM e guarda apenas os que mudaram desde a última coleta.
+# Cada card recebe um id estável via WeakMap (sem alterar o DOM, o que geraria novas mutações).
+SCRIPT_INSTALAR_OBSERVADOR = FUNCAO_CARDS_OFERTA + """
+var seletores = arguments[0];
+var maxPrecos = arguments[1];
+if (window.__unidasObservador) {
+    // Reinstalação no mesmo documento: a réplica em Python recomeça vazia, então todos os
+    // cards atuais voltam a ser pendentes (o observador existente continua valendo)
+    var existente = window.__unidasObservador;
+    existente.cards = {};
+    existente.pendentes = {};
+    existente.sincronizar();
+    return Object.keys(existente.cards).length;
+}
+
+var obs = window.__unidasObservador = {
+    cards: {},
+    pendentes: {},
+    ids: new WeakMap(),
+    proximoId: 1,
+    agendado: false,
+    ultimaMutacao: Date.now()
+};
+
+function sincronizar() {
+    obs.agendado = false;
+    var atuais = {};
+    __cardsOferta(document, seletores, maxPrecos).forEach(function(card) {
+        var id = obs.ids.get(card.elemento);
+        if (!id) { id = String(obs.proximoId++); obs.ids.set(card.elemento, id); }
+        var assinatura = JSON.stringify(card.dados);
+        atuais[id] = assinatura;
+        if (obs.cards[id] !== assinatura) { obs.pendentes[id] = card.dados; }
+    });
+    Object.keys(obs.cards).forEach(function(id) {
+        if (!(id in atuais)) { obs.pendentes[id] = null; }
+    });
+    obs.cards = atuais;
+}
+obs.sincronizar = sincronizar;
+
+new MutationObserver(function() {
+    obs.ultimaMutacao = Date.now();
+    if (!obs.agendado) { obs.agendado = true; setTimeout(sincronizar, 250); }
+}).observe(document.body, {childList: true, subtree: true, characterData: true, attributes: true});
+
+sincronizar();
+return Object.keys(obs.cards).length;
+"""
+
+# Long polling dentro do navegador: responde assim que houver cards alterados e o DOM
+# estiver quieto, ou ao fim do prazo. null = observador perdido (página recarregada).
+SCRIPT_AGUARDAR_ALTERACOES = """
+var prazo = arguments[0];
+var quietude = arguments[1];
+var concluir = arguments[arguments.length - 1];
+var obs = window.__unidasObservador;
+if (!obs) { concluir(null); return; }
+var inicio = Date.now();
+(function verificar() {
+    var quieto = !obs.agendado && Date.now() - obs.ultimaMutacao >= quietude;
+    var alterados = Object.keys(obs.pendentes).length > 0;
+    if ((alterados && quieto) || Date.now() - inicio >= prazo) {
+        var pendentes = obs.pendentes;
+        obs.pendentes = {};
+        concluir({alteracoes: pendentes, total: Object.keys(obs.cards).length});
+        return;
+    }
+    setTimeout(verificar, 100);
+})();
+"""
+
+
+class ObservadorResultados:
+    """
+    Réplica em Python dos cards de oferta da página de resultados, mantida por deltas.
+
+    Em vez de reler a página inteira a cada verificação, só os cards novos, alterados ou
+    removidos atravessam o WebDriver. Se a página for recarregada o observador se perde;
+    `aguardar_alteracoes` devolve None e a réplica deve ser refeita com `instalar`.
+    """
+
+    def __init__(self, driver, busca=None, seletores=None, max_precos=3):
+        self.driver = driver
+        self.busca = busca
+        self.seletores = seletores or SELETORES_CARDS
+        self.max_precos = max_precos
+        self.ofertas = {}
+
+    def instalar(self):
+        """
+        Instalar o observador na página atual; todos os cards chegam como alterações na próxima
+        coleta, inclusive quando o observador já estava instalado neste documento
+        """
+        self.ofertas = {}
+        total = self.driver.execute_script(SCRIPT_INSTALAR_OBSERVADOR, self.seletores, self.max_precos)
+        logger.info(f"👁️ Observador de resultados instalado ({total} cards)")
+        return total
+
+    def aguardar_alteracoes(self, prazo, quietude=1.0):
+        """
+        Aguardar (no navegador) cards alterados por até `prazo` segundos e aplicá-los à réplica.
+        Retorna o número de cards alterados, ou None se o observador se perdeu.
+        """
+        self.driver.set_script_timeout(prazo + 10)
+        try:
+            retorno = self.driver.execute_async_script(SCRIPT_AGUARDAR_ALTERACOES, int(prazo * 1000), int(quietude * 1000))
+        except JavascriptException as e:
+            # Navegação no meio da espera ("document unloaded while waiting for result")
+            logger.info(f"Página recarregada durante a observação: {e.msg}")
+            return None
+        if retorno is None:
+            return None
+
+        alteracoes = retorno.get('alteracoes') or {}
+        rotulos = {'busca': self.busca} if self.busca else {}
+        METRICAS.incrementar('unidas_vigia_bytes_total', len(json.dumps(retorno, ensure_ascii=False).encode('utf-8')), **rotulos)
+        METRICAS.incrementar('unidas_vigia_alteracoes_total', len(alteracoes), **rotulos)
+        for id_card, dados in alteracoes.items():
+            if dados is None:
+                self.ofertas.pop(id_card, None)
+            else:
+                self.ofertas[id_card] = converter_oferta(dados)
+        return len(alteracoes)
+
+    def lista(self):
+        return list(self.ofertas.values())
@@ -0,0 +1,39 @@
+import os
+import json
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def salvar_json_atomico(caminho, dados):
+    """
+    Gravar JSON de forma atômica: escreve em um arquivo temporário no mesmo diretório,
+    faz fsync e renomeia por cima do original. Uma queda no meio nunca deixa o arquivo truncado.
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=diretorio)
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except Exception:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+def carregar_json(caminho, padrao=None):
+    """Carregar JSON, devolvendo `padrao` se o arquivo não existir ou estiver corrompido"""
+    if not os.path.exists(caminho):
+        return padrao
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Erro ao carregar '{caminho}': {e}")
+        return padrao
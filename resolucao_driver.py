@@ -0,0 +1,185 @@
+import os
+import time
+import logging
+import platform
+import threading
+import subprocess
+from persistencia import salvar_json_atomico, carregar_json
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Locais conhecidos no Linux (Railway/Docker)
+CAMINHOS_CHROME = [
+    '/usr/bin/google-chrome-stable',
+    '/usr/bin/google-chrome',
+    '/usr/bin/chromium',
+    '/usr/bin/chromium-browser'
+]
+
+CAMINHOS_CHROMEDRIVER = [
+    '/usr/local/bin/chromedriver',
+    '/usr/bin/chromedriver',
+    '/usr/lib/chromium-browser/chromedriver'
+]
+
+
+def _primeiro_existente(caminhos):
+    for caminho in caminhos:
+        if os.path.exists(caminho):
+            return caminho
+    return None
+
+
+def _assinatura(caminho):
+    """mtime e tamanho do binário: mudam quando o pacote é atualizado"""
+    estado = os.stat(caminho)
+    return [estado.st_mtime, estado.st_size]
+
+
+def versao_binario(caminho):
+    """Saída de `<binário> --version` (ex: 'Chromium 120.0.6099.224'), ou None"""
+    try:
+        saida = subprocess.run([caminho, '--version'], capture_output=True, text=True, timeout=15)
+        return saida.stdout.strip() or None
+    except Exception as e:
+        logger.debug(f"Não foi possível obter a versão de {caminho}: {e}")
+        return None
+
+
+def _versao_principal(versao):
+    for parte in (versao or '').split():
+        if parte[:1].isdigit():
+            return parte.split('.')[0]
+    return None
+
+
+class ResolucaoDriver:
+    """
+    Localização e versão do navegador e do ChromeDriver, guardadas em disco.
+
+    A detecção (procurar os binários e rodar `--version`) só acontece quando não há cache
+    ou quando algum binário em cache mudou (mtime/tamanho diferentes, ou foi removido).
+    O ChromeDriver baixado pelo webdriver-manager também é registrado, para que as próximas
+    execuções não dependam da rede.
+    """
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or os.getenv('ARQUIVO_CACHE_DRIVER', 'cache_driver.json')
+        self._lock = threading.Lock()
+        self._entrada = None
+
+    @staticmethod
+    def _valida(entrada):
+        if not entrada or entrada.get('sistema') != platform.system().lower():
+            return False
+        for caminho, assinatura in entrada.get('assinaturas', {}).items():
+            try:
+                if _assinatura(caminho) != assinatura:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def resolver(self):
+        """Retorna ({'chrome', 'chromedriver', versões...}, veio_do_cache)"""
+        with self._lock:
+            if self._valida(self._entrada):
+                return dict(self._entrada), True
+
+            entrada = carregar_json(self.arquivo, None)
+            if self._valida(entrada):
+                self._entrada = entrada
+                METRICAS.incrementar('unidas_cache_driver_total', resultado='acerto')
+                logger.info(f"⚡ Navegador em cache: {entrada.get('chrome') or 'padrão do sistema'} "
+                            f"({entrada.get('chrome_versao') or 'versão desconhecida'}), "
+                            f"driver: {entrada.get('chromedriver') or 'padrão do Selenium'}")
+                return dict(entrada), True
+
+            METRICAS.incrementar('unidas_cache_driver_total', resultado='falha')
+            entrada = self._detectar()
+            if entrada.get('chrome') or entrada.get('chromedriver'):
+                self._entrada = entrada
+                self._gravar()
+            return dict(entrada), False
+
+    def _detectar(self):
+        sistema = platform.system().lower()
+        inicio = time.monotonic()
+        chrome = chromedriver = None
+        if sistema == 'linux':
+            chrome = _primeiro_existente(CAMINHOS_CHROME)
+            chromedriver = _primeiro_existente(CAMINHOS_CHROMEDRIVER)
+            if chrome:
+                logger.info(f"Chrome encontrado em: {chrome}")
+            if chromedriver:
+                logger.info(f"ChromeDriver encontrado em: {chromedriver}")
+
+        entrada = {
+            'sistema': sistema,
+            'chrome': chrome,
+            'chrome_versao': versao_binario(chrome) if chrome else None,
+            'chromedriver': chromedriver,
+            'chromedriver_versao': versao_binario(chromedriver) if chromedriver else None,
+            'origem_driver': 'sistema' if chromedriver else None,
+            'assinaturas': {caminho: _assinatura(caminho) for caminho in (chrome, chromedriver) if caminho},
+            'detectado_em': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        self._avisar_versoes(entrada)
+        logger.info(f"🔍 Navegador e driver detectados em {time.monotonic() - inicio:.2f}s")
+        return entrada
+
+    @staticmethod
+    def _avisar_versoes(entrada):
+        navegador = _versao_principal(entrada.get('chrome_versao'))
+        driver = _versao_principal(entrada.get('chromedriver_versao'))
+        if navegador and driver and navegador != driver:
+            logger.warning(f"Versões incompatíveis: navegador {entrada['chrome_versao']}, driver {entrada['chromedriver_versao']}")
+
+    def registrar_driver(self, caminho, origem):
+        """Guardar um ChromeDriver obtido fora da detecção (ex: baixado pelo webdriver-manager)"""
+        with self._lock:
+            entrada = self._entrada or {'sistema': platform.system().lower(), 'chrome': None, 'chrome_versao': None, 'assinaturas': {}}
+            anterior = entrada.get('chromedriver')
+            if anterior:
+                entrada['assinaturas'].pop(anterior, None)
+            try:
+                entrada['assinaturas'][caminho] = _assinatura(caminho)
+            except OSError:
+                return
+            entrada['chromedriver'] = caminho
+            entrada['chromedriver_versao'] = versao_binario(caminho)
+            entrada['origem_driver'] = origem
+            self._avisar_versoes(entrada)
+            self._entrada = entrada
+            self._gravar()
+
+    def invalidar(self):
+        """Descartar o cache (a próxima resolução detecta tudo de novo)"""
+        with self._lock:
+            self._entrada = None
+            try:
+                os.remove(self.arquivo)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Não foi possível remover o cache do driver: {e}")
+
+    def _gravar(self):
+        try:
+            salvar_json_atomico(self.arquivo, self._entrada)
+        except Exception as e:
+            logger.warning(f"Não foi possível salvar o cache do driver: {e}")
+
+
+_resolucao = None
+_lock_resolucao = threading.Lock()
+
+
+def obter_resolucao_driver():
+    """Resolução compartilhada pelo processo (o cache em memória evita até a leitura do arquivo)"""
+    global _resolucao
+    with _lock_resolucao:
+        if _resolucao is None:
+            _resolucao = ResolucaoDriver()
+        return _resolucao
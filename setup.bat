@@ -31,7 +31,7 @@ if %errorlevel% neq 0 (
     echo.
     echo [ERRO] Falha na instalação das dependências!
     echo Tente executar manualmente:
-    echo python -m pip install selenium webdriver-manager requests schedule python-dotenv pywhatkit
+    echo python -m pip install selenium webdriver-manager requests python-dotenv pywhatkit
     pause
     exit /b 1
 )
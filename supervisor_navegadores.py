@@ -0,0 +1,258 @@
+import os
+import glob
+import signal
+import logging
+import threading
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+NOMES_NAVEGADOR = ('chrome', 'chromium', 'chromedriver', 'chrome_crashpad', 'headless_shell')
+
+# Switch sem efeito passado ao Chrome só para identificar, pela linha de comando, os
+# navegadores abertos por este bot (o Chrome ignora switches que não conhece)
+MARCADOR_NAVEGADOR = '--unidas-bot-navegador'
+
+
+def _eh_navegador(nome):
+    return nome.lower().startswith(NOMES_NAVEGADOR)
+
+
+def _ler_processos():
+    """pid -> (pid do pai, nome do executável) de todos os processos, via /proc"""
+    processos = {}
+    for caminho in glob.glob('/proc/[0-9]*/stat'):
+        try:
+            with open(caminho, 'r') as f:
+                conteudo = f.read()
+            nome = conteudo[conteudo.index('(') + 1:conteudo.rindex(')')]
+            campos = conteudo.rsplit(')', 1)[1].split()
+            processos[int(caminho.split('/')[2])] = (int(campos[1]), nome)
+        except (OSError, IndexError, ValueError):
+            continue
+    return processos
+
+
+def arvore_processos(pid, processos=None):
+    """pid e todos os seus descendentes"""
+    processos = processos if processos is not None else _ler_processos()
+    filhos = {}
+    for filho, (pai, _) in processos.items():
+        filhos.setdefault(pai, []).append(filho)
+    arvore = []
+    pendentes = [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        arvore.append(atual)
+        pendentes.extend(filhos.get(atual, []))
+    return arvore
+
+
+def _linha_comando(pid):
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return f.read().decode('utf-8', 'replace').split('\0')
+    except OSError:
+        return []
+
+
+def iniciado_pelo_bot(pid, processos=None):
+    """Algum processo da árvore foi aberto com o marcador deste bot?"""
+    return any(MARCADOR_NAVEGADOR in _linha_comando(atual) for atual in arvore_processos(pid, processos))
+
+
+def memoria_processo_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def memoria_arvore_processos_mb(pid):
+    """Somar o RSS (em MB) de um processo e de todos os seus descendentes via /proc"""
+    if not pid or not os.path.isdir('/proc'):
+        return None
+    return sum(memoria_processo_kb(atual) for atual in arvore_processos(pid)) / 1024
+
+
+def pid_driver(driver):
+    """PID do chromedriver da sessão (raiz da árvore de processos do Chrome)"""
+    try:
+        return driver.service.process.pid
+    except Exception:
+        return None
+
+
+def matar_arvore(pid):
+    """Enviar SIGKILL ao processo e a todos os descendentes (filhos primeiro); devolve os PIDs mortos"""
+    mortos = []
+    for atual in reversed(arvore_processos(pid)):
+        try:
+            os.kill(atual, signal.SIGKILL)
+            mortos.append(atual)
+        except (ProcessLookupError, PermissionError):
+            continue
+    return mortos
+
+
+def recolher_zumbis(pids):
+    """
+    Recolher, entre os `pids` mortos pelo supervisor, os que são filhos deste processo e já
+    terminaram (ex: chromedriver após quit com falha). Nunca usa waitpid(-1): o status de
+    saída de outros filhos (trabalhadores, subprocess) continua com quem os criou.
+    Devolve os PIDs que ainda não terminaram, para tentar de novo na próxima rodada.
+    """
+    pendentes = []
+    for pid in pids:
+        try:
+            recolhido, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            # Não é filho deste processo (o init recolhe) ou já foi recolhido
+            continue
+        if recolhido == 0:
+            pendentes.append(pid)
+    return pendentes
+
+
+class SupervisorNavegadores:
+    """
+    Acompanha a memória (RSS) da árvore de processos de cada navegador em uso.
+
+    Uma thread verifica periodicamente as sessões registradas: a que passar do limite é
+    morta com SIGKILL (a verificação em andamento falha e o pool cria outra sessão) e
+    processos chrome/chromedriver órfãos abertos por este bot (marcados com MARCADOR_NAVEGADOR)
+    que não pertencem a nenhuma sessão registrada, como os que sobram de um quit() com falha,
+    são encerrados. Navegadores de outros programas nunca são tocados.
+    """
+
+    def __init__(self, limite_memoria_mb=None, intervalo=None):
+        self.limite_memoria_mb = limite_memoria_mb or float(os.getenv('SUPERVISOR_LIMITE_MEMORIA_MB', '1200'))
+        self.intervalo = intervalo or float(os.getenv('SUPERVISOR_INTERVALO', '15'))
+        self._lock = threading.Lock()
+        self._sessoes = {}
+        self._mortas = set()
+        # PIDs mortos que ainda não foram recolhidos
+        self._a_recolher = []
+        self._parar = threading.Event()
+        self._thread = None
+
+    def registrar(self, driver):
+        pid = pid_driver(driver)
+        if pid:
+            with self._lock:
+                self._sessoes[id(driver)] = pid
+
+    def remover(self, driver):
+        with self._lock:
+            self._sessoes.pop(id(driver), None)
+            self._mortas.discard(id(driver))
+
+    def foi_morta(self, driver):
+        """A sessão foi encerrada pelo supervisor por excesso de memória"""
+        with self._lock:
+            return id(driver) in self._mortas
+
+    def encerrar_sessao(self, driver):
+        """Matar a árvore de processos de uma sessão (usado quando quit() falha)"""
+        pid = pid_driver(driver)
+        if pid:
+            self._recolher(matar_arvore(pid))
+
+    def _recolher(self, mortos=()):
+        with self._lock:
+            pids = self._a_recolher + list(mortos)
+            self._a_recolher = []
+        pendentes = recolher_zumbis(pids)
+        with self._lock:
+            self._a_recolher.extend(pendentes)
+
+    def memoria_sessoes(self):
+        """RSS em MB de cada sessão registrada"""
+        with self._lock:
+            sessoes = dict(self._sessoes)
+        if not os.path.isdir('/proc'):
+            return {}
+        processos = _ler_processos()
+        return {
+            chave: sum(memoria_processo_kb(atual) for atual in arvore_processos(pid, processos)) / 1024
+            for chave, pid in sessoes.items() if pid in processos
+        }
+
+    def verificar(self):
+        """Uma rodada de supervisão: limite de memória, órfãos e zumbis"""
+        memoria = self.memoria_sessoes()
+        METRICAS.definir('unidas_navegadores_memoria_mb', round(sum(memoria.values()), 1))
+        METRICAS.definir('unidas_navegadores_ativos', len(memoria))
+
+        with self._lock:
+            sessoes = dict(self._sessoes)
+        mortos = []
+        for chave, memoria_mb in memoria.items():
+            if memoria_mb > self.limite_memoria_mb:
+                logger.warning(f"💥 Navegador com {memoria_mb:.0f} MB (limite {self.limite_memoria_mb:.0f} MB) - encerrando")
+                with self._lock:
+                    self._mortas.add(chave)
+                mortos.extend(matar_arvore(sessoes[chave]))
+                METRICAS.incrementar('unidas_navegadores_reiniciados_total', motivo='memoria')
+
+        self.encerrar_orfaos()
+        self._recolher(mortos)
+
+    def encerrar_orfaos(self):
+        """Matar processos do navegador abertos por este bot que não pertencem a nenhuma sessão registrada"""
+        if not os.path.isdir('/proc'):
+            return 0
+        processos = _ler_processos()
+        with self._lock:
+            raizes = list(self._sessoes.values())
+        conhecidos = set()
+        for pid in raizes:
+            conhecidos.update(arvore_processos(pid, processos))
+
+        meu_pid = os.getpid()
+        encerrados = 0
+        for pid, (pai, nome) in processos.items():
+            if pid in conhecidos or pid == meu_pid or not _eh_navegador(nome):
+                continue
+            # Filhos de outro processo do navegador são tratados junto com a raiz
+            if _eh_navegador(processos.get(pai, (None, ''))[1]):
+                continue
+            # Só processos sem dono: adotados pelo init ou por este processo (quando ele é o PID 1 do container)
+            if pai not in (meu_pid, 1):
+                continue
+            # chromedriver filho deste processo pode ser uma sessão sendo criada agora
+            if nome.lower().startswith('chromedriver') and pai == meu_pid:
+                continue
+            # Chrome aberto por outro programa ou pelo usuário: não é nosso
+            if not iniciado_pelo_bot(pid, processos):
+                continue
+            logger.warning(f"🧹 Encerrando processo órfão do navegador: {nome} (pid {pid})")
+            self._recolher(matar_arvore(pid))
+            encerrados += 1
+        if encerrados:
+            METRICAS.incrementar('unidas_processos_orfaos_encerrados_total', encerrados)
+        return encerrados
+
+    def _ciclo(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                logger.error(f"Erro na supervisão dos navegadores: {e}")
+
+    def iniciar(self):
+        if self._thread is None and os.path.isdir('/proc'):
+            # Restos de execuções anteriores que caíram sem fechar o navegador
+            self.encerrar_orfaos()
+            self._thread = threading.Thread(target=self._ciclo, name='supervisor-navegadores', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
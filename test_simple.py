@@ -19,9 +19,6 @@ try:
     import selenium
     print(f"✅ Selenium: {selenium.__version__}")
     
-    import schedule
-    print("✅ Schedule: OK")
-    
     import requests
     print(f"✅ Requests: {requests.__version__}")
     
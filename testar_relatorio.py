@@ -16,7 +16,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Carregar variáveis de ambiente
 load_dotenv()
 
+from datetime import datetime, timedelta
 from monitor_bot import BotMonitorUnidas
+from historico import HistoricoVerificacoes
 
 def testar_relatorio():
     """Testar o envio do relatório diário"""
@@ -26,28 +28,38 @@ def testar_relatorio():
     # Criar instância do bot
     bot = BotMonitorUnidas()
     
-    # Simular algumas estatísticas para teste
-    bot.estatisticas = {
-        'data': '2025-09-15',
-        'tentativas': 25,
-        'carros_encontrados': 2,
-        'notificacoes_enviadas': 2,
-        'erros': 1,
-        'ultimo_carro_encontrado': '2025-09-15 14:30:00'
-    }
+    # Simular um dia de verificações em um histórico temporário (em memória)
+    bot.historico = HistoricoVerificacoes(':memory:')
+    ontem = datetime.now() - timedelta(days=1)
+    for i in range(25):
+        momento = ontem.replace(hour=i % 24, minute=0, second=0, microsecond=0)
+        if i in (10, 14):
+            resultado = {'disponivel': True, 'veiculos': ['Chevrolet Spin'], 'detalhes': 'Teste', 'duracao': 12.5,
+                         'ofertas': [{'grupo': 'Grupo I', 'modelo': 'Chevrolet Spin', 'preco': 2874.9, 'disponivel': True}]}
+        elif i == 20:
+            resultado = {'disponivel': False, 'veiculos': [], 'detalhes': 'Erro geral: timeout', 'duracao': 30.0}
+        else:
+            resultado = {'disponivel': False, 'veiculos': [], 'detalhes': 'Nenhum veículo disponível', 'duracao': 10.0}
+        bot.historico.registrar('ribeirao-preto-reveillon', resultado, momento=momento)
+        if resultado['disponivel']:
+            bot.historico.registrar_notificacao('ribeirao-preto-reveillon', momento=momento)
     
+    resumo = bot.historico.resumo_dia(ontem.strftime('%Y-%m-%d'))
     print("Estatisticas simuladas:")
-    print(f"   Tentativas: {bot.estatisticas['tentativas']}")
-    print(f"   Carros encontrados: {bot.estatisticas['carros_encontrados']}")
-    print(f"   Notificacoes enviadas: {bot.estatisticas['notificacoes_enviadas']}")
-    print(f"   Erros: {bot.estatisticas['erros']}")
-    print(f"   Ultimo carro: {bot.estatisticas['ultimo_carro_encontrado']}")
+    print(f"   Tentativas: {resumo['tentativas']}")
+    print(f"   Carros encontrados: {resumo['disponiveis']}")
+    print(f"   Notificacoes enviadas: {resumo['notificacoes']}")
+    print(f"   Erros: {resumo['erros']}")
+    print(f"   Menor preco: {resumo['menor_preco']}")
     print()
     
     # Testar o relatório
     print("Enviando relatorio de teste...")
     bot.enviar_relatorio_diario()
     
+    # Aguardar o envio em segundo plano e fechar o bot
+    bot.encerrar()
+    
     print()
     print("Teste concluido!")
     print("Verifique seu WhatsApp para ver a mensagem")
@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ServidorStub:
+    """
+    Servidor HTTP local para os testes: grava cada requisição recebida e responde com as
+    respostas programadas em `respostas` (consumidas em ordem; a última se repete)
+    """
+
+    def __init__(self):
+        self.requisicoes = []
+        self.respostas = [(200, {})]
+        self._lock = threading.Lock()
+        stub = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            # HTTP/1.1: conexões keep-alive, para os testes verificarem o reaproveitamento
+            protocol_version = 'HTTP/1.1'
+
+            def _responder(self):
+                tamanho = int(self.headers.get('Content-Length') or 0)
+                corpo = self.rfile.read(tamanho) if tamanho else b''
+                with stub._lock:
+                    stub.requisicoes.append({
+                        'metodo': self.command,
+                        'caminho': self.path,
+                        'cabecalhos': dict(self.headers),
+                        'corpo': corpo,
+                        'porta_cliente': self.client_address[1]
+                    })
+                    status, resposta = stub.respostas.pop(0) if len(stub.respostas) > 1 else stub.respostas[0]
+                dados = resposta if isinstance(resposta, bytes) else json.dumps(resposta).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            do_GET = _responder
+            do_POST = _responder
+
+            def log_message(self, formato, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), Manipulador)
+        self.url = f"http://127.0.0.1:{self._servidor.server_address[1]}"
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+
+    def json(self, indice):
+        return json.loads(self.requisicoes[indice]['corpo'].decode('utf-8'))
+
+    def encerrar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+@pytest.fixture
+def servidor_stub():
+    servidor = ServidorStub()
+    yield servidor
+    servidor.encerrar()
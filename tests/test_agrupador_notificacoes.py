@@ -0,0 +1,53 @@
+from agrupador_notificacoes import AgrupadorNotificacoes
+
+
+class FilaFalsa:
+    def __init__(self):
+        self.mensagens = []
+
+    def enfileirar(self, mensagem, canais=None, chave=None):
+        self.mensagens.append(mensagem)
+        return True
+
+
+def criar_agrupador(**opcoes):
+    fila = FilaFalsa()
+    return fila, AgrupadorNotificacoes(fila, lambda secoes: ' + '.join(secoes), janela=3600, **opcoes)
+
+
+def test_secao_substituida_roda_so_o_callback_novo():
+    fila, agrupador = criar_agrupador()
+    chamadas = []
+
+    agrupador.adicionar('padrao', 'sp', 'SUV', 'a', ao_enviar=lambda: chamadas.append('antiga'))
+    agrupador.adicionar('padrao', 'sp', 'SUV e sedã', 'a|b', ao_enviar=lambda: chamadas.append('nova'))
+    agrupador.adicionar('padrao', 'rj', 'Hatch', 'c', ao_enviar=lambda: chamadas.append('rj'))
+    agrupador.liberar_tudo()
+
+    assert fila.mensagens == ['Hatch + SUV e sedã']
+    assert sorted(chamadas) == ['nova', 'rj']
+
+
+def test_limite_por_hora_adia_resumo(monkeypatch):
+    fila, agrupador = criar_agrupador(max_por_hora=1)
+    agrupador.adicionar('padrao', 'sp', 'primeiro', 'a')
+    agrupador._liberar('padrao')
+
+    agrupador.adicionar('padrao', 'sp', 'segundo', 'b')
+    agrupador._liberar('padrao')
+
+    assert fila.mensagens == ['primeiro']
+    agrupador.liberar_tudo()
+
+
+def test_adiamento_maximo_libera_acima_do_limite():
+    fila, agrupador = criar_agrupador(max_por_hora=1, adiamento_maximo=0.01)
+    agrupador.adicionar('padrao', 'sp', 'primeiro', 'a')
+    agrupador._liberar('padrao')
+
+    agrupador.adicionar('padrao', 'sp', 'segundo', 'b')
+    agrupador._grupos['padrao']['desde'] -= 1
+    agrupador._liberar('padrao')
+
+    assert fila.mensagens == ['primeiro', 'segundo']
+    agrupador.liberar_tudo()
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from bloqueio_recursos import PADROES_BLOQUEIO_PADRAO, TAMANHO_ESTIMADO, ativar_bloqueio, medir_recursos, padroes_bloqueio
+
+
+@pytest.fixture(autouse=True)
+def ambiente_limpo(monkeypatch):
+    for nome in ('RECURSOS_BLOQUEADOS', 'RECURSOS_BLOQUEADOS_EXTRA', 'RECURSOS_PERMITIDOS', 'BLOQUEIO_RECURSOS'):
+        monkeypatch.delenv(nome, raising=False)
+
+
+def evento(metodo, **parametros):
+    return {'message': json.dumps({'message': {'method': metodo, 'params': parametros}})}
+
+
+class DriverFalso:
+    def __init__(self, log=None):
+        self.log = log or []
+        self.comandos = []
+
+    def get_log(self, tipo):
+        assert tipo == 'performance'
+        log, self.log = self.log, []
+        return log
+
+    def execute_cdp_cmd(self, comando, parametros):
+        self.comandos.append((comando, parametros))
+
+
+def test_padroes_permitidos_saem_da_lista(monkeypatch):
+    monkeypatch.setenv('RECURSOS_BLOQUEADOS_EXTRA', '*cdn.exemplo.com*')
+    monkeypatch.setenv('RECURSOS_PERMITIDOS', '*.svg,*hotjar*')
+
+    padroes = padroes_bloqueio()
+
+    assert '*cdn.exemplo.com*' in padroes
+    assert '*.svg' not in padroes and '*hotjar.com*' not in padroes
+    assert len(padroes) == len(PADROES_BLOQUEIO_PADRAO) - 1
+
+
+def test_ativar_bloqueio_envia_padroes_ao_cdp():
+    driver = DriverFalso()
+
+    padroes = ativar_bloqueio(driver, bloquear=['*.png'], permitir=[])
+
+    assert padroes == ['*.png']
+    assert driver.comandos == [('Network.enable', {}), ('Network.setBlockedURLs', {'urls': ['*.png']})]
+
+
+def test_medir_recursos_estima_bytes_economizados():
+    driver = DriverFalso([
+        evento('Network.requestWillBeSent', requestId='1', type='Document'),
+        evento('Network.loadingFinished', requestId='1', encodedDataLength=12_000),
+        evento('Network.requestWillBeSent', requestId='2', type='Image'),
+        evento('Network.loadingFailed', requestId='2', blockedReason='inspector'),
+        evento('Network.loadingFailed', requestId='3', type='Font', blockedReason='inspector'),
+        evento('Network.requestWillBeSent', requestId='4', type='Image'),
+        evento('Network.loadingFailed', requestId='4', blockedReason='inspector'),
+        # Falha de rede comum não conta como bloqueio
+        evento('Network.loadingFailed', requestId='5', type='Script', errorText='net::ERR_FAILED'),
+        {'message': 'lixo'},
+    ])
+
+    resumo = medir_recursos(driver)
+
+    assert resumo == {
+        'bytes_baixados': 12_000,
+        'requisicoes_bloqueadas': 3,
+        'bloqueadas_por_tipo': {'Image': 2, 'Font': 1},
+        'bytes_economizados_estimados': 2 * TAMANHO_ESTIMADO['Image'] + TAMANHO_ESTIMADO['Font']
+    }
+    # O log foi consumido: a próxima medição começa do zero
+    assert medir_recursos(driver)['requisicoes_bloqueadas'] == 0
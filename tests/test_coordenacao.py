@@ -0,0 +1,106 @@
+import pytest
+
+import coordenacao
+from coordenacao import BackendMemoria, BackendSQLite, Coordenador
+
+BUSCAS = [f'busca-{i}' for i in range(20)]
+
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def criar_backend(request, tmp_path):
+    """Fábrica de backends: com SQLite, cada nó abre a sua conexão ao mesmo arquivo"""
+    memoria = BackendMemoria()
+    abertos = []
+
+    def criar():
+        backend = memoria if request.param == 'memoria' else BackendSQLite(str(tmp_path / 'coordenacao.db'))
+        abertos.append(backend)
+        return backend
+
+    yield criar
+    for backend in abertos:
+        backend.fechar()
+
+
+class Relogio:
+    def __init__(self, agora=1000.0):
+        self.agora = agora
+
+    def time(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(coordenacao.time, 'time', relogio.time)
+    return relogio
+
+
+def criar_no(criar_backend, no):
+    return Coordenador(criar_backend(), no=no, ttl_no=60, intervalo_pulso=15)
+
+
+def test_dois_nos_dividem_as_buscas(criar_backend, relogio):
+    a = criar_no(criar_backend, 'a')
+    b = criar_no(criar_backend, 'b')
+
+    de_a = {busca for busca in BUSCAS if a.assumir(busca)}
+    de_b = {busca for busca in BUSCAS if b.assumir(busca)}
+
+    assert de_a and de_b
+    assert de_a.isdisjoint(de_b)
+    assert de_a | de_b == set(BUSCAS)
+
+
+def test_no_assume_buscas_de_outro_depois_do_ttl(criar_backend, relogio):
+    a = criar_no(criar_backend, 'a')
+    b = criar_no(criar_backend, 'b')
+    de_b = [busca for busca in BUSCAS if b.assumir(busca)]
+    assert not any(a.assumir(busca) for busca in de_b)
+
+    # 'b' para de pulsar; 'a' continua
+    relogio.agora += 61
+    a.pulsar()
+
+    assert a.nos_ativos() == ['a']
+    assert all(a.assumir(busca) for busca in de_b)
+
+
+def test_concessao_nao_troca_de_dono_enquanto_ele_pulsa(criar_backend, relogio):
+    a = criar_no(criar_backend, 'a')
+    assert all(a.assumir(busca) for busca in BUSCAS)
+
+    # Com 'b' no grupo, ele é o dono preferido de parte das buscas, mas só as assume
+    # depois que 'a' devolve a concessão (na próxima vez que 'a' olhar para elas)
+    b = criar_no(criar_backend, 'b')
+    busca = next(busca for busca in BUSCAS if b.dono_preferido(busca, ['a', 'b']) == 'b')
+    assert not b.assumir(busca)
+    assert not a.assumir(busca)
+    assert b.assumir(busca)
+
+
+def test_evento_reivindicado_uma_vez(criar_backend, relogio):
+    a = criar_no(criar_backend, 'a')
+    b = criar_no(criar_backend, 'b')
+
+    assert a.reivindicar('oferta:sp:jeep', ttl=600) is True
+    assert b.reivindicar('oferta:sp:jeep', ttl=600) is False
+    assert a.reivindicar('oferta:sp:jeep', ttl=600) is False
+
+    # Vencido o prazo, o evento pode ser notificado de novo
+    relogio.agora += 601
+    assert b.reivindicar('oferta:sp:jeep', ttl=600) is True
+
+
+def test_encerrar_passa_as_buscas_para_o_outro_no(criar_backend, relogio):
+    a = criar_no(criar_backend, 'a')
+    b = criar_no(criar_backend, 'b')
+    de_b = [busca for busca in BUSCAS if b.assumir(busca)]
+    assert de_b
+
+    b.encerrar()
+
+    # Sem esperar o TTL: 'a' assume tudo na mesma hora
+    assert a.nos_ativos() == ['a']
+    assert all(a.assumir(busca) for busca in BUSCAS)
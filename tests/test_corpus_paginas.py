@@ -0,0 +1,28 @@
+import os
+import json
+
+import pytest
+
+from benchmark_detector import DIRETORIO_CORPUS, avaliar, carregar_corpus
+from detector import ClassificadorDisponibilidade
+
+PAGINAS = carregar_corpus(DIRETORIO_CORPUS)
+
+
+def test_toda_pagina_do_corpus_tem_rotulo():
+    with open(os.path.join(DIRETORIO_CORPUS, 'rotulos.json'), 'r', encoding='utf-8') as f:
+        rotulos = json.load(f)
+    assert sorted(pagina['arquivo'] for pagina in PAGINAS) == sorted(rotulos)
+
+
+@pytest.mark.parametrize('pagina', PAGINAS, ids=[pagina['arquivo'] for pagina in PAGINAS])
+def test_classificacao_da_pagina(pagina):
+    resultado = ClassificadorDisponibilidade().classificar(pagina['conteudo']) or {'disponivel': False}
+    assert resultado['disponivel'] == pagina['esperado']
+
+
+def test_precisao_e_recall_do_corpus():
+    classificador = ClassificadorDisponibilidade()
+    qualidade = avaliar([dict(pagina) for pagina in PAGINAS], lambda pagina: classificador.classificar(pagina['conteudo']))
+    assert qualidade['precisao'] == 1.0
+    assert qualidade['recall'] == 1.0
@@ -0,0 +1,19 @@
+from detector import ClassificadorDisponibilidade
+
+
+def test_plurais_contam_como_o_veiculo():
+    resultado = ClassificadorDisponibilidade().classificar('SUVs disponíveis para retirada. Minivans disponível.')
+
+    assert resultado['disponivel'] is True
+    assert sorted(resultado['veiculos']) == ['minivan', 'suv']
+
+
+def test_plural_esgotado():
+    resultado = ClassificadorDisponibilidade().classificar('SUVs esgotados. Minivans indisponíveis.')
+
+    assert resultado['disponivel'] is False
+    assert resultado['situacao_veiculos'] == {'suv': False, 'minivan': False}
+
+
+def test_bordas_continuam_evitando_subpalavras():
+    assert ClassificadorDisponibilidade().tokens('Vantagens exclusivas, indisponível') == [(22, 'indisponível')]
@@ -0,0 +1,96 @@
+import pytest
+
+import disjuntor
+from disjuntor import Disjuntor, classificar_excecao
+
+SUCESSO = {'disponivel': False, 'veiculos': [], 'detalhes': 'Nenhum veículo disponível'}
+TIMEOUT = {'falha': 'timeout', 'detalhes': 'Erro: timeout'}
+BLOQUEIO = {'falha': 'bloqueio', 'detalhes': 'Página de bloqueio anti-robô'}
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 100.0
+
+    def monotonic(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(disjuntor.time, 'monotonic', relogio.monotonic)
+    # Sem jitter, para conferir as esperas exatas
+    monkeypatch.setattr(disjuntor.random, 'uniform', lambda a, b: 1.0)
+    return relogio
+
+
+def criar():
+    return Disjuntor('teste', limite_falhas=3, espera_base=60, espera_maxima=200)
+
+
+def test_abre_apos_o_limite_de_falhas(relogio):
+    d = criar()
+    d.registrar(TIMEOUT)
+    d.registrar(TIMEOUT)
+    assert d.estado == 'fechado' and d.permitir()
+
+    d.registrar(TIMEOUT)
+
+    assert d.estado == 'aberto'
+    assert not d.permitir()
+    assert d.tempo_restante() == 60
+
+
+def test_sucesso_zera_as_falhas_seguidas(relogio):
+    d = criar()
+    d.registrar(TIMEOUT)
+    d.registrar(TIMEOUT)
+    d.registrar(SUCESSO)
+    d.registrar(TIMEOUT)
+    assert d.estado == 'fechado'
+
+
+def test_pagina_de_bloqueio_abre_na_primeira(relogio):
+    d = criar()
+    d.registrar(BLOQUEIO)
+    assert d.estado == 'aberto'
+
+
+def test_meio_aberto_permite_uma_sondagem(relogio):
+    d = criar()
+    d.registrar(BLOQUEIO)
+    relogio.agora += 61
+
+    assert d.permitir() is True
+    assert d.estado == 'meio_aberto'
+    assert d.permitir() is False
+
+    d.registrar(SUCESSO)
+    assert d.estado == 'fechado'
+    assert d.permitir() and d.permitir()
+
+
+def test_espera_dobra_a_cada_reabertura_ate_o_maximo(relogio):
+    d = criar()
+    esperas = []
+    d.registrar(BLOQUEIO)
+    for _ in range(3):
+        esperas.append(d.tempo_restante())
+        relogio.agora += esperas[-1] + 1
+        assert d.permitir()
+        # Sondagem falhou: reabre com espera maior
+        d.registrar(TIMEOUT)
+    esperas.append(d.tempo_restante())
+
+    assert esperas == [60, 120, 200, 200]
+
+
+@pytest.mark.parametrize('mensagem, tipo', [
+    ('unknown error: net::ERR_CONNECTION_TIMED_OUT', 'timeout'),
+    ('Read timed out. (read timeout=20)', 'timeout'),
+    ('invalid session id', 'navegador'),
+    ('algo inesperado', 'erro'),
+])
+def test_classificar_excecao(mensagem, tipo):
+    assert classificar_excecao(Exception(mensagem)) == tipo
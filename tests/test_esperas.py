@@ -0,0 +1,18 @@
+from esperas import EsperaAdaptativa
+
+
+class DriverFalso:
+    def execute_cdp_cmd(self, comando, parametros):
+        return {}
+
+
+def test_etapa_repetida_soma_as_duracoes():
+    esperas = EsperaAdaptativa(DriverFalso(), busca='teste')
+    esperas.aguardar('carregamento_resultados', lambda driver: True, timeout=1)
+    esperas.aguardar('carregamento_resultados', lambda driver: True, timeout=1)
+    esperas.aguardar('selecao_local', lambda driver: True, timeout=1)
+    esperas.registros[0]['duracao'] = 1.25
+    esperas.registros[1]['duracao'] = 2.5
+    esperas.registros[2]['duracao'] = 0.5
+
+    assert esperas.tempos() == {'carregamento_resultados': 3.75, 'selecao_local': 0.5}
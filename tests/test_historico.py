@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from historico import HistoricoVerificacoes
+
+DISPONIVEL = {'disponivel': True, 'veiculos': ['suv'], 'detalhes': 'Veículos DISPONÍVEIS encontrados: suv'}
+
+
+def test_ultimo_disponivel_limitado_ao_dia(tmp_path):
+    historico = HistoricoVerificacoes(str(tmp_path / 'historico.db'))
+    historico.registrar('sp', DISPONIVEL, momento=datetime(2026, 3, 9, 18, 30))
+    historico.registrar('sp', DISPONIVEL, momento=datetime(2026, 3, 10, 0, 15))
+    historico.registrar('sp', {'disponivel': False, 'veiculos': []}, momento=datetime(2026, 3, 10, 1, 0))
+
+    try:
+        assert historico.ultimo_disponivel() == '2026-03-10 00:15:00'
+        assert historico.ultimo_disponivel(dia='2026-03-09') == '2026-03-09 18:30:00'
+        assert historico.ultimo_disponivel(dia='2026-03-08') is None
+    finally:
+        historico.fechar()
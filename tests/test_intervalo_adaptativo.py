@@ -0,0 +1,28 @@
+from buscas import BUSCA_PADRAO
+from intervalo_adaptativo import IntervaloAdaptativo, OrcamentoVerificacoes
+
+RESULTADO = {'disponivel': False, 'veiculos': [], 'detalhes': 'Nenhum veículo disponível', 'impressao': 'a'}
+
+
+def criar():
+    return IntervaloAdaptativo(BUSCA_PADRAO, OrcamentoVerificacoes(1000), base=600, minimo=60, maximo=3600)
+
+
+def test_falhas_nao_aumentam_o_intervalo():
+    intervalo = criar()
+    for _ in range(3):
+        intervalo.registrar({'erro': True, 'falha': 'timeout', 'detalhes': 'Erro geral: timeout'})
+    intervalo.registrar({'detalhes': 'Erro ao acessar o site'})
+
+    assert intervalo.atual == 600
+    assert intervalo.orcamento.usadas() == 4
+
+
+def test_falha_nao_quebra_a_sequencia_de_resultados_iguais():
+    intervalo = criar()
+    intervalo.registrar(RESULTADO)
+    intervalo.registrar({'erro': True, 'falha': 'navegador', 'detalhes': 'Erro: tab crashed'})
+    intervalo.registrar(RESULTADO)
+
+    # Dois resultados iguais seguidos (a falha no meio não conta): recua 1,5x
+    assert intervalo.atual == 900
@@ -0,0 +1,42 @@
+import os
+import sys
+import subprocess
+import time
+
+import pytest
+
+from supervisor_navegadores import MARCADOR_NAVEGADOR, iniciado_pelo_bot, matar_arvore, recolher_zumbis
+
+pytestmark = pytest.mark.skipif(not os.path.isdir('/proc'), reason='depende do /proc')
+
+DORMIR = [sys.executable, '-c', 'import time; time.sleep(30)']
+
+
+def test_recolhe_so_os_pids_informados():
+    morto = subprocess.Popen(DORMIR)
+    outro = subprocess.Popen([sys.executable, '-c', 'raise SystemExit(3)'])
+    # O outro filho termina antes da limpeza e fica zumbi esperando o wait() de quem o criou
+    time.sleep(1)
+    try:
+        mortos = matar_arvore(morto.pid)
+        assert mortos == [morto.pid]
+        pendentes = mortos
+        while pendentes:
+            pendentes = recolher_zumbis(pendentes)
+
+        # O status do outro filho continua com quem o criou
+        assert outro.wait(timeout=10) == 3
+    finally:
+        morto.kill()
+
+
+def test_marcador_identifica_navegadores_do_bot():
+    do_bot = subprocess.Popen(DORMIR + [MARCADOR_NAVEGADOR])
+    alheio = subprocess.Popen(DORMIR)
+    try:
+        assert iniciado_pelo_bot(do_bot.pid)
+        assert not iniciado_pelo_bot(alheio.pid)
+    finally:
+        for processo in (do_bot, alheio):
+            processo.kill()
+            processo.wait()
@@ -0,0 +1,47 @@
+import threading
+from collections import deque
+
+from trabalhadores import PoolTrabalhadores
+
+
+class ConexaoFalsa:
+    def __init__(self):
+        self.enviados = []
+
+    def send(self, dados):
+        self.enviados.append(dados)
+
+
+def test_despachar_pula_trabalhador_sem_conexao():
+    pool = PoolTrabalhadores(2)
+    viva = ConexaoFalsa()
+    # O trabalhador 0 morreu ocioso: a conexão foi descartada no EOF
+    pool._conexoes = {1: viva}
+    pool._ociosos = {0, 1}
+    pool._pendentes = deque([(1, {'nome': 'a'}), (2, {'nome': 'b'})])
+
+    pool._despachar()
+
+    assert viva.enviados == [(1, {'nome': 'a'})]
+    assert list(pool._pendentes) == [(2, {'nome': 'b'})]
+    assert list(pool._em_execucao) == [1]
+    assert pool._ociosos == set()
+
+
+def test_coordenacao_continua_apos_erro(monkeypatch):
+    pool = PoolTrabalhadores(1)
+    rodadas = []
+
+    def rodada():
+        rodadas.append(1)
+        if len(rodadas) == 1:
+            raise RuntimeError('falha inesperada')
+        pool._parar.set()
+
+    monkeypatch.setattr(pool, '_rodada_coordenacao', rodada)
+    thread = threading.Thread(target=pool._coordenar)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert len(rodadas) == 2
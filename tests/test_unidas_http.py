@@ -0,0 +1,115 @@
+import importlib
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+import unidas_http
+from buscas import BUSCA_PADRAO
+from unidas_http import ClienteHttpUnidas, obter_sessao_http
+
+CAMINHO = '/api/reservas/disponibilidade'
+
+OFERTAS = {'data': {'grupos': [
+    {'grupo': 'Grupo SUV', 'modelo': 'Jeep Compass', 'preco': 350.0, 'disponivel': True},
+    {'grupo': 'Grupo SUV', 'modelo': 'Toyota RAV4', 'preco': 410.0, 'status': 'esgotado'},
+]}}
+
+
+@pytest.fixture(autouse=True)
+def sessao_nova(monkeypatch):
+    """Cada teste cria a sessão compartilhada do zero (retentativas sem espera entre elas)"""
+    monkeypatch.setattr(unidas_http, '_sessao', None)
+    monkeypatch.setenv('HTTP_RETENTATIVAS', '3')
+    yield
+    unidas_http._sessao = None
+
+
+def test_consulta_classifica_ofertas(servidor_stub):
+    servidor_stub.respostas = [(200, OFERTAS)]
+    cliente = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url, caminho=CAMINHO)
+
+    resultado = cliente.executar_verificacao()
+
+    assert resultado['backend'] == 'http'
+    assert resultado['disponivel'] is True
+    assert [oferta['modelo'] for oferta in resultado['ofertas']] == ['Jeep Compass', 'Toyota RAV4']
+    assert [oferta['disponivel'] for oferta in resultado['ofertas']] == [True, False]
+    requisicao = servidor_stub.requisicoes[0]
+    url = urlparse(requisicao['caminho'])
+    assert url.path == CAMINHO
+    assert parse_qs(url.query)['dataRetirada'] == [BUSCA_PADRAO.data_retirada]
+    assert requisicao['cabecalhos']['Accept'] == 'application/json'
+
+
+def test_erro_transitorio_e_repetido(servidor_stub):
+    servidor_stub.respostas = [(503, {}), (502, {}), (200, OFERTAS)]
+    cliente = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url, caminho=CAMINHO)
+
+    resultado = cliente.executar_verificacao()
+
+    assert len(servidor_stub.requisicoes) == 3
+    assert resultado['disponivel'] is True
+
+
+def test_sessao_compartilhada_entre_clientes(servidor_stub):
+    primeiro = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url)
+    segundo = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url)
+    assert primeiro.sessao is segundo.sessao is obter_sessao_http()
+
+
+def test_resposta_fora_do_formato_levanta_erro(servidor_stub):
+    servidor_stub.respostas = [(200, {'data': 'sistema em manutenção'})]
+    cliente = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url, caminho=CAMINHO)
+    with pytest.raises(ValueError):
+        cliente.executar_verificacao()
+
+
+def test_item_sem_disponibilidade_nao_vira_alerta(servidor_stub):
+    servidor_stub.respostas = [(200, {'data': {'grupos': [
+        {'grupo': 'Grupo SUV', 'modelo': 'Jeep Compass', 'preco': 350.0},
+        {'grupo': 'Grupo SUV', 'modelo': 'Toyota RAV4', 'status': 'esgotado'},
+    ]}})]
+    cliente = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url, caminho=CAMINHO)
+
+    resultado = cliente.executar_verificacao()
+
+    assert resultado['disponivel'] is False
+    assert [oferta['disponivel'] for oferta in resultado['ofertas']] == [False, False]
+
+
+def test_resposta_sem_nenhum_status_levanta_erro(servidor_stub):
+    servidor_stub.respostas = [(200, {'ofertas': [{'grupo': 'Grupo SUV', 'modelo': 'Jeep Compass', 'preco': 350.0}]})]
+    cliente = ClienteHttpUnidas(BUSCA_PADRAO, url_base=servidor_stub.url, caminho=CAMINHO)
+    with pytest.raises(ValueError):
+        cliente.executar_verificacao()
+
+
+class ScraperFalso:
+    def __init__(self):
+        self.chamadas = 0
+
+    def executar_verificacao(self):
+        self.chamadas += 1
+        return {'disponivel': False, 'veiculos': [], 'detalhes': 'Nenhum', 'busca': BUSCA_PADRAO.nome}
+
+
+def test_motor_usa_selenium_quando_http_falha(servidor_stub, monkeypatch, tmp_path):
+    # Arquivos de estado (impressões, seletores, log) ficam no diretório temporário
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('UNIDAS_API_URL', servidor_stub.url)
+    monkeypatch.setenv('MODO_EXECUCAO', 'threads')
+    servidor_stub.respostas = [(404, {'erro': 'rota desconhecida'})]
+    monitor_bot = importlib.import_module('monitor_bot')
+
+    motor = monitor_bot.MotorBuscas([BUSCA_PADRAO], backend='http')
+    scraper = ScraperFalso()
+    monkeypatch.setattr(motor, 'scraper', lambda nome: scraper)
+    try:
+        resultado = motor.verificar_busca(BUSCA_PADRAO.nome)
+    finally:
+        motor.encerrar()
+
+    assert len(servidor_stub.requisicoes) == 1
+    assert scraper.chamadas == 1
+    assert resultado['detalhes'] == 'Nenhum'
+    assert resultado.get('backend') != 'http'
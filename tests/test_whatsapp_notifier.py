@@ -0,0 +1,196 @@
+import pytest
+
+import whatsapp_notifier
+from whatsapp_notifier import (
+    CanalTelegram, CanalWebhook, CanalWhatsAppCloud, criar_canais_notificacao, obter_sessao_notificacoes
+)
+from fila_notificacoes import FilaNotificacoes
+
+
+@pytest.fixture(autouse=True)
+def sessao_nova(monkeypatch):
+    monkeypatch.setattr(whatsapp_notifier, '_sessao', None)
+    yield
+    whatsapp_notifier._sessao = None
+
+
+def test_whatsapp_cloud_payload(servidor_stub):
+    canal = CanalWhatsAppCloud('segredo', '12345', '+55 (11) 99999-0000', url_api=servidor_stub.url)
+
+    assert canal.enviar('Carro disponível!') is True
+
+    requisicao = servidor_stub.requisicoes[0]
+    assert requisicao['metodo'] == 'POST'
+    assert requisicao['caminho'] == '/12345/messages'
+    assert requisicao['cabecalhos']['Authorization'] == 'Bearer segredo'
+    assert servidor_stub.json(0) == {
+        'messaging_product': 'whatsapp',
+        'to': '5511999990000',
+        'type': 'text',
+        'text': {'body': 'Carro disponível!'}
+    }
+
+
+def test_whatsapp_cloud_lote_envia_uma_por_requisicao(servidor_stub):
+    canal = CanalWhatsAppCloud('segredo', '12345', '5511999990000', url_api=servidor_stub.url)
+
+    assert canal.enviar_lote(['a', 'b']) == [True, True]
+
+    assert [servidor_stub.json(i)['text']['body'] for i in range(2)] == ['a', 'b']
+
+
+def test_whatsapp_cloud_lote_para_na_primeira_falha(servidor_stub):
+    servidor_stub.respostas = [(200, {}), (500, {})]
+    canal = CanalWhatsAppCloud('segredo', '12345', '5511999990000', url_api=servidor_stub.url)
+
+    assert canal.enviar_lote(['a', 'b', 'c']) == [True, False, False]
+    assert len(servidor_stub.requisicoes) == 2
+
+
+def test_telegram_divide_mensagem_longa(servidor_stub):
+    canal = CanalTelegram('123:ABC', '987', url_api=servidor_stub.url)
+    mensagem = '\n'.join(f"Oferta {i}: " + 'x' * 90 for i in range(100))
+
+    assert canal.enviar(mensagem) is True
+
+    assert servidor_stub.requisicoes[0]['caminho'] == '/bot123:ABC/sendMessage'
+    assert servidor_stub.json(0)['chat_id'] == '987'
+    partes = [servidor_stub.json(i)['text'] for i in range(len(servidor_stub.requisicoes))]
+    assert len(partes) == 3
+    assert all(len(parte) <= CanalTelegram.LIMITE_TEXTO for parte in partes)
+    assert '\n'.join(partes) == mensagem
+
+
+def test_telegram_nova_tentativa_nao_repete_partes_entregues(servidor_stub):
+    servidor_stub.respostas = [(200, {}), (500, {}), (200, {})]
+    canal = CanalTelegram('123:ABC', '987', url_api=servidor_stub.url)
+    mensagem = 'a' * 4096 + 'b' * 10
+
+    assert canal.enviar(mensagem) is False
+    assert canal.enviar(mensagem) is True
+
+    textos = [servidor_stub.json(i)['text'] for i in range(len(servidor_stub.requisicoes))]
+    assert textos == ['a' * 4096, 'b' * 10, 'b' * 10]
+
+
+def test_telegram_lote_junta_mensagens_ate_o_limite(servidor_stub):
+    canal = CanalTelegram('123:ABC', '987', url_api=servidor_stub.url)
+
+    assert canal.enviar_lote(['primeira', 'segunda', 'y' * 4080]) == [True, True, True]
+
+    textos = [servidor_stub.json(i)['text'] for i in range(len(servidor_stub.requisicoes))]
+    assert len(textos) == 2
+    assert 'primeira' in textos[0] and 'segunda' in textos[0]
+    assert textos[1] == 'y' * 4080
+
+
+def test_telegram_lote_informa_blocos_entregues(servidor_stub):
+    servidor_stub.respostas = [(200, {}), (500, {})]
+    canal = CanalTelegram('123:ABC', '987', url_api=servidor_stub.url)
+
+    assert canal.enviar_lote(['primeira', 'segunda', 'y' * 4080]) == [True, True, False]
+
+
+def test_webhook_lote_em_uma_requisicao(servidor_stub):
+    canal = CanalWebhook(servidor_stub.url + '/alertas', token='tok')
+
+    assert canal.enviar_lote(['a', 'b', 'c']) == [True, True, True]
+
+    assert len(servidor_stub.requisicoes) == 1
+    requisicao = servidor_stub.requisicoes[0]
+    assert requisicao['caminho'] == '/alertas'
+    assert requisicao['cabecalhos']['Authorization'] == 'Bearer tok'
+    corpo = servidor_stub.json(0)
+    assert corpo['origem'] == 'unidas-bot'
+    assert corpo['mensagens'] == ['a', 'b', 'c']
+
+
+def test_webhook_sem_token_nao_envia_autorizacao(servidor_stub):
+    CanalWebhook(servidor_stub.url).enviar('a')
+    assert 'Authorization' not in servidor_stub.requisicoes[0]['cabecalhos']
+    assert servidor_stub.json(0)['mensagens'] == ['a']
+
+
+def test_recusa_da_api_devolve_false(servidor_stub):
+    servidor_stub.respostas = [(401, {'erro': 'token inválido'})]
+    assert CanalWebhook(servidor_stub.url).enviar('a') is False
+
+
+def test_canais_reaproveitam_a_mesma_conexao(servidor_stub):
+    telegram = CanalTelegram('1:A', '1', url_api=servidor_stub.url)
+    webhook = CanalWebhook(servidor_stub.url)
+    assert telegram.sessao is webhook.sessao is obter_sessao_notificacoes()
+
+    telegram.enviar('a')
+    webhook.enviar('b')
+    telegram.enviar('c')
+
+    portas = {requisicao['porta_cliente'] for requisicao in servidor_stub.requisicoes}
+    assert len(portas) == 1
+
+
+def test_fila_agrupa_mensagens_pendentes_no_webhook(servidor_stub, tmp_path):
+    fila = FilaNotificacoes(
+        {'webhook': CanalWebhook(servidor_stub.url)},
+        arquivo_caixa=str(tmp_path / 'caixa.json'), arquivo_entregas=str(tmp_path / 'entregas.log')
+    )
+    for mensagem in ('a', 'b', 'c'):
+        fila.enfileirar(mensagem)
+
+    fila.iniciar()
+    fila.encerrar(timeout=5)
+
+    assert fila.pendentes() == 0
+    assert len(servidor_stub.requisicoes) == 1
+    assert servidor_stub.json(0)['mensagens'] == ['a', 'b', 'c']
+
+
+def test_fila_usa_proximo_canal_quando_api_falha(servidor_stub, tmp_path):
+    servidor_stub.respostas = [(500, {})]
+    recebidas = []
+    fila = FilaNotificacoes(
+        {'webhook': CanalWebhook(servidor_stub.url), 'arquivo': lambda mensagem: recebidas.append(mensagem) or True},
+        arquivo_caixa=str(tmp_path / 'caixa.json'), arquivo_entregas=str(tmp_path / 'entregas.log'),
+        max_tentativas=2, espera_base=0.01
+    )
+    fila.enfileirar('alerta')
+
+    fila.iniciar()
+    fila.encerrar(timeout=5)
+
+    assert len(servidor_stub.requisicoes) == 2
+    assert recebidas == ['alerta']
+
+
+def test_fila_repete_so_o_que_nao_foi_entregue(servidor_stub, tmp_path):
+    # Primeiro bloco do lote entregue, segundo recusado sempre: só ele vai para o próximo canal
+    servidor_stub.respostas = [(200, {}), (500, {})]
+    recebidas = []
+    fila = FilaNotificacoes(
+        {'telegram': CanalTelegram('1:A', '1', url_api=servidor_stub.url),
+         'arquivo': lambda mensagem: recebidas.append(mensagem) or True},
+        arquivo_caixa=str(tmp_path / 'caixa.json'), arquivo_entregas=str(tmp_path / 'entregas.log'),
+        max_tentativas=2, espera_base=0.01
+    )
+    for mensagem in ('primeira', 'segunda', 'y' * 4080):
+        fila.enfileirar(mensagem)
+
+    fila.iniciar()
+    fila.encerrar(timeout=5)
+
+    textos = [servidor_stub.json(i)['text'] for i in range(len(servidor_stub.requisicoes))]
+    assert sum('primeira' in texto for texto in textos) == 1
+    assert recebidas == ['y' * 4080]
+
+
+def test_criar_canais_na_ordem_configurada(servidor_stub, monkeypatch):
+    monkeypatch.setenv('TELEGRAM_BOT_TOKEN', '1:A')
+    monkeypatch.setenv('TELEGRAM_CHAT_ID', '1')
+    monkeypatch.setenv('WEBHOOK_NOTIFICACAO_URL', servidor_stub.url)
+    monkeypatch.delenv('WHATSAPP_CLOUD_TOKEN', raising=False)
+    monkeypatch.setenv('CANAIS_NOTIFICACAO', 'webhook,whatsapp_cloud,telegram')
+
+    canais = criar_canais_notificacao()
+
+    assert list(canais) == ['webhook', 'telegram']
+    assert isinstance(canais['webhook'], CanalWebhook)
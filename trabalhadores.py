@@ -0,0 +1,252 @@
+import os
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from multiprocessing.connection import wait
+from metricas import METRICAS
+from supervisor_navegadores import matar_arvore
+
+logger = logging.getLogger(__name__)
+
+
+def memoria_disponivel_mb():
+    """MemAvailable do /proc/meminfo (None fora do Linux)"""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for linha in f:
+                if linha.startswith('MemAvailable:'):
+                    return int(linha.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def tamanho_automatico(total_buscas, memoria_por_trabalhador_mb=None):
+    """Trabalhadores que a máquina comporta: um por núcleo, limitado pela memória livre e pelo número de buscas"""
+    memoria_por_trabalhador_mb = memoria_por_trabalhador_mb or float(os.getenv('TRABALHADOR_MEMORIA_MB', '800'))
+    limites = [os.cpu_count() or 1, total_buscas]
+    memoria = memoria_disponivel_mb()
+    if memoria is not None:
+        limites.append(int(memoria // memoria_por_trabalhador_mb))
+    return max(1, min(limites))
+
+
+def _principal_trabalhador(indice, conexao):
+    """Processo trabalhador: um navegador próprio, tarefas (id, busca) pela conexão até receber None"""
+    # Ctrl+C chega a todo o grupo de processos; quem encerra os trabalhadores é o coordenador
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from buscas import Busca
+    from cache_seletores import CacheSeletores
+    from estado_buscas import EstadoBuscas
+    from unidas_scraper import UnidasScraper, PoolNavegadores
+
+    pool = PoolNavegadores(tamanho=1)
+    cache_seletores = CacheSeletores()
+    estado_buscas = EstadoBuscas()
+    scrapers = {}
+    try:
+        while True:
+            try:
+                tarefa = conexao.recv()
+            except EOFError:
+                break
+            if tarefa is None:
+                break
+            id_tarefa, dados_busca = tarefa
+            scraper = scrapers.get(dados_busca['nome'])
+            if scraper is None or scraper.busca.para_dict() != dados_busca:
+                # Impressões digitais ficam no coordenador (um único dono do arquivo)
+                scraper = scrapers[dados_busca['nome']] = UnidasScraper(
+                    Busca.de_dict(dados_busca), pool=pool, cache_seletores=cache_seletores, estado_buscas=estado_buscas
+                )
+            try:
+                conexao.send(('resultado', id_tarefa, scraper.executar_verificacao()))
+            except Exception as e:
+                conexao.send(('erro', id_tarefa, str(e)))
+    finally:
+        pool.encerrar()
+
+
+class PoolTrabalhadores:
+    """
+    Verificações em processos separados, cada um com o seu navegador.
+
+    O coordenador (este objeto) entrega cada tarefa a um trabalhador ocioso por uma conexão
+    exclusiva dele, recebe os resultados e impõe um timeout rígido por tarefa: o trabalhador
+    que passar dele é morto junto com a árvore de processos do Chrome e substituído. Uma
+    chamada travada do Selenium afeta só a busca daquele trabalhador.
+    """
+
+    def __init__(self, tamanho, timeout_tarefa=None):
+        self.tamanho = tamanho
+        self.timeout_tarefa = timeout_tarefa or float(os.getenv('TIMEOUT_TAREFA', '300'))
+        # spawn: o processo pai tem threads (agendador, fila de notificações, métricas)
+        self._contexto = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._processos = {}
+        self._conexoes = {}
+        self._ociosos = set()
+        self._pendentes = deque()
+        self._em_execucao = {}
+        self._futuros = {}
+        self._proximo_id = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        for indice in range(self.tamanho):
+            self._criar(indice)
+        self._thread = threading.Thread(target=self._coordenar, name='coordenador-trabalhadores', daemon=True)
+        self._thread.start()
+        logger.info(f"🧵 {self.tamanho} processos trabalhadores iniciados (timeout de {self.timeout_tarefa:.0f}s por tarefa)")
+
+    def _criar(self, indice):
+        conexao, conexao_filho = self._contexto.Pipe()
+        processo = self._contexto.Process(
+            target=_principal_trabalhador, args=(indice, conexao_filho),
+            name=f'trabalhador-{indice}', daemon=True
+        )
+        processo.start()
+        conexao_filho.close()
+        with self._lock:
+            self._processos[indice] = processo
+            self._conexoes[indice] = conexao
+            self._ociosos.add(indice)
+        self._despachar()
+
+    def _despachar(self):
+        """Entregar tarefas pendentes aos trabalhadores ociosos"""
+        with self._lock:
+            while self._pendentes and self._ociosos and not self._parar.is_set():
+                indice = self._ociosos.pop()
+                conexao = self._conexoes.get(indice)
+                if conexao is None:
+                    # Trabalhador morreu ocioso (EOF na conexão); a tarefa espera o substituto
+                    continue
+                id_tarefa, dados = self._pendentes.popleft()
+                self._em_execucao[indice] = (id_tarefa, time.monotonic())
+                try:
+                    conexao.send((id_tarefa, dados))
+                except (OSError, ValueError):
+                    # Trabalhador morreu; a vigilância conclui a tarefa com erro e o substitui
+                    pass
+
+    def executar(self, busca):
+        """Executar a verificação de uma busca em algum trabalhador e aguardar o resultado"""
+        futuro = Future()
+        with self._lock:
+            self._proximo_id += 1
+            id_tarefa = self._proximo_id
+            self._futuros[id_tarefa] = futuro
+            self._pendentes.append((id_tarefa, busca.para_dict()))
+            # O timeout rígido conta a partir da entrega; a espera aqui inclui a fila (cada rodada
+            # de tarefas à frente leva no máximo um timeout) e uma folga para repor trabalhadores
+            limite = (len(self._pendentes) // self.tamanho + 2) * self.timeout_tarefa + 60
+        self._despachar()
+        try:
+            return futuro.result(timeout=limite)
+        except FuturesTimeoutError:
+            with self._lock:
+                self._futuros.pop(id_tarefa, None)
+                self._pendentes = deque(tarefa for tarefa in self._pendentes if tarefa[0] != id_tarefa)
+            if futuro.done():
+                return futuro.result()
+            raise Exception(f"Sem resposta dos trabalhadores em {limite:.0f}s")
+
+    def _concluir(self, indice, resultado=None, erro=None):
+        with self._lock:
+            id_tarefa, _ = self._em_execucao.pop(indice, (None, None))
+            futuro = self._futuros.pop(id_tarefa, None)
+        if futuro is not None:
+            if erro is not None:
+                futuro.set_exception(Exception(erro))
+            else:
+                futuro.set_result(resultado)
+
+    def _coordenar(self):
+        while not self._parar.is_set():
+            try:
+                self._rodada_coordenacao()
+            except Exception as e:
+                # Uma falha aqui não pode parar a thread: sem ela nenhuma tarefa termina
+                logger.error(f"Erro na coordenação dos trabalhadores: {e}")
+                self._parar.wait(1)
+
+    def _rodada_coordenacao(self):
+        with self._lock:
+            conexoes = {conexao: indice for indice, conexao in self._conexoes.items()}
+        for conexao in wait(list(conexoes), timeout=1):
+            indice = conexoes[conexao]
+            try:
+                tipo, _, dados = conexao.recv()
+            except (EOFError, OSError):
+                # Trabalhador morreu: fica fora da espera até ser substituído
+                with self._lock:
+                    self._conexoes.pop(indice, None)
+                continue
+            if tipo == 'resultado':
+                self._concluir(indice, resultado=dados)
+            else:
+                self._concluir(indice, erro=dados)
+            with self._lock:
+                self._ociosos.add(indice)
+            self._despachar()
+        self._vigiar_trabalhadores()
+
+    def _vigiar_trabalhadores(self):
+        """Matar trabalhadores com tarefa acima do timeout e substituir os que morreram"""
+        agora = time.monotonic()
+        for indice, processo in list(self._processos.items()):
+            with self._lock:
+                tarefa = self._em_execucao.get(indice)
+            estourou = tarefa is not None and agora - tarefa[1] > self.timeout_tarefa
+            if processo.is_alive() and not estourou:
+                continue
+            if self._parar.is_set():
+                return
+
+            if estourou:
+                logger.error(f"⏰ Trabalhador {indice} passou de {self.timeout_tarefa:.0f}s na tarefa - encerrando processo e navegador")
+                matar_arvore(processo.pid)
+                motivo = 'timeout'
+                erro = f"Timeout de {self.timeout_tarefa:.0f}s excedido"
+            else:
+                logger.error(f"💥 Trabalhador {indice} morreu (código {processo.exitcode})")
+                motivo = 'falha'
+                erro = f"Trabalhador encerrado inesperadamente (código {processo.exitcode})"
+            processo.join(timeout=5)
+            METRICAS.incrementar('unidas_trabalhadores_reiniciados_total', motivo=motivo)
+            with self._lock:
+                conexao = self._conexoes.pop(indice, None)
+            if conexao is not None:
+                conexao.close()
+            self._concluir(indice, erro=erro)
+            self._criar(indice)
+
+    def encerrar(self, timeout=30):
+        """Pedir aos trabalhadores que terminem (fechando os navegadores) e matar os que não saírem"""
+        self._parar.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        with self._lock:
+            for conexao in self._conexoes.values():
+                try:
+                    conexao.send(None)
+                except (OSError, ValueError):
+                    pass
+        limite = time.monotonic() + timeout
+        for processo in self._processos.values():
+            processo.join(timeout=max(0.1, limite - time.monotonic()))
+            if processo.is_alive():
+                matar_arvore(processo.pid)
+                processo.join(timeout=5)
+        with self._lock:
+            futuros = list(self._futuros.values())
+            self._futuros.clear()
+            self._pendentes.clear()
+        for futuro in futuros:
+            futuro.set_exception(Exception("Pool de trabalhadores encerrado"))
@@ -0,0 +1,163 @@
+import os
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from buscas import BUSCA_PADRAO
+from detector import ClassificadorDisponibilidade
+from impressao_digital import impressao_ofertas
+from metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+_sessao = None
+_lock_sessao = threading.Lock()
+
+
+def obter_sessao_http():
+    """
+    Sessão HTTP compartilhada pelo processo: conexões keep-alive reaproveitadas
+    e novas tentativas automáticas para erros transitórios
+    """
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            retentativas = Retry(
+                total=int(os.getenv('HTTP_RETENTATIVAS', '3')),
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset(['GET', 'POST']),
+                respect_retry_after_header=True
+            )
+            adaptador = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=int(os.getenv('HTTP_POOL_CONEXOES', '10')),
+                max_retries=retentativas
+            )
+            sessao = requests.Session()
+            sessao.mount('https://', adaptador)
+            sessao.mount('http://', adaptador)
+            sessao.headers.update({
+                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+                'Accept': 'application/json',
+                'Accept-Language': 'pt-BR,pt;q=0.9',
+                'Connection': 'keep-alive'
+            })
+            _sessao = sessao
+        return _sessao
+
+
+def _primeiro(dados, chaves, padrao=None):
+    for chave in chaves:
+        if isinstance(dados, dict) and dados.get(chave) is not None:
+            return dados[chave]
+    return padrao
+
+
+class ClienteHttpUnidas:
+    """
+    Consulta de disponibilidade direto nos endpoints JSON que alimentam a página de resultados,
+    sem abrir navegador. Mesma interface de UnidasScraper.executar_verificacao.
+    """
+
+    # Chaves aceitas na resposta, já que o formato do backend não é documentado
+    CHAVES_LISTA = ('ofertas', 'grupos', 'veiculos', 'vehicles', 'groups', 'results', 'data', 'items')
+    CHAVES_GRUPO = ('grupo', 'categoria', 'group', 'category', 'codigoGrupo')
+    CHAVES_MODELO = ('modelo', 'nome', 'descricao', 'model', 'name', 'description')
+    CHAVES_PRECO = ('preco', 'valor', 'valorTotal', 'price', 'totalPrice')
+    CHAVES_DISPONIVEL = ('disponivel', 'available', 'isAvailable')
+    STATUS_DISPONIVEL = ('disponivel', 'disponível', 'available', 'in_stock')
+    STATUS_INDISPONIVEL = ('esgotado', 'indisponivel', 'indisponível', 'sold_out', 'unavailable')
+
+    def __init__(self, busca=None, url_base=None, caminho=None, sessao=None, timeout=None, impressoes=None):
+        self.busca = busca or BUSCA_PADRAO
+        self.impressoes = impressoes
+        self.url_base = (url_base or os.getenv('UNIDAS_API_URL', 'https://www.unidas.com.br')).rstrip('/')
+        self.caminho = caminho or os.getenv('UNIDAS_API_DISPONIBILIDADE', '/api/reservas/disponibilidade')
+        self.sessao = sessao or obter_sessao_http()
+        self.timeout = timeout or float(os.getenv('HTTP_TIMEOUT', '10'))
+        self.classificador = ClassificadorDisponibilidade(self.busca.palavras_veiculos)
+
+    def parametros(self):
+        """Parâmetros da consulta a partir dos critérios da busca"""
+        return {
+            'local': self.busca.opcao_local or self.busca.local,
+            'dataRetirada': self.busca.data_retirada,
+            'horaRetirada': self.busca.hora_retirada,
+            'dataDevolucao': self.busca.data_devolucao,
+            'horaDevolucao': self.busca.hora_devolucao
+        }
+
+    def consultar(self):
+        """Chamar o endpoint de disponibilidade e devolver o JSON decodificado"""
+        resposta = self.sessao.get(f"{self.url_base}{self.caminho}", params=self.parametros(), timeout=self.timeout)
+        resposta.raise_for_status()
+        return resposta.json()
+
+    def extrair_ofertas(self, dados):
+        """Normalizar a resposta em uma lista de ofertas {grupo, modelo, preco, disponivel}"""
+        itens = dados
+        if isinstance(dados, dict):
+            itens = _primeiro(dados, self.CHAVES_LISTA, [])
+            # Algumas respostas aninham a lista mais um nível (ex: {"data": {"grupos": [...]}})
+            if isinstance(itens, dict):
+                itens = _primeiro(itens, self.CHAVES_LISTA, [])
+        if not isinstance(itens, list):
+            raise ValueError("Resposta de disponibilidade sem lista de ofertas")
+
+        ofertas = []
+        classificadas = 0
+        for item in itens:
+            if not isinstance(item, dict):
+                continue
+            disponivel = _primeiro(item, self.CHAVES_DISPONIVEL)
+            if disponivel is None:
+                # Status desconhecido (ou ausente) não vale como disponível: evita alerta falso
+                # quando o formato da resposta não é o esperado
+                status = str(item.get('status', '')).strip().lower()
+                if status in self.STATUS_DISPONIVEL:
+                    disponivel = True
+                elif status in self.STATUS_INDISPONIVEL:
+                    disponivel = False
+            if disponivel is not None:
+                classificadas += 1
+            ofertas.append({
+                'grupo': str(_primeiro(item, self.CHAVES_GRUPO, '')),
+                'modelo': str(_primeiro(item, self.CHAVES_MODELO, '')),
+                'preco': _primeiro(item, self.CHAVES_PRECO),
+                'disponivel': bool(disponivel)
+            })
+        if ofertas and not classificadas:
+            raise ValueError("Nenhuma oferta da resposta informa disponibilidade reconhecível")
+        return ofertas
+
+    def executar_verificacao(self):
+        """Executar uma verificação completa via HTTP. Exceções indicam que o backend falhou."""
+        inicio = time.monotonic()
+        with METRICAS.medir('consulta_http', busca=self.busca.nome):
+            ofertas = self.extrair_ofertas(self.consultar())
+        
+        # Mesmas ofertas da última consulta: reaproveitar a classificação anterior
+        impressao = impressao_ofertas(ofertas)
+        resultado = self.impressoes.resultado_se_inalterado(self.busca.nome, impressao) if self.impressoes else None
+        if resultado is not None:
+            resultado['alterado'] = False
+        else:
+            resultado = self.classificador.classificar_ofertas(ofertas)
+            if resultado is None:
+                resultado = {'disponivel': False, 'veiculos': [], 'ofertas': [], 'detalhes': 'Nenhum veículo disponível'}
+            resultado['alterado'] = True
+            if self.impressoes:
+                self.impressoes.atualizar(self.busca.nome, impressao, resultado)
+        resultado['impressao'] = impressao
+        duracao = time.monotonic() - inicio
+        logger.info(f"[{self.busca.nome}] Consulta HTTP concluída em {duracao:.2f}s: {len(resultado['veiculos'])}/{len(resultado['ofertas'])} ofertas disponíveis")
+
+        resultado.update({
+            'busca': self.busca.nome,
+            'backend': 'http',
+            'tempos_etapas': {'consulta_http': round(duracao, 3)}
+        })
+        return resultado
@@ -2,17 +2,31 @@ import os
 import time
 import logging
 import platform
-import glob
 import subprocess
+import queue
+import json
+import threading
+from urllib.parse import urlparse
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, InvalidSelectorException
+from esperas import EsperaAdaptativa
+from buscas import BUSCA_PADRAO
+from detector import ClassificadorDisponibilidade
+from extrator_ofertas import extrair_ofertas
+from impressao_digital import SCRIPT_TEXTO_RESULTADOS, calcular_impressao, impressao_ofertas
+from observador_resultados import ObservadorResultados
+from metricas import METRICAS
+from cache_seletores import CacheSeletores
+from estado_buscas import EstadoBuscas
+from bloqueio_recursos import ativar_bloqueio, bloqueio_ativo, medir_recursos
+from supervisor_navegadores import MARCADOR_NAVEGADOR, SupervisorNavegadores, memoria_arvore_processos_mb
+from resolucao_driver import obter_resolucao_driver
+from disjuntor import pagina_bloqueada, classificar_excecao
 
 # Configurar logging
 logging.basicConfig(
@@ -25,137 +39,341 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class UnidasScraper:
-    def __init__(self):
-        self.driver = None
-        self.wait = None
+def criar_driver_chrome():
+    """Criar uma nova sessão do Chrome configurada para ambiente headless"""
+    print("🔧 Configurando driver do navegador...")
+    logger.info("🔧 Configurando driver do navegador...")
+    
+    # Configurar opções do Chrome para ambiente headless
+    opcoes_chrome = Options()
+    opcoes_chrome.add_argument('--headless')
+    opcoes_chrome.add_argument('--no-sandbox')
+    opcoes_chrome.add_argument('--disable-dev-shm-usage')
+    opcoes_chrome.add_argument('--disable-gpu')
+    opcoes_chrome.add_argument('--window-size=1920,1080')
+    opcoes_chrome.add_argument('--disable-extensions')
+    opcoes_chrome.add_argument('--disable-plugins')
+    opcoes_chrome.add_argument('--disable-web-security')
+    opcoes_chrome.add_argument('--allow-running-insecure-content')
+    # Identifica os processos deste bot para o supervisor limpar só os órfãos dele
+    opcoes_chrome.add_argument(MARCADOR_NAVEGADOR)
+    opcoes_chrome.add_experimental_option('excludeSwitches', ['enable-logging'])
+    opcoes_chrome.add_experimental_option('useAutomationExtension', False)
+    if bloqueio_ativo():
+        # Log de performance: fonte dos bytes baixados e das requisições bloqueadas em cada verificação
+        opcoes_chrome.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
+    print("✅ Opções do Chrome configuradas")
+    logger.info("✅ Opções do Chrome configuradas")
+    
+    # Caminhos e versões do navegador/driver vêm do cache em disco; a detecção só roda
+    # na primeira execução ou quando algum binário mudou
+    resolucao = obter_resolucao_driver()
+    for tentativa in (1, 2):
+        binarios, do_cache = resolucao.resolver()
+        try:
+            driver = _iniciar_chrome(opcoes_chrome, binarios, resolucao)
+            break
+        except Exception as e:
+            logger.error(f"Erro ao inicializar Chrome/Chromium: {e}")
+            if not do_cache or tentativa == 2:
+                raise Exception("Não foi possível inicializar o navegador Chrome. Verifique se o Chrome está instalado.")
+            # O cache pode apontar para binários atualizados/incompatíveis: detectar de novo
+            logger.warning("Descartando o cache do driver e detectando o navegador novamente")
+            resolucao.invalidar()
+    
+    # Imagens, fontes, mídia e scripts de terceiros são bloqueados via CDP
+    # (o --disable-images é ignorado pelas versões atuais do Chrome)
+    ativar_bloqueio(driver)
+    return driver
+
+
+def _iniciar_chrome(opcoes_chrome, binarios, resolucao):
+    """Abrir o Chrome com os binários resolvidos, com fallback para o webdriver-manager"""
+    if platform.system().lower() == 'linux':
+        # Configuração para ambiente Linux (Railway/Docker)
+        logger.info("Detectado ambiente Linux - configurando Chrome")
+        chrome_found = binarios.get('chrome')
+        chromedriver_found = binarios.get('chromedriver')
         
-    def configurar_driver(self):
-        print("🔧 Configurando driver do navegador...")
-        logger.info("🔧 Configurando driver do navegador...")
+        if not chrome_found:
+            logger.error("Nenhum browser Chrome/Chromium encontrado no sistema")
+            # Listar arquivos para debug
+            try:
+                result = subprocess.run(['ls', '-la', '/usr/bin/'], capture_output=True, text=True)
+                logger.info(f"Conteúdo de /usr/bin/: {result.stdout[:500]}")
+            except:
+                pass
+            raise Exception("Chrome/Chromium não encontrado")
         
-        # Configurar opções do Chrome para ambiente headless
-        opcoes_chrome = Options()
-        opcoes_chrome.add_argument('--headless')
-        opcoes_chrome.add_argument('--no-sandbox')
-        opcoes_chrome.add_argument('--disable-dev-shm-usage')
-        opcoes_chrome.add_argument('--disable-gpu')
-        opcoes_chrome.add_argument('--window-size=1920,1080')
-        opcoes_chrome.add_argument('--disable-extensions')
-        opcoes_chrome.add_argument('--disable-plugins')
-        opcoes_chrome.add_argument('--disable-images')
-        opcoes_chrome.add_argument('--remote-debugging-port=9222')
-        opcoes_chrome.add_argument('--disable-web-security')
-        opcoes_chrome.add_argument('--allow-running-insecure-content')
-        opcoes_chrome.add_experimental_option('excludeSwitches', ['enable-logging'])
-        opcoes_chrome.add_experimental_option('useAutomationExtension', False)
+        opcoes_chrome.binary_location = chrome_found
+        try:
+            if chromedriver_found:
+                servico = Service(chromedriver_found)
+                driver = webdriver.Chrome(service=servico, options=opcoes_chrome)
+                logger.info(f"Chrome inicializado com ChromeDriver: {chromedriver_found}")
+            else:
+                driver = webdriver.Chrome(options=opcoes_chrome)
+                logger.info("Chrome inicializado com ChromeDriver padrão")
+        except Exception as e:
+            logger.error(f"Erro ao inicializar Chrome: {e}")
+            # Fallback para webdriver-manager (precisa de rede só na primeira vez: o caminho fica em cache)
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                caminho_driver = ChromeDriverManager().install()
+                driver = webdriver.Chrome(service=Service(caminho_driver), options=opcoes_chrome)
+                resolucao.registrar_driver(caminho_driver, 'webdriver-manager')
+                logger.info("Chrome inicializado com webdriver-manager")
+            except Exception as e2:
+                logger.error(f"Erro no fallback: {e2}")
+                raise Exception("Não foi possível inicializar o navegador Chrome")
+        return driver
+    
+    # Configuração para Windows
+    logger.info("Detectado ambiente Windows - configurando Chrome")
+    try:
+        caminho_driver = binarios.get('chromedriver')
+        if not caminho_driver:
+            from webdriver_manager.chrome import ChromeDriverManager
+            from webdriver_manager.core.os_manager import ChromeType
+            
+            caminho_driver = ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+            resolucao.registrar_driver(caminho_driver, 'webdriver-manager')
+        return webdriver.Chrome(service=Service(caminho_driver), options=opcoes_chrome)
+    except Exception as e:
+        logger.warning(f"Erro ao configurar ChromeDriverManager: {e}")
+        # Fallback: tentar Chrome padrão do sistema
+        return webdriver.Chrome(options=opcoes_chrome)
+
+
+class PoolNavegadores:
+    """Pool de sessões do Chrome mantidas aquecidas entre verificações"""
+    
+    def __init__(self, fabrica=None, tamanho=None, max_usos=None, limite_memoria_mb=None, supervisor=None):
+        self.fabrica = fabrica or criar_driver_chrome
+        self.tamanho = tamanho or int(os.getenv('POOL_NAVEGADORES', '1'))
+        self.max_usos = max_usos or int(os.getenv('POOL_MAX_USOS', '20'))
+        self.limite_memoria_mb = limite_memoria_mb or float(os.getenv('POOL_LIMITE_MEMORIA_MB', '700'))
         
-        print("✅ Opções do Chrome configuradas")
-        logger.info("✅ Opções do Chrome configuradas")
+        # LIFO para reaproveitar sempre a sessão usada mais recentemente (mais "quente")
+        self._livres = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(self.tamanho)
+        self._usos = {}
+        self._lock = threading.Lock()
         
-        # Detectar ambiente (Windows vs Linux)
-        sistema = platform.system().lower()
+        # Limite rígido de memória, checado também durante as verificações, e limpeza de órfãos
+        self.supervisor = supervisor or SupervisorNavegadores()
+        self.supervisor.iniciar()
+    
+    def adquirir(self, timeout=None):
+        """Obter uma sessão saudável do pool, criando uma nova se necessário"""
+        if not self._vagas.acquire(timeout=timeout):
+            raise TimeoutException("Nenhum navegador livre no pool")
         
         try:
-            if sistema == 'linux':
-                # Configuração para ambiente Linux (Railway/Docker)
-                logger.info("Detectado ambiente Linux - configurando Chrome")
-                
-                # Verificar se Chrome existe antes de tentar usar
-                chrome_paths = [
-                    '/usr/bin/google-chrome-stable',
-                    '/usr/bin/google-chrome',
-                    '/usr/bin/chromium',
-                    '/usr/bin/chromium-browser'
-                ]
-                
-                # Também verificar ChromeDriver
-                chromedriver_paths = [
-                    '/usr/local/bin/chromedriver',
-                    '/usr/bin/chromedriver',
-                    '/usr/lib/chromium-browser/chromedriver'
-                ]
-                
-                chrome_found = None
-                for path in chrome_paths:
-                    if os.path.exists(path):
-                        chrome_found = path
-                        logger.info(f"Chrome encontrado em: {path}")
-                        break
+            while True:
+                try:
+                    driver = self._livres.get_nowait()
+                except queue.Empty:
+                    break
                 
-                # Verificar se ChromeDriver existe
-                chromedriver_found = None
-                for path in chromedriver_paths:
-                    if os.path.exists(path):
-                        chromedriver_found = path
-                        logger.info(f"ChromeDriver encontrado em: {path}")
-                        break
+                if not self.supervisor.foi_morta(driver) and self.esta_saudavel(driver):
+                    logger.info("♻️ Reutilizando navegador aquecido do pool")
+                    return driver
                 
-                if chrome_found:
-                    opcoes_chrome.binary_location = chrome_found
-                    try:
-                        if chromedriver_found:
-                            servico = Service(chromedriver_found)
-                            self.driver = webdriver.Chrome(service=servico, options=opcoes_chrome)
-                            logger.info(f"Chrome inicializado com ChromeDriver: {chromedriver_found}")
-                        else:
-                            self.driver = webdriver.Chrome(options=opcoes_chrome)
-                            logger.info("Chrome inicializado com ChromeDriver padrão")
-                    except Exception as e:
-                        logger.error(f"Erro ao inicializar Chrome: {e}")
-                        # Fallback para webdriver-manager
-                        try:
-                            from webdriver_manager.chrome import ChromeDriverManager
-                            servico = Service(ChromeDriverManager().install())
-                            opcoes_chrome.binary_location = chrome_found
-                            self.driver = webdriver.Chrome(service=servico, options=opcoes_chrome)
-                            logger.info("Chrome inicializado com webdriver-manager")
-                        except Exception as e2:
-                            logger.error(f"Erro no fallback: {e2}")
-                            raise Exception("Não foi possível inicializar o navegador Chrome")
-                else:
-                    logger.error("Nenhum browser Chrome/Chromium encontrado no sistema")
-                    # Listar arquivos para debug
-                    try:
-                        import subprocess
-                        result = subprocess.run(['ls', '-la', '/usr/bin/'], capture_output=True, text=True)
-                        logger.info(f"Conteúdo de /usr/bin/: {result.stdout[:500]}")
-                    except:
-                        pass
-                    raise Exception("Chrome/Chromium não encontrado")
+                logger.warning("Navegador do pool não respondeu ao health check - descartando")
+                self._descartar(driver)
+            
+            with METRICAS.medir('configurar_driver'):
+                driver = self.fabrica()
+            self.supervisor.registrar(driver)
+            with self._lock:
+                self._usos[id(driver)] = 0
+            logger.info("🆕 Novo navegador criado para o pool")
+            return driver
+        except Exception:
+            self._vagas.release()
+            raise
+    
+    def liberar(self, driver, descartar=False):
+        """Devolver uma sessão ao pool, reciclando-a quando necessário"""
+        if driver is None:
+            self._vagas.release()
+            return
+        
+        try:
+            with self._lock:
+                usos = self._usos.get(id(driver), 0) + 1
+                self._usos[id(driver)] = usos
+            
+            motivo = None
+            if self.supervisor.foi_morta(driver):
+                motivo = "encerrado pelo supervisor por excesso de memória"
+            elif descartar:
+                motivo = "falha durante a verificação"
+            elif usos >= self.max_usos:
+                motivo = f"limite de {self.max_usos} usos atingido"
             else:
-                # Configuração para Windows
-                logger.info("Detectado ambiente Windows - configurando Chrome")
-                try:
-                    from webdriver_manager.chrome import ChromeDriverManager
-                    from webdriver_manager.core.os_manager import ChromeType
-                    
-                    servico = Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install())
-                    self.driver = webdriver.Chrome(service=servico, options=opcoes_chrome)
-                except Exception as e:
-                    logger.warning(f"Erro ao configurar ChromeDriverManager: {e}")
-                    # Fallback: tentar Chrome padrão do sistema
-                    self.driver = webdriver.Chrome(options=opcoes_chrome)
-                    
+                memoria = self.memoria_mb(driver)
+                if memoria is not None and memoria > self.limite_memoria_mb:
+                    motivo = f"memória {memoria:.0f} MB acima do limite de {self.limite_memoria_mb:.0f} MB"
+                elif not self._limpar_sessao(driver):
+                    motivo = "sessão não respondeu ao ser limpa"
+            
+            if motivo:
+                logger.info(f"🔁 Reciclando navegador: {motivo}")
+                self._descartar(driver)
+            else:
+                self._livres.put(driver)
+        finally:
+            self._vagas.release()
+    
+    def encerrar(self):
+        """Fechar todas as sessões livres do pool e parar o supervisor"""
+        while True:
+            try:
+                driver = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(driver)
+        self.supervisor.parar()
+    
+    @staticmethod
+    def esta_saudavel(driver):
+        """Verificar se a sessão do navegador ainda responde"""
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+    
+    @staticmethod
+    def memoria_mb(driver):
+        """Memória residente do chromedriver e dos processos do Chrome abaixo dele"""
+        try:
+            return memoria_arvore_processos_mb(driver.service.process.pid)
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _limpar_sessao(driver):
+        """Descarregar a página atual para liberar memória entre verificações"""
+        try:
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+    
+    def _descartar(self, driver):
+        with self._lock:
+            self._usos.pop(id(driver), None)
+        try:
+            driver.quit()
         except Exception as e:
-            logger.error(f"Erro ao inicializar Chrome/Chromium: {e}")
-            raise Exception("Não foi possível inicializar o navegador Chrome. Verifique se o Chrome está instalado.")
+            # quit() falhou: matar os processos para não deixar Chrome zumbi/órfão
+            logger.warning(f"Erro ao fechar navegador descartado: {e} - encerrando processos")
+            self.supervisor.encerrar_sessao(driver)
+        finally:
+            self.supervisor.remover(driver)
+
+
+URL_RESERVAS = "https://www.unidas.com.br/para-voce/reservas-nacionais"
+
+# Registrado antes dos scripts da página: restaura o localStorage salvo (apenas na origem dele)
+SCRIPT_RESTAURAR_ARMAZENAMENTO = """
+(function(origem, itens) {
+    if (location.origin !== origem) { return; }
+    try {
+        Object.keys(itens).forEach(function(chave) { localStorage.setItem(chave, itens[chave]); });
+    } catch (e) { /* armazenamento bloqueado */ }
+})(%s, %s);
+"""
+
+SELETORES_BOTAO = [
+    "button[type='submit']",
+    "button[class*='search']",
+    "button[class*='buscar']",
+    "input[type='submit']",
+    "//button[contains(., 'Buscar')]",
+    "//button[contains(., 'Pesquisar')]",
+    "[data-testid*='search']"
+]
+
+
+def literal_xpath(texto):
+    """Montar um literal XPath seguro para textos com aspas"""
+    if "'" not in texto:
+        return f"'{texto}'"
+    partes = texto.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{parte}'" for parte in partes) + ")"
+
+
+class UnidasScraper:
+    def __init__(self, busca=None, pool=None, impressoes=None, cache_seletores=None, estado_buscas=None):
+        self.busca = busca or BUSCA_PADRAO
+        self.impressoes = impressoes
+        self.cache_seletores = cache_seletores or CacheSeletores()
+        self.estado_buscas = estado_buscas or EstadoBuscas()
+        self.classificador = ClassificadorDisponibilidade(self.busca.palavras_veiculos)
+        self.driver = None
+        self.wait = None
+        self.esperas = None
+        self.pool = pool or PoolNavegadores()
+        # Modo vigia: réplica dos cards da página de resultados mantida aberta
+        self.observador = None
+        self._impressao_vigia = None
+        # Tipo da falha detectada durante a verificação atual (bloqueio, timeout, layout, navegador)
+        self._falha = None
         
+    def obter_driver(self):
+        """Obter uma sessão aquecida do pool de navegadores"""
+        with METRICAS.medir('aquisicao_driver', busca=self.busca.nome):
+            self.driver = self.pool.adquirir()
+        # Descartar o tráfego de verificações anteriores para medir só a atual
+        medir_recursos(self.driver, registrar=False)
         self.wait = WebDriverWait(self.driver, 20)
-        
-    def fechar_driver(self):
-        """Fechar o WebDriver"""
+        self.esperas = EsperaAdaptativa(self.driver, busca=self.busca.nome)
+    
+    def liberar_driver(self, descartar=False):
+        """Devolver a sessão atual ao pool de navegadores"""
         if self.driver:
-            self.driver.quit()
+            self.pool.liberar(self.driver, descartar=descartar)
+        self.driver = None
+        self.wait = None
+        self.esperas = None
+    
+    def encerrar(self):
+        """Fechar todos os navegadores mantidos pelo pool"""
+        self.pool.encerrar()
+    
+    def _sondar_seletor(self, campo, seletor):
+        """
+        Procurar elementos do formulário com um seletor CSS (ou XPath, se começar com '//'),
+        medindo a sondagem. Seletores inválidos são descartados do cache e devolvem lista vazia.
+        """
+        by = By.XPATH if seletor.startswith('//') else By.CSS_SELECTOR
+        with METRICAS.medir('sondagem_seletor', busca=self.busca.nome, campo=campo):
+            try:
+                elementos = self.driver.find_elements(by, seletor)
+            except InvalidSelectorException:
+                METRICAS.incrementar('unidas_seletor_sondagens_total', campo=campo, seletor=seletor, resultado='invalido')
+                self.cache_seletores.marcar_invalido(campo, seletor)
+                return []
+            except Exception:
+                METRICAS.incrementar('unidas_seletor_sondagens_total', campo=campo, seletor=seletor, resultado='erro')
+                return []
+        METRICAS.incrementar('unidas_seletor_sondagens_total', campo=campo, seletor=seletor,
+                             resultado='encontrado' if elementos else 'vazio')
+        return elementos
             
     def preencher_formulario_busca(self):
         """Preencher o formulário de busca com os critérios especificados"""
         try:
-            logger.info("Acessando site da Unidas...")
-            self.driver.get("https://www.unidas.com.br/para-voce/reservas-nacionais")
+            logger.info(f"Acessando site da Unidas para a busca '{self.busca.nome}'...")
+            with METRICAS.medir('navegacao', busca=self.busca.nome):
+                self.driver.get(URL_RESERVAS)
             
-            # Aguardar carregamento da página
-            time.sleep(8)
+            # Aguardar carregamento da página (documento, rede e DOM estáveis)
+            self.esperas.pagina_estavel('carregamento_pagina', timeout=8)
             
             # Salvar screenshot para debug
             self.driver.save_screenshot("debug_pagina_inicial.png")
@@ -169,18 +387,25 @@ class UnidasScraper:
                 "#search-form"
             ]
             
+            # Seletores que funcionaram antes são tentados primeiro
             formulario_encontrado = False
-            for seletor in seletores_formulario:
+            for seletor in self.cache_seletores.ordenar('formulario', seletores_formulario):
                 try:
-                    formulario = self.driver.find_element(By.CSS_SELECTOR, seletor)
-                    if formulario:
-                        logger.info(f"Formulário encontrado com seletor: {seletor}")
-                        formulario_encontrado = True
-                        break
+                    formulario_encontrado = bool(self._sondar_seletor('formulario', seletor))
                 except:
-                    continue
+                    formulario_encontrado = False
+                self.cache_seletores.registrar('formulario', seletor, formulario_encontrado)
+                if formulario_encontrado:
+                    logger.info(f"Formulário encontrado com seletor: {seletor}")
+                    break
             
             if not formulario_encontrado:
+                # Página de desafio anti-robô: desistir já, sem pagar as esperas do preenchimento
+                if self._pagina_bloqueada():
+                    logger.warning(f"🛡️ [{self.busca.nome}] Página de bloqueio/desafio anti-robô no lugar do formulário")
+                    self._falha = 'bloqueio'
+                    self.cache_seletores.salvar()
+                    return False
                 logger.warning("Formulário específico não encontrado, tentando campos individuais")
             
             # Tentar encontrar e preencher local de retirada com múltiplos seletores
@@ -197,50 +422,54 @@ class UnidasScraper:
             ]
             
             campo_retirada = None
-            for seletor in seletores_local:
+            for seletor in self.cache_seletores.ordenar('local', seletores_local):
                 try:
-                    elementos = self.driver.find_elements(By.CSS_SELECTOR, seletor)
+                    elementos = self._sondar_seletor('local', seletor)
                     for elemento in elementos:
                         if elemento.is_displayed() and elemento.is_enabled():
                             campo_retirada = elemento
                             logger.info(f"Campo de retirada encontrado: {seletor}")
                             break
-                    if campo_retirada:
-                        break
                 except:
-                    continue
+                    pass
+                self.cache_seletores.registrar('local', seletor, campo_retirada is not None)
+                if campo_retirada:
+                    break
             
             if campo_retirada:
                 try:
                     campo_retirada.click()
                     campo_retirada.clear()
-                    campo_retirada.send_keys("Ribeirão Preto")
-                    time.sleep(3)
+                    campo_retirada.send_keys(self.busca.local)
                     
-                    # Procurar opções no dropdown
-                    opcoes_dropdown = [
-                        "//div[contains(text(), 'Ribeirão Preto')]",
-                        "//li[contains(text(), 'Ribeirão Preto')]",
-                        "//option[contains(text(), 'Ribeirão Preto')]",
-                        "//*[contains(text(), 'Aeroporto') and contains(text(), 'Ribeirão')]"
+                    # Aguardar a primeira opção visível no dropdown do autocomplete
+                    local = literal_xpath(self.busca.local)
+                    opcoes_dropdown = []
+                    if self.busca.opcao_local:
+                        opcoes_dropdown.append(f"//*[contains(text(), {literal_xpath(self.busca.opcao_local)})]")
+                    opcoes_dropdown += [
+                        f"//div[contains(text(), {local})]",
+                        f"//li[contains(text(), {local})]",
+                        f"//option[contains(text(), {local})]",
+                        f"//*[contains(text(), 'Aeroporto') and contains(text(), {local})]"
                     ]
                     
-                    for xpath in opcoes_dropdown:
-                        try:
-                            opcao = self.driver.find_element(By.XPATH, xpath)
-                            if opcao.is_displayed():
-                                opcao.click()
-                                logger.info("Opção de Ribeirão Preto selecionada")
-                                break
-                        except:
-                            continue
+                    opcao = self.esperas.elemento_visivel(
+                        'autocomplete_local',
+                        [(By.XPATH, xpath) for xpath in self.cache_seletores.ordenar('opcao_local', opcoes_dropdown)],
+                        timeout=3,
+                        ao_encontrar=lambda seletor: self.cache_seletores.registrar('opcao_local', seletor, True)
+                    )
+                    if opcao:
+                        opcao.click()
+                        logger.info(f"Opção de {self.busca.local_descricao} selecionada")
                             
                 except Exception as e:
                     logger.warning(f"Erro ao preencher local de retirada: {e}")
             else:
                 logger.warning("Campo de local de retirada não encontrado")
             
-            time.sleep(3)
+            self.esperas.sem_mutacoes('selecao_local', timeout=3)
             
             # Procurar e preencher datas
             logger.info("Procurando campos de data...")
@@ -250,44 +479,35 @@ class UnidasScraper:
                 try:
                     # Data de retirada
                     campos_data[0].clear()
-                    campos_data[0].send_keys("2025-12-26")
+                    campos_data[0].send_keys(self.busca.data_retirada)
                     logger.info("Data de retirada preenchida")
                     
                     # Data de devolução  
                     campos_data[1].clear()
-                    campos_data[1].send_keys("2026-01-03")
+                    campos_data[1].send_keys(self.busca.data_devolucao)
                     logger.info("Data de devolução preenchida")
                 except Exception as e:
                     logger.warning(f"Erro ao preencher datas: {e}")
             
-            time.sleep(2)
+            self.esperas.sem_mutacoes('preenchimento_datas', timeout=2)
             
             # Procurar botão de busca
             logger.info("Procurando botão de busca...")
-            seletores_botao = [
-                "button[type='submit']",
-                "button[class*='search']",
-                "button[class*='buscar']",
-                "input[type='submit']",
-                "button:contains('Buscar')",
-                "button:contains('Pesquisar')",
-                "[data-testid*='search']"
-            ]
-            
             botao_encontrado = False
-            for seletor in seletores_botao:
+            for seletor in self.cache_seletores.ordenar('botao', SELETORES_BOTAO):
                 try:
-                    botoes = self.driver.find_elements(By.CSS_SELECTOR, seletor)
+                    botoes = self._sondar_seletor('botao', seletor)
                     for botao in botoes:
                         if botao.is_displayed() and botao.is_enabled():
                             botao.click()
                             logger.info(f"Botão de busca clicado: {seletor}")
                             botao_encontrado = True
                             break
-                    if botao_encontrado:
-                        break
                 except:
-                    continue
+                    pass
+                self.cache_seletores.registrar('botao', seletor, botao_encontrado)
+                if botao_encontrado:
+                    break
             
             if not botao_encontrado:
                 logger.warning("Botão de busca não encontrado, tentando Enter")
@@ -300,15 +520,19 @@ class UnidasScraper:
             
             # Aguardar carregamento dos resultados
             logger.info("Aguardando carregamento dos resultados...")
-            time.sleep(15)
+            self.esperas.pagina_estavel('carregamento_resultados', timeout=15, quietude=1.0)
             
             # Salvar screenshot dos resultados
             self.driver.save_screenshot("debug_resultados.png")
             
+            self.cache_seletores.salvar()
+            
             return True
             
         except Exception as e:
             logger.error(f"Erro ao preencher formulário de busca: {str(e)}")
+            self._falha = classificar_excecao(e)
+            self.cache_seletores.salvar()
             # Salvar screenshot do erro
             try:
                 self.driver.save_screenshot("debug_erro.png")
@@ -316,144 +540,355 @@ class UnidasScraper:
                 pass
             return False
     
+    def abrir_resultados(self):
+        """Chegar à página de resultados: pelo estado salvo quando possível, senão pelo formulário"""
+        if self._abrir_resultados_salvos():
+            return True
+        if not self.preencher_formulario_busca():
+            return False
+        if self._pagina_de_resultados():
+            self._guardar_estado_busca()
+        return True
+    
+    def _pagina_de_resultados(self):
+        """A área de resultados menciona algum veículo ou status conhecido"""
+        try:
+            return bool(self.classificador.tokens(self.driver.execute_script(SCRIPT_TEXTO_RESULTADOS) or ''))
+        except Exception:
+            return False
+    
+    def _pagina_bloqueada(self):
+        """A página atual é um desafio/bloqueio anti-robô (título, texto visível e início do HTML)?"""
+        try:
+            return pagina_bloqueada(self.driver.execute_script(
+                "return document.title + ' ' + (document.body ? document.body.innerText.slice(0, 5000) : '')"
+                " + ' ' + document.documentElement.outerHTML.slice(0, 20000);"
+            ))
+        except Exception:
+            return False
+    
+    def _guardar_estado_busca(self):
+        """Salvar URL dos resultados, cookies e localStorage para as próximas verificações"""
+        url = self.driver.current_url
+        if not url or url.split('#')[0].rstrip('/') == URL_RESERVAS:
+            logger.info(f"[{self.busca.nome}] Resultados sem URL própria - o formulário continuará sendo preenchido")
+            return
+        try:
+            armazenamento = self.driver.execute_script(
+                "return {origem: location.origin, itens: Object.assign({}, window.localStorage)};"
+            )
+            self.estado_buscas.salvar(
+                self.busca, url, self.driver.get_cookies(), armazenamento['origem'], armazenamento['itens']
+            )
+        except Exception as e:
+            logger.warning(f"[{self.busca.nome}] Não foi possível salvar o estado da busca: {e}")
+    
+    def _restaurar_sessao(self, estado):
+        """
+        Restaurar cookies e localStorage antes de abrir os resultados.
+        Retorna o identificador do script de localStorage (a remover após o carregamento).
+        """
+        cookies = []
+        for cookie in estado.get('cookies', []):
+            parametros = {chave: cookie[chave] for chave in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite') if chave in cookie}
+            if 'expiry' in cookie:
+                parametros['expires'] = cookie['expiry']
+            cookies.append(parametros)
+        if cookies:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        if estado.get('local_storage'):
+            script = SCRIPT_RESTAURAR_ARMAZENAMENTO % (json.dumps(estado['origem']), json.dumps(estado['local_storage']))
+            return self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': script}).get('identifier')
+        return None
+    
+    def _abrir_resultados_salvos(self):
+        """Abrir os resultados direto pelo estado salvo; False (e estado descartado) se o atalho não servir mais"""
+        estado = self.estado_buscas.obter(self.busca)
+        if not estado:
+            return False
+        
+        logger.info(f"⚡ [{self.busca.nome}] Abrindo resultados pelo estado salvo em {estado.get('salvo_em_texto')}")
+        identificador = None
+        try:
+            try:
+                identificador = self._restaurar_sessao(estado)
+            except Exception as e:
+                logger.debug(f"CDP indisponível, abrindo os resultados sem restaurar a sessão: {e}")
+            with METRICAS.medir('navegacao_resultados', busca=self.busca.nome):
+                self.driver.get(estado['url'])
+            self.esperas.pagina_estavel('carregamento_resultados_salvos', timeout=15, quietude=1.0)
+        finally:
+            if identificador:
+                try:
+                    self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': identificador})
+                except Exception:
+                    pass
+        
+        # Redirecionado (ex: de volta ao formulário) ou página sem resultados: sessão expirou no site
+        if urlparse(self.driver.current_url).path != urlparse(estado['url']).path:
+            self.estado_buscas.invalidar(self.busca, f"redirecionado para {self.driver.current_url}")
+        elif not self._pagina_de_resultados():
+            self.estado_buscas.invalidar(self.busca, 'página aberta sem resultados')
+        else:
+            METRICAS.incrementar('unidas_estado_busca_total', busca=self.busca.nome, resultado='reaproveitado')
+            return True
+        logger.info(f"[{self.busca.nome}] Atalho para os resultados não funcionou - preenchendo o formulário")
+        return False
+    
     def verificar_disponibilidade_carros(self):
         """Verificar disponibilidade de SUV ou Minivan"""
         try:
             logger.info("Verificando disponibilidade de carros...")
             
-            # Aguardar carregamento dos resultados
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            
-            # Procurar categorias de carros - tentar múltiplos seletores
-            seletores_carros = [
-                "div[class*='car'], div[class*='vehicle'], div[class*='categoria']",
-                ".car-item, .vehicle-item, .categoria-item",
-                "[data-category], [data-car-type]",
-                "div:contains('SUV'), div:contains('Minivan'), div:contains('Utilitário')"
-            ]
-            
-            carros_disponiveis = []
-            
-            for seletor in seletores_carros:
-                try:
-                    carros = self.driver.find_elements(By.CSS_SELECTOR, seletor)
-                    if carros:
-                        logger.info(f"Encontrados {len(carros)} elementos de carro com seletor: {seletor}")
-                        break
-                except:
-                    continue
-            
-            # Se nenhum elemento específico de carro foi encontrado, verificar conteúdo da página
-            conteudo_pagina = self.driver.page_source.lower()
-            
-            # Verificar palavras-chave de SUV ou Minivan
-            palavras_suv = [
-                'suv', 'utilitário', 'minivan', 'van', 'sw5', 'sw7', 
-                'jeep', 'compass', 'renegade', 'ecosport', 'duster',
-                'carro minivan', 'minivan 7 lugares', '7 lugares',
-                'chevrolet spin', 'spin', 'fiat doblo', 'doblo',
-                'grupo i', 'categoria i'
-            ]
-            
-            veiculos_encontrados = []
-            for palavra in palavras_suv:
-                if palavra in conteudo_pagina:
-                    veiculos_encontrados.append(palavra)
-            
-            # Verificar se há veículos disponíveis
-            if veiculos_encontrados:
-                logger.info(f"Possíveis veículos encontrados: {veiculos_encontrados}")
-                
-                # Verificar se não está esgotado/indisponível - buscar próximo ao veículo encontrado
-                palavras_indisponivel = ['esgotado', 'indisponível', 'não disponível', 'sem estoque', 'sold out']
-                esta_disponivel = True
-                
-                # Verificar contexto específico para cada veículo encontrado
-                for veiculo in veiculos_encontrados:
-                    # Encontrar a posição do veículo no texto
-                    pos_veiculo = conteudo_pagina.find(veiculo)
-                    if pos_veiculo != -1:
-                        # Verificar texto ao redor do veículo (500 caracteres antes e depois)
-                        inicio = max(0, pos_veiculo - 500)
-                        fim = min(len(conteudo_pagina), pos_veiculo + 500)
-                        contexto = conteudo_pagina[inicio:fim]
-                        
-                        # Verificar se há palavras de indisponibilidade no contexto
-                        for palavra in palavras_indisponivel:
-                            if palavra in contexto:
-                                logger.info(f"Veículo {veiculo} encontrado mas indisponível: {palavra}")
-                                esta_disponivel = False
-                                break
-                        
-                        if not esta_disponivel:
-                            break
-                
-                if esta_disponivel:
-                    try:
-                        # Tentar capturar mais detalhes sobre os veículos
-                        detalhes_elementos = self.driver.find_elements(By.CSS_SELECTOR, ".vehicle-details, .car-info, .price, .disponivel")
-                        detalhes = [elem.text for elem in detalhes_elementos[:3]]  # Primeiros 3 elementos
-                    except:
-                        detalhes = []
-                
-                    return {
-                        'disponivel': True,
-                        'veiculos': veiculos_encontrados,
-                        'detalhes': f"Veículos DISPONÍVEIS encontrados: {', '.join(veiculos_encontrados)}"
-                    }
-                else:
-                    logger.info("Veículos encontrados mas todos estão esgotados/indisponíveis")
-                    return {'disponivel': False, 'veiculos': [], 'detalhes': 'Veículos encontrados mas esgotados'}
-                
-            # Se chegou até aqui, verificar se há alguma indicação de disponibilidade geral
-            palavras_disponivel = ['disponível', 'reservar', 'selecionar', 'escolher']
-            for palavra in palavras_disponivel:
-                if palavra in conteudo_pagina:
-                    logger.info(f"Possível disponibilidade detectada: {palavra}")
-                    return {
-                        'disponivel': True,
-                        'veiculos': ['Veículo disponível'],
-                        'detalhes': f"Disponibilidade detectada: {palavra}"
-                    }
-            
-            # Verificar mensagens de "sem resultados" ou "indisponível"
-            palavras_sem_resultado = ['não encontrado', 'indisponível', 'sem resultado', 'nenhum veículo', 'no results']
-            for palavra in palavras_sem_resultado:
-                if palavra in conteudo_pagina:
-                    logger.info(f"Nenhuma disponibilidade detectada: {palavra}")
-                    return {'disponivel': False, 'veiculos': [], 'detalhes': 'Nenhum veículo disponível'}
-            
-            # Se não conseguir determinar disponibilidade, salvar conteúdo da página para debug
-            logger.warning("Não foi possível determinar disponibilidade. Salvando conteúdo da página para análise.")
-            with open('pagina_debug.html', 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            
-            return {'disponivel': False, 'veiculos': [], 'detalhes': 'Não foi possível determinar disponibilidade'}
+            # Aguardar o DOM dos resultados parar de mudar
+            self.esperas.sem_mutacoes('estabilizacao_resultados', timeout=5)
+            
+            # Impressão digital da área de resultados: se nada mudou desde a última
+            # verificação, a classificação anterior é reaproveitada
+            impressao = calcular_impressao(self.driver.execute_script(SCRIPT_TEXTO_RESULTADOS))
+            if self.impressoes:
+                anterior = self.impressoes.resultado_se_inalterado(self.busca.nome, impressao)
+                if anterior is not None:
+                    logger.info("Conteúdo dos resultados inalterado - reaproveitando classificação anterior")
+                    anterior.update({'alterado': False, 'impressao': impressao})
+                    return anterior
+            
+            resultado = self._classificar_pagina()
+            self._capturar_pagina(resultado)
+            resultado.update({'alterado': True, 'impressao': impressao})
+            if self.impressoes:
+                self.impressoes.atualizar(self.busca.nome, impressao, resultado)
+            return resultado
             
         except Exception as e:
             logger.error(f"Erro ao verificar disponibilidade de carros: {str(e)}")
-            return {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro na verificação: {str(e)}'}
+            return {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro na verificação: {str(e)}',
+                    'erro': True, 'falha': classificar_excecao(e)}
+    
+    def _capturar_pagina(self, resultado):
+        """
+        Com CAPTURAR_PAGINAS=<diretório>, salvar cada página de resultados classificada para
+        rotular e incluir no corpus do benchmark (fixtures/paginas)
+        """
+        diretorio = os.getenv('CAPTURAR_PAGINAS')
+        if not diretorio:
+            return
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            situacao = 'disponivel' if resultado.get('disponivel') else 'indisponivel'
+            nome = f"{self.busca.nome}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{situacao}.html"
+            with open(os.path.join(diretorio, nome), 'w', encoding='utf-8') as f:
+                f.write(self.driver.page_source)
+            logger.info(f"📸 Página de resultados capturada em {os.path.join(diretorio, nome)}")
+        except Exception as e:
+            logger.warning(f"Não foi possível capturar a página de resultados: {e}")
+    
+    def _classificar_pagina(self):
+        """Classificar a página de resultados atual (ofertas estruturadas, com o texto da página como fallback)"""
+        # Extrair as ofertas estruturadas em uma única chamada ao navegador
+        ofertas = []
+        try:
+            ofertas = extrair_ofertas(self.driver)
+        except Exception as e:
+            logger.warning(f"Erro ao extrair ofertas estruturadas: {e}")
+        
+        resultado = self.classificador.classificar_ofertas(ofertas)
+        if resultado is not None:
+            return resultado
+        
+        # Se nenhum elemento específico de carro foi encontrado, verificar conteúdo da página
+        conteudo_pagina = self.driver.page_source
+        
+        # Uma única passada encontra veículos e termos de status; cada veículo é
+        # classificado pelo status que o acompanha
+        resultado = self.classificador.classificar(conteudo_pagina)
+        if resultado is not None:
+            return resultado
+        
+        # Se não conseguir determinar disponibilidade, salvar conteúdo da página para debug
+        logger.warning("Não foi possível determinar disponibilidade. Salvando conteúdo da página para análise.")
+        with open('pagina_debug.html', 'w', encoding='utf-8') as f:
+            f.write(conteudo_pagina)
+        
+        return {'disponivel': False, 'veiculos': [], 'detalhes': 'Não foi possível determinar disponibilidade'}
     
     def executar_verificacao(self):
         """Executar uma verificação completa de disponibilidade"""
+        descartar = False
+        self._falha = None
         try:
-            self.configurar_driver()
-            
-            if self.preencher_formulario_busca():
-                resultado = self.verificar_disponibilidade_carros()
+            self.obter_driver()
+            
+            with METRICAS.medir('preencher_formulario', busca=self.busca.nome):
+                preenchido = self.abrir_resultados()
+            
+            if preenchido:
+                with METRICAS.medir('verificar_disponibilidade', busca=self.busca.nome):
+                    resultado = self.verificar_disponibilidade_carros()
+                if str(resultado.get('detalhes', '')).startswith('Não foi possível'):
+                    self._diagnosticar_indeterminado(resultado)
+                resultado['busca'] = self.busca.nome
+                resultado['tempos_etapas'] = self.esperas.tempos()
+                memoria = self.pool.memoria_mb(self.driver)
+                if memoria is not None:
+                    resultado['memoria_mb'] = round(memoria, 1)
+                    METRICAS.definir('unidas_memoria_verificacao_mb', resultado['memoria_mb'], busca=self.busca.nome)
+                    logger.info(f"🧠 Memória do navegador ao fim da verificação: {memoria:.0f} MB")
+                recursos = medir_recursos(self.driver)
+                if recursos:
+                    resultado['recursos'] = recursos
+                    logger.info(
+                        f"🚫 {recursos['requisicoes_bloqueadas']} requisições bloqueadas "
+                        f"(~{recursos['bytes_economizados_estimados'] / 1024:.0f} KB economizados), "
+                        f"{recursos['bytes_baixados'] / 1024:.0f} KB baixados"
+                    )
                 logger.info(f"Resultado da verificação: {resultado}")
                 return resultado
             else:
                 logger.error("Falha ao preencher formulário de busca")
-                return {'disponivel': False, 'veiculos': [], 'detalhes': 'Erro ao preencher formulário'}
+                falha = self._falha or ('bloqueio' if self._pagina_bloqueada() else 'layout')
+                return {'disponivel': False, 'veiculos': [], 'detalhes': 'Erro ao preencher formulário', 'busca': self.busca.nome,
+                        'erro': True, 'falha': falha}
                 
         except Exception as e:
             logger.error(f"Erro em executar_verificacao: {str(e)}")
-            return {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}'}
+            descartar = True
+            return {'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}', 'busca': self.busca.nome,
+                    'erro': True, 'falha': classificar_excecao(e)}
         finally:
-            self.fechar_driver()
+            # A sessão volta ao pool; o health check da próxima aquisição cobre quedas do navegador
+            self.liberar_driver(descartar=descartar)
+
+    def _diagnosticar_indeterminado(self, resultado):
+        """Resultados não classificados: página de bloqueio (erro) ou layout desconhecido (falha sem erro)"""
+        if self._pagina_bloqueada():
+            logger.warning(f"🛡️ [{self.busca.nome}] Página de bloqueio/desafio anti-robô no lugar dos resultados")
+            resultado.update({'detalhes': 'Erro: página de bloqueio/desafio anti-robô', 'erro': True, 'falha': 'bloqueio'})
+        else:
+            resultado['falha'] = 'layout'
+    
+    def vigiar(self, ao_resultado, parar, intervalo_recarga=None, espera=None, recargas_por_sessao=None, disjuntor=None):
+        """
+        Modo vigia: mantém a página de resultados aberta com um MutationObserver e entrega a
+        `ao_resultado` um resultado a cada recarga suave da busca (reenvio do formulário já
+        preenchido, sem navegar de novo) e sempre que os cards mudarem entre recargas.
+        Roda até `parar` (threading.Event) ser sinalizado; falhas reabrem a sessão do zero.
+        Com `disjuntor`, a sessão só é reaberta quando ele permitir (sondagem após a espera).
+        """
+        intervalo_recarga = intervalo_recarga or float(os.getenv('VIGIA_INTERVALO_RECARGA', '120'))
+        espera = espera or float(os.getenv('VIGIA_ESPERA', '20'))
+        recargas_por_sessao = recargas_por_sessao or int(os.getenv('VIGIA_RECARGAS_POR_SESSAO', '30'))
+        falhas = 0
+        
+        while not parar.is_set():
+            if disjuntor is not None and not disjuntor.permitir():
+                parar.wait(max(1.0, disjuntor.tempo_restante()))
+                continue
+            descartar = False
+            self._falha = None
+            try:
+                ao_resultado(self._iniciar_vigia(espera))
+                falhas = 0
+                proxima_recarga = time.monotonic() + intervalo_recarga
+                recargas = 0
+                # A sessão é renovada a cada `recargas_por_sessao` (o pool não recicla navegadores em uso contínuo)
+                while not parar.is_set() and recargas < recargas_por_sessao:
+                    restante = proxima_recarga - time.monotonic()
+                    if restante <= 0:
+                        ao_resultado(self._recarregar_vigia(espera))
+                        recargas += 1
+                        proxima_recarga = time.monotonic() + intervalo_recarga
+                        continue
+                    resultado = self._coletar_vigia(min(restante, espera))
+                    if resultado is not None:
+                        ao_resultado(resultado)
+            except Exception as e:
+                falhas += 1
+                descartar = True
+                logger.error(f"[{self.busca.nome}] Erro no modo vigia: {e}")
+                ao_resultado({'disponivel': False, 'veiculos': [], 'detalhes': f'Erro geral: {str(e)}',
+                              'busca': self.busca.nome, 'erro': True, 'modo': 'vigia',
+                              'falha': self._falha or classificar_excecao(e)})
+                parar.wait(min(300, 10 * 2 ** (falhas - 1)))
+            finally:
+                self.observador = None
+                self.liberar_driver(descartar=descartar)
+    
+    def _iniciar_vigia(self, espera):
+        """Preencher o formulário uma vez e instalar o observador na página de resultados"""
+        inicio = time.monotonic()
+        self.obter_driver()
+        with METRICAS.medir('preencher_formulario', busca=self.busca.nome):
+            if not self.abrir_resultados():
+                self._falha = self._falha or ('bloqueio' if self._pagina_bloqueada() else 'layout')
+                raise Exception("Erro ao preencher formulário")
+        self.observador = ObservadorResultados(self.driver, busca=self.busca.nome)
+        self.observador.instalar()
+        # A página já está estável: os cards chegam na primeira coleta
+        self.observador.aguardar_alteracoes(min(espera, 3))
+        self._impressao_vigia = None
+        return self._resultado_vigia(inicio)
+    
+    def _coletar_vigia(self, prazo):
+        """Aplicar os cards alterados desde a última coleta; resultado só se as ofertas mudaram"""
+        inicio = time.monotonic()
+        alterados = self.observador.aguardar_alteracoes(prazo)
+        if alterados is None:
+            self._reinstalar_observador(prazo)
+        elif not alterados:
+            return None
+        resultado = self._resultado_vigia(inicio)
+        return resultado if resultado['alterado'] else None
+    
+    def _recarregar_vigia(self, espera):
+        """Recarga suave: reenviar a busca pelo botão da própria página (ou recarregar a URL de resultados)"""
+        inicio = time.monotonic()
+        with METRICAS.medir('recarga_vigia', busca=self.busca.nome):
+            if not self._reenviar_busca():
+                self.driver.refresh()
+            if self.observador.aguardar_alteracoes(espera) is None:
+                self._reinstalar_observador(espera)
+        medir_recursos(self.driver)
+        return self._resultado_vigia(inicio)
+    
+    def _reenviar_busca(self):
+        """Clicar de novo no botão de busca que funcionou no preenchimento"""
+        for seletor in self.cache_seletores.ordenar('botao', SELETORES_BOTAO)[:1]:
+            for botao in self._sondar_seletor('botao', seletor):
+                if botao.is_displayed() and botao.is_enabled():
+                    botao.click()
+                    return True
+        return False
+    
+    def _reinstalar_observador(self, prazo):
+        """A página foi recarregada: aguardar estabilizar e refazer a réplica dos cards"""
+        self.esperas.pagina_estavel('recarga_vigia', timeout=15, quietude=1.0)
+        self.observador.instalar()
+        self.observador.aguardar_alteracoes(min(prazo, 3))
+    
+    def _resultado_vigia(self, inicio):
+        """Classificar a partir da réplica dos cards (texto visível dos resultados como fallback, nunca o page_source)"""
+        ofertas = self.observador.lista()
+        resultado = self.classificador.classificar_ofertas(ofertas)
+        if resultado is None:
+            resultado = self.classificador.classificar(self.driver.execute_script(SCRIPT_TEXTO_RESULTADOS)) or {
+                'disponivel': False, 'veiculos': [], 'detalhes': 'Não foi possível determinar disponibilidade'
+            }
+        impressao = impressao_ofertas(ofertas)
+        resultado.update({
+            'busca': self.busca.nome,
+            'modo': 'vigia',
+            'alterado': impressao != self._impressao_vigia,
+            'impressao': impressao,
+            'duracao': round(time.monotonic() - inicio, 3)
+        })
+        self._impressao_vigia = impressao
+        return resultado
 
 if __name__ == "__main__":
     scraper = UnidasScraper()
-    resultado = scraper.executar_verificacao()
-    print(f"Resultado: {resultado}")
+    try:
+        resultado = scraper.executar_verificacao()
+        print(f"Resultado: {resultado}")
+    finally:
+        scraper.encerrar()
@@ -1,12 +1,207 @@
 import logging
 import os
 import time
-import webbrowser
+import threading
 import urllib.parse
 from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+_sessao = None
+_lock_sessao = threading.Lock()
+
+
+def obter_sessao_notificacoes():
+    """
+    Sessão HTTP compartilhada pelos canais de notificação: conexões keep-alive reaproveitadas.
+    Sem novas tentativas aqui - quem repete o envio é a fila de notificações.
+    """
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            adaptador = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=int(os.getenv('NOTIFICACOES_POOL_CONEXOES', '4')),
+                max_retries=0
+            )
+            sessao = requests.Session()
+            sessao.mount('https://', adaptador)
+            sessao.mount('http://', adaptador)
+            _sessao = sessao
+        return _sessao
+
+
+class CanalNotificacao:
+    """
+    Interface dos canais de notificação usados pela fila de envio.
+    enviar(mensagem) devolve True quando a API aceitou o envio; enviar_lote(mensagens) devolve
+    uma lista com o resultado de cada mensagem, para a fila repetir só as que não foram entregues.
+    max_lote: quantas mensagens o canal consegue juntar em uma única requisição.
+    """
+
+    nome = 'canal'
+    max_lote = 1
+
+    def __init__(self, sessao=None, timeout=None):
+        self.sessao = sessao or obter_sessao_notificacoes()
+        self.timeout = timeout or float(os.getenv('NOTIFICACOES_TIMEOUT', '10'))
+
+    def enviar(self, mensagem):
+        raise NotImplementedError
+
+    def enviar_lote(self, mensagens):
+        # Para na primeira falha: as seguintes ficam para a nova tentativa, mantendo a ordem
+        resultados = []
+        for mensagem in mensagens:
+            resultados.append(bool(self.enviar(mensagem)))
+            if not resultados[-1]:
+                break
+        return resultados + [False] * (len(mensagens) - len(resultados))
+
+    def _post(self, url, **kwargs):
+        resposta = self.sessao.post(url, timeout=self.timeout, **kwargs)
+        if resposta.status_code >= 400:
+            logger.error(f"Canal {self.nome} recusou a mensagem: HTTP {resposta.status_code} {resposta.text[:200]}")
+            return False
+        return True
+
+
+class CanalWhatsAppCloud(CanalNotificacao):
+    """WhatsApp Cloud API: uma mensagem de texto por requisição"""
+
+    nome = 'whatsapp_cloud'
+
+    def __init__(self, token, id_numero, destinatario, url_api=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = f"{(url_api or 'https://graph.facebook.com/v19.0').rstrip('/')}/{id_numero}/messages"
+        self.destinatario = ''.join(filter(str.isdigit, destinatario))
+        self.cabecalhos = {'Authorization': f'Bearer {token}'}
+
+    def enviar(self, mensagem):
+        return self._post(self.url, headers=self.cabecalhos, json={
+            'messaging_product': 'whatsapp',
+            'to': self.destinatario,
+            'type': 'text',
+            'text': {'body': mensagem}
+        })
+
+
+def dividir_texto(texto, limite):
+    """Partes de até `limite` caracteres, cortando de preferência em quebras de linha"""
+    partes = []
+    while len(texto) > limite:
+        corte = texto.rfind('\n', 0, limite)
+        if corte <= 0:
+            corte = limite
+        partes.append(texto[:corte])
+        texto = texto[corte:].lstrip('\n')
+    partes.append(texto)
+    return partes
+
+
+class CanalTelegram(CanalNotificacao):
+    """
+    API de bots do Telegram: várias mensagens juntas em textos de até 4096 caracteres.
+    Mensagens maiores saem em várias partes; numa nova tentativa, as partes já entregues
+    não são reenviadas.
+    """
+
+    nome = 'telegram'
+    max_lote = 10
+    LIMITE_TEXTO = 4096
+    SEPARADOR = '\n\n────────────\n\n'
+
+    def __init__(self, token, chat_id, url_api=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = f"{(url_api or 'https://api.telegram.org').rstrip('/')}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        # mensagem -> partes já entregues (só enquanto a mensagem não sai inteira)
+        self._partes_entregues = {}
+
+    def enviar(self, mensagem):
+        partes = dividir_texto(mensagem, self.LIMITE_TEXTO)
+        for indice in range(self._partes_entregues.get(mensagem, 0), len(partes)):
+            if not self._post(self.url, json={'chat_id': self.chat_id, 'text': partes[indice]}):
+                if indice:
+                    self._partes_entregues[mensagem] = indice
+                return False
+        self._partes_entregues.pop(mensagem, None)
+        return True
+
+    def enviar_lote(self, mensagens):
+        # Blocos de mensagens consecutivas que cabem juntas em um texto
+        blocos = []
+        for indice, mensagem in enumerate(mensagens):
+            if blocos and len(blocos[-1][0]) + len(self.SEPARADOR) + len(mensagem) <= self.LIMITE_TEXTO:
+                blocos[-1][0] += self.SEPARADOR + mensagem
+                blocos[-1][1].append(indice)
+            else:
+                blocos.append([mensagem, [indice]])
+
+        resultados = [False] * len(mensagens)
+        for texto, indices in blocos:
+            if not self.enviar(texto):
+                break
+            for indice in indices:
+                resultados[indice] = True
+        return resultados
+
+
+class CanalWebhook(CanalNotificacao):
+    """Webhook genérico: POST JSON com uma lista de mensagens por requisição"""
+
+    nome = 'webhook'
+    max_lote = 20
+
+    def __init__(self, url, token=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.cabecalhos = {'Authorization': f'Bearer {token}'} if token else {}
+
+    def enviar(self, mensagem):
+        return self.enviar_lote([mensagem])[0]
+
+    def enviar_lote(self, mensagens):
+        # Uma requisição só: o lote inteiro é aceito ou recusado
+        return [self._post(self.url, headers=self.cabecalhos, json={
+            'origem': 'unidas-bot',
+            'momento': datetime.now().isoformat(timespec='seconds'),
+            'mensagens': mensagens
+        })] * len(mensagens)
+
+
+def criar_canais_notificacao():
+    """
+    Canais HTTP configurados no ambiente, na ordem de CANAIS_NOTIFICACAO
+    (padrão: whatsapp_cloud, telegram, webhook - apenas os que tiverem credenciais)
+    """
+    disponiveis = {}
+    if os.getenv('WHATSAPP_CLOUD_TOKEN') and os.getenv('WHATSAPP_CLOUD_PHONE_ID') and os.getenv('WHATSAPP_PHONE_NUMBER'):
+        disponiveis['whatsapp_cloud'] = lambda: CanalWhatsAppCloud(
+            os.getenv('WHATSAPP_CLOUD_TOKEN'), os.getenv('WHATSAPP_CLOUD_PHONE_ID'),
+            os.getenv('WHATSAPP_PHONE_NUMBER'), url_api=os.getenv('WHATSAPP_CLOUD_API_URL')
+        )
+    if os.getenv('TELEGRAM_BOT_TOKEN') and os.getenv('TELEGRAM_CHAT_ID'):
+        disponiveis['telegram'] = lambda: CanalTelegram(
+            os.getenv('TELEGRAM_BOT_TOKEN'), os.getenv('TELEGRAM_CHAT_ID'), url_api=os.getenv('TELEGRAM_API_URL')
+        )
+    if os.getenv('WEBHOOK_NOTIFICACAO_URL'):
+        disponiveis['webhook'] = lambda: CanalWebhook(
+            os.getenv('WEBHOOK_NOTIFICACAO_URL'), token=os.getenv('WEBHOOK_NOTIFICACAO_TOKEN')
+        )
+
+    ordem = [nome.strip() for nome in os.getenv('CANAIS_NOTIFICACAO', ','.join(disponiveis)).split(',') if nome.strip()]
+    canais = {}
+    for nome in ordem:
+        if nome in disponiveis:
+            canais[nome] = disponiveis[nome]()
+        else:
+            logger.warning(f"Canal de notificação '{nome}' não configurado - ignorando")
+    return canais
+
+
 class NotificadorWhatsApp:
     def __init__(self, numero_telefone=None):
         """
@@ -43,6 +238,7 @@ class NotificadorWhatsApp:
                 logger.info("Ambiente servidor detectado - mensagem registrada para envio manual")
             else:
                 # Abrir WhatsApp Web no navegador padrão apenas em ambiente local
+                import webbrowser
                 webbrowser.open(url_whatsapp)
             
             # Também registrar a mensagem para envio manual se necessário
@@ -72,27 +268,57 @@ Mensagem: {mensagem}
         
         logger.info("Mensagem registrada para envio manual se necessário")
     
-    def enviar_notificacao_disponibilidade_carro(self, resultado_disponibilidade):
+    @staticmethod
+    def formatar_secao_disponibilidade(resultado_disponibilidade, busca=None):
         """
-        Enviar notificação específica para disponibilidade de carro
+        Trecho da mensagem com os carros disponíveis de uma busca (None se nada estiver disponível)
+        busca: critérios (buscas.Busca) que geraram o resultado; padrão é a busca original do bot
         """
-        if resultado_disponibilidade.get('disponivel', False):
-            veiculos = resultado_disponibilidade.get('veiculos', [])
-            detalhes = resultado_disponibilidade.get('detalhes', '')
-            
-            # Criar a mensagem de notificação
-            mensagem = f"""🚗 Carro disponível na Unidas! 
+        if not resultado_disponibilidade.get('disponivel', False):
+            return None
+        
+        if busca is None:
+            from buscas import BUSCA_PADRAO
+            busca = BUSCA_PADRAO
+        
+        veiculos = resultado_disponibilidade.get('veiculos', [])
+        detalhes = resultado_disponibilidade.get('detalhes', '')
+        
+        return f"""🔎 {busca.nome}
+Categoria: {', '.join(veiculos) if veiculos else '/'.join(busca.categorias)}
+Datas: {busca.periodo_descricao()}
+Retirada: {busca.local_descricao}
 
-Categoria: {', '.join(veiculos) if veiculos else 'SUV/Minivan'}
-Datas: 26/12 às 08:00 até 03/01 às 12:00
-Retirada: Aeroporto de Ribeirão Preto
+Detalhes: {detalhes}"""
+    
+    @staticmethod
+    def formatar_resumo_disponibilidade(secoes):
+        """Mensagem completa com as seções de uma ou mais buscas"""
+        if len(secoes) == 1:
+            titulo = "🚗 Carro disponível na Unidas! "
+        else:
+            titulo = f"🚗 Carros disponíveis na Unidas em {len(secoes)} buscas!"
+        corpo = '\n\n'.join(secoes)
+        
+        return f"""{titulo}
 
-Detalhes: {detalhes}
+{corpo}
 
 Link: https://www.unidas.com.br/para-voce/reservas-nacionais
 
 ⚡ Verificação automática - {datetime.now().strftime('%d/%m/%Y %H:%M')}"""
-            
+    
+    def formatar_notificacao_disponibilidade_carro(self, resultado_disponibilidade, busca=None):
+        """Montar a mensagem de disponibilidade de carro (None se nada estiver disponível)"""
+        secao = self.formatar_secao_disponibilidade(resultado_disponibilidade, busca)
+        return self.formatar_resumo_disponibilidade([secao]) if secao else None
+    
+    def enviar_notificacao_disponibilidade_carro(self, resultado_disponibilidade, busca=None):
+        """
+        Enviar notificação específica para disponibilidade de carro
+        """
+        mensagem = self.formatar_notificacao_disponibilidade_carro(resultado_disponibilidade, busca)
+        if mensagem:
             return self.enviar_notificacao(mensagem)
         
         return False